@@ -0,0 +1,550 @@
+"""
+This file is part of the KnownSourceMatcher.
+
+KnownSourceMatcher is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+KnownSourceMatcher is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with KnownSourceMatcher.  If not, see <http://www.gnu.org/licenses/>.
+
+File name:    Benchmark.py
+Created:      October 19th, 2026
+
+This code runs on python 2.4 or later.
+
+Times each stage of matching on the candidates and catalogs shipped with the
+matcher, so that changes in performance can be measured. For example,
+
+python Benchmark.py --output results.json --baseline ../../lib/benchmark_baseline.json
+
+The cases timed are:
+
+parse:<catalog>          -    parsing each catalog in lib/.
+decode:<fmt>             -    reading every candidate in test/data/pfds and test/data/phcxs.
+match:single:<catalog>   -    matching the candidates one at a time, as a plain run does.
+match:batch:<catalog>    -    matching the candidates after a sweep join, as --sweep does.
+selfjoin:<catalog>       -    matching each catalog against itself, as validation mode (--v) does.
+write                    -    writing the matches found to the output files.
+score                    -    computing the 22 scores of the first few PFD candidates.
+
+Each case is run once to warm up, then timed over a number of runs. The median
+wall clock and CPU times, and the number of items processed per second, are written
+as JSON. If a baseline written by an earlier run is given, each case is compared to
+it, and the tool exits with status 1 if any case is slower by more than the threshold.
+
+"""
+
+# Command Line processing Imports:
+from optparse import OptionParser
+import json, os, platform, shutil, sys, tempfile, time
+
+# Custom file Imports:
+import Instrumentation
+import PFDFile
+import Settings
+from CandidateReader import CandidateReader
+from KnownSourceDB import KnownSourceDB
+from MatchContext import MatchContext, render
+from SweepJoin import SweepJoin
+from Validator import Validator
+
+# ******************************
+#
+# CLASS DEFINITION
+#
+# ******************************
+
+class Benchmark:
+    """
+    Times parsing, decoding, matching, writing and scoring on the bundled test data.
+
+    """
+
+    # The version of the results format written.
+    VERSION = 1
+
+    # Cases differing from the baseline by less than this many seconds are never
+    # reported, as such differences are lost in the noise of the timer.
+    NOISE = 0.002
+
+    # ******************************
+    #
+    # MAIN METHOD AND ENTRY POINT.
+    #
+    # ******************************
+
+    def main(self,argv=None):
+        """
+        Main entry point for the Application.
+
+        """
+
+        print "\n****************************"
+        print "|                          |"
+        print "|        Benchmark         |"
+        print "|                          |"
+        print "|--------------------------|"
+        print "| Version 1.0              |"
+        print "| robert.lyon@cs.man.ac.uk |"
+        print "***************************\n"
+
+        source = os.path.dirname(os.path.abspath(__file__))
+        root = os.path.dirname(os.path.dirname(source))
+
+        parser = OptionParser()
+        parser.add_option("--data", action="store", dest="data",help='Path to the directory holding the pfds and phcxs test candidates (optional).',default=os.path.join(root,"test","data"))
+        parser.add_option("--lib", action="store", dest="lib",help='Path to the directory holding the catalogs psrcat.db and psrcat_web.db (optional).',default=os.path.join(root,"lib"))
+        parser.add_option("--settings", action="store", dest="settings",help='Path to the settings file to match with (optional).',default=os.path.join(root,"dist","Settings.txt"))
+        parser.add_option("--runs", action="store", dest="runs",type="int",help='The number of timed runs of each case (optional).',default=5)
+        parser.add_option("--scores", action="store", dest="scores",type="int",help='The number of PFD candidates to compute scores for (optional).',default=10)
+        parser.add_option("--cases", action="store", dest="cases",help='Comma separated prefixes of the cases to run, i.e. parse,match (optional).',default="")
+        parser.add_option("--output", action="store", dest="output",help='The path to write the results to as JSON (optional).',default="")
+        parser.add_option("--baseline", action="store", dest="baseline",help='The path to results written by an earlier run, to compare against (optional).',default="")
+        parser.add_option("--threshold", action="store", dest="threshold",type="float",help='The fraction by which a case may be slower than the baseline (optional).',default=0.2)
+
+        (args,options) = parser.parse_args()# @UnusedVariable : Tells Eclipse IDE to ignore warning.
+
+        catalogs = [os.path.join(args.lib, name) for name in ("psrcat.db", "psrcat_web.db")]
+        for path in catalogs + [args.settings, os.path.join(args.data, "pfds"), os.path.join(args.data, "phcxs")]:
+            if(not os.path.exists(path)):
+                print "Cannot find ", path, ", exiting!"
+                sys.exit(2)
+
+        self.runs = max(1, args.runs)
+        self.selected = [prefix.strip() for prefix in args.cases.split(",") if len(prefix.strip()) > 0]
+        self.directory = tempfile.mkdtemp(prefix="benchmark_")
+        self.results = {}
+
+        try:
+            self.benchmark(args, catalogs)
+        finally:
+            shutil.rmtree(self.directory, True)
+
+        report = {"version": self.VERSION, "environment": self.environment(),
+                  "runs": self.runs, "cases": self.results}
+
+        if(args.output):
+            output = open(args.output, "w")
+            output.write(json.dumps(report, indent=2, sort_keys=True, separators=(",", ": ")) + "\n")
+            output.close()
+            print "\nResults written to: ", args.output
+
+        if(args.baseline):
+            baselineFile = open(args.baseline)
+            baseline = json.loads(baselineFile.read())
+            baselineFile.close()
+
+            if(self.compare(baseline, report, args.threshold) > 0):
+                sys.exit(1)
+
+    # ****************************************************************************************************
+
+    def benchmark(self,args,catalogs):
+        """
+        Runs every case selected.
+        """
+
+        settings = self.settings(args.settings)
+        reader = CandidateReader(False)
+
+        print "%-32s %8s %10s %10s %12s" % ("Case", "Items", "Wall (s)", "CPU (s)", "Items/s")
+
+        for path in catalogs:
+            name = os.path.basename(path)
+            self.case("parse:" + name, lambda: None, lambda state: self.parse(path, settings).knownSourceCount)
+
+        pfds = self.find(os.path.join(args.data, "pfds"), ".pfd")
+        phcxs = self.find(os.path.join(args.data, "phcxs"), ".phcx.gz")
+
+        for fmt, paths in (("pfd", pfds), ("phcx", phcxs)):
+            size = sum([os.path.getsize(path) for path in paths])
+            self.case("decode:" + fmt, lambda: None, lambda state: len([reader.read(path) for path in paths]), size)
+
+        candidates = [reader.read(path) for path in pfds + phcxs]
+
+        contexts = None
+        for path in catalogs:
+            name = os.path.basename(path)
+            single = self.case("match:single:" + name, lambda: self.parse(path, settings), lambda db: self.matchSingle(db, candidates))
+            batch = self.case("match:batch:" + name, lambda: self.parse(path, settings), lambda db: self.matchBatch(db, candidates))
+
+            # The thresholded search used for single candidates only looks a fixed
+            # distance along the sort attribute, so can miss sources the sweep finds.
+            if(single is not None and batch is not None and single != batch):
+                print "    Note: single and batched matching found ", single, " and ", batch, " matches"
+
+            self.case("selfjoin:" + name, lambda: self.parse(path, settings), self.selfJoin)
+
+            if(contexts is None and self.isSelected("write")):
+                db = quietly(self.parse, path, settings)
+                contexts = self.matchContexts(db, candidates)
+
+        if(contexts is not None):
+            size = sum([context.size() for context in contexts])
+            self.case("write", lambda: self.copyContexts(contexts), self.write, size)
+
+        scored = pfds[:max(0, args.scores)]
+        if(len(scored) > 0):
+            self.case("score", lambda: [PFDFile.PFD(False, path) for path in scored], lambda cands: len([cand.compute() for cand in cands]))
+
+    # ****************************************************************************************************
+
+    def case(self,name,setup,run,bytes=0):
+        """
+        Times a case, if selected, and records the result.
+
+        Parameters:
+        name     -    the name of the case.
+        setup    -    called before each run, untimed. Its result is passed to run.
+        run      -    called with the result of setup, and timed. It returns the number
+                      of items processed, which must be the same on every run.
+        bytes    -    the number of bytes processed by each run (optional).
+
+        Returns:
+        The number of items processed, or None if the case was not selected.
+        """
+
+        if(not self.isSelected(name)):
+            return None
+
+        walls = []
+        cpus = []
+        items = None
+
+        # The first run warms up caches and lazily imported modules, and is not recorded.
+        for i in range(self.runs + 1):
+            state = quietly(setup)
+
+            wall = time.time()
+            cpu = Instrumentation.cpuTime()
+            count = quietly(run, state)
+            cpu = Instrumentation.cpuTime() - cpu
+            wall = time.time() - wall
+
+            if(items is not None and count != items):
+                print "Case ", name, " processed ", count, " items, not ", items, ", exiting!"
+                sys.exit(2)
+
+            items = count
+
+            if(i > 0):
+                walls.append(wall)
+                cpus.append(cpu)
+
+        result = {"items": items, "bytes": bytes, "wall": median(walls), "cpu": median(cpus),
+                  "min": min(walls), "max": max(walls)}
+        result["rate"] = items / max(result["wall"], 1.0e-9)
+
+        self.results[name] = result
+
+        print "%-32s %8d %10.4f %10.4f %12.1f" % (name, items, result["wall"], result["cpu"], result["rate"])
+
+        return items
+
+    # ****************************************************************************************************
+
+    def isSelected(self,name):
+        """
+        Returns True if the case with the given name was selected with --cases.
+        """
+
+        if(len(self.selected) == 0):
+            return True
+
+        for prefix in self.selected:
+            if(name.startswith(prefix)):
+                return True
+
+        return False
+
+    # ****************************************************************************************************
+
+    def compare(self,baseline,report,threshold):
+        """
+        Compares the results of this run to a baseline, and prints the differences.
+
+        Parameters:
+        baseline     -    the results of an earlier run.
+        report       -    the results of this run.
+        threshold    -    the fraction by which a case may be slower than the baseline.
+
+        Returns:
+        The number of cases slower than the baseline by more than the threshold.
+        """
+
+        print "\nCompared to baseline (threshold %.0f%%):\n" % (threshold * 100)
+        print "%-32s %10s %10s %8s" % ("Case", "Base (s)", "Now (s)", "Change")
+
+        regressions = 0
+        base = baseline.get("cases", {})
+
+        for name in sorted(report["cases"]):
+            now = report["cases"][name]
+
+            if(name not in base):
+                print "%-32s %10s %10.4f %8s" % (name, "-", now["wall"], "new")
+                continue
+
+            before = base[name]
+            change = (now["wall"] - before["wall"]) / max(before["wall"], 1.0e-9)
+
+            if(now["items"] != before["items"]):
+                status = "items changed (" + str(before["items"]) + " to " + str(now["items"]) + ")"
+            elif(change > threshold and now["wall"] - before["wall"] > self.NOISE):
+                status = "REGRESSION"
+                regressions += 1
+            elif(change < -threshold and before["wall"] - now["wall"] > self.NOISE):
+                status = "faster"
+            else:
+                status = ""
+
+            print "%-32s %10.4f %10.4f %+7.1f%% %s" % (name, before["wall"], now["wall"], change * 100, status)
+
+        for name in sorted(base):
+            if(name not in report["cases"] and self.isSelected(name)):
+                print "%-32s %10.4f %10s %8s" % (name, base[name]["wall"], "-", "missing")
+
+        if(regressions > 0):
+            print "\n", regressions, " case(s) slower than the baseline by more than %.0f%%" % (threshold * 100)
+        else:
+            print "\nNo case is slower than the baseline by more than %.0f%%" % (threshold * 100)
+
+        return regressions
+
+    # ****************************************************************************************************
+
+    def settings(self,path):
+        """
+        Returns the settings read from the file given, rather than from any Settings.txt
+        in the working directory, so that every run matches in the same way.
+        """
+
+        settings = Settings.Settings(False)
+        settings.path = path
+        settings.read()
+
+        return settings
+
+    # ****************************************************************************************************
+
+    def parse(self,path,settings):
+        """
+        Returns a KnownSourceDB holding the catalog at the path given.
+        """
+
+        db = KnownSourceDB(path, settings)
+
+        if(not db.parse()):
+            raise Exception("Catalog has unexpected structure: " + path)
+
+        return db
+
+    # ****************************************************************************************************
+
+    def find(self,directory,extension):
+        """
+        Returns the sorted list of files with the given extension in a directory tree.
+        """
+
+        paths = []
+
+        for root, directories, names in os.walk(directory):
+            for name in names:
+                if name.endswith(extension):
+                    paths.append(os.path.join(root, name))
+
+        paths.sort()
+
+        return paths
+
+    # ****************************************************************************************************
+
+    def output(self):
+        """
+        Returns the path to an empty output file in the temporary directory.
+        """
+
+        path = os.path.join(self.directory, "out.txt")
+
+        for name in (path, path.replace(".txt", ".csv")):
+            if(os.path.exists(name)):
+                os.remove(name)
+
+        return path
+
+    # ****************************************************************************************************
+
+    def matchSingle(self,db,candidates):
+        """
+        Matches candidates one at a time, without writing the matches found.
+
+        Returns:
+        The number of matches found.
+        """
+
+        outputFile = self.output()
+        found = 0
+
+        for candidate in candidates:
+            context = MatchContext(outputFile)
+            found += len(db.match(candidate, outputFile, context=context))
+
+        return found
+
+    # ****************************************************************************************************
+
+    def matchBatch(self,db,candidates):
+        """
+        Matches candidates after finding their neighbours with a sweep join,
+        without writing the matches found.
+
+        Returns:
+        The number of matches found.
+        """
+
+        outputFile = self.output()
+        found = 0
+
+        neighbourhoods = SweepJoin(False, db.catalog, db.radius).join(candidates)
+
+        for i in range(len(candidates)):
+            context = MatchContext(outputFile)
+            found += len(db.match(candidates[i], outputFile, neighbourhoods.get(i), context))
+
+        return found
+
+    # ****************************************************************************************************
+
+    def selfJoin(self,db):
+        """
+        Matches the catalog against itself, without writing the matches found.
+
+        Returns:
+        The number of known sources matched.
+        """
+
+        outputFile = self.output()
+        Validator(False, db, outputFile).selfJoin(MatchContext(outputFile), False)
+
+        return db.knownSourceCount
+
+    # ****************************************************************************************************
+
+    def matchContexts(self,db,candidates):
+        """
+        Returns the MatchContext of each candidate with matches, ready to be written.
+        """
+
+        outputFile = self.output()
+        contexts = []
+
+        for candidate in candidates:
+            context = MatchContext(outputFile)
+            db.match(candidate, outputFile, context=context)
+            if(context.possibleMatches > 0):
+                contexts.append(context)
+
+        return contexts
+
+    # ****************************************************************************************************
+
+    def copyContexts(self,contexts):
+        """
+        Returns copies of the MatchContexts given, so each run writes the same records.
+        """
+
+        self.output()
+        copies = []
+
+        for context in contexts:
+            copy = MatchContext(context.outputFile)
+            copy.text = list(context.text)
+            copy.csv = list(context.csv)
+            copy.positions = list(context.positions)
+            copy.possibleMatches = context.possibleMatches
+            copies.append(copy)
+
+        return copies
+
+    # ****************************************************************************************************
+
+    def write(self,contexts):
+        """
+        Writes the matches held in each MatchContext, formatting the candidate positions
+        of them all in one batch first, as InputProcessor.processBatch() does.
+
+        Returns:
+        The number of matches written.
+        """
+
+        render(contexts)
+        written = 0
+
+        for context in contexts:
+            written += context.write()
+
+        return written
+
+    # ****************************************************************************************************
+
+    def environment(self):
+        """
+        Describes the machine and software the benchmark ran on.
+        """
+
+        import numpy
+
+        return {"python": platform.python_version(), "numpy": numpy.__version__,
+                "platform": platform.platform(), "machine": platform.machine(),
+                "processor": platform.processor(), "date": time.strftime("%Y-%m-%dT%H:%M:%S")}
+
+    # ****************************************************************************************************
+
+# ******************************
+#
+# MODULE FUNCTIONS.
+#
+# ******************************
+
+def median(values):
+    """
+    Returns the median of a list of numbers.
+    """
+
+    values = sorted(values)
+    middle = len(values) // 2
+
+    if(len(values) % 2 == 1):
+        return values[middle]
+
+    return (values[middle - 1] + values[middle]) / 2.0
+
+# ******************************
+
+def quietly(function,*args):
+    """
+    Calls a function with standard output discarded, as parsing the catalog prints
+    a summary of the sources found.
+    """
+
+    stdout = sys.stdout
+    devnull = open(os.devnull, "w")
+    sys.stdout = devnull
+
+    try:
+        return function(*args)
+    finally:
+        sys.stdout = stdout
+        devnull.close()
+
+# ******************************
+
+if __name__ == '__main__':
+    Benchmark().main()
@@ -0,0 +1,146 @@
+"""
+This file is part of the KnownSourceMatcher.
+
+KnownSourceMatcher is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+KnownSourceMatcher is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with KnownSourceMatcher.  If not, see <http://www.gnu.org/licenses/>.
+
+File name:    Candidate.py
+Created:      October 19th, 2026
+
+This code runs on python 2.4 or later.
+
+Represents a single pulsar candidate extracted from a PHCX or PFD file.
+Candidates used to be stored as KnownSource objects, built by concatenating
+strings such as "DM    " + str(DM) + "    0" which were then split apart again
+by KnownSource.addParameter(), and parsed back to floats by the matcher. This
+record instead holds the numeric values directly. The position is held in
+degrees, and is only formatted as HH:MM:SS / DD:MM:SS when written out.
+
+"""
+
+import Coordinates
+
+# ******************************
+#
+# CLASS DEFINITION
+#
+# ******************************
+
+class Candidate(object):
+    """
+    A lightweight record describing a candidate. The __slots__ declaration
+    stops a per-instance dictionary being created, which keeps the memory
+    footprint small when many millions of candidates are processed.
+
+    The sort attribute is computed once, when the record is created, so that
+    it agrees with the value computed for known sources in the catalog (see
+    KnownSource.updateSortAttribute() and Coordinates.sortAttribute()).
+
+    """
+
+    __slots__ = ('name','ra','dec','period','DM','SNR','sortAttribute')
+
+    # ******************************
+    #
+    # INIT FUNCTION
+    #
+    # ******************************
+    def __init__(self,name,ra,dec,period,DM,SNR=0.0):
+        """
+        Initialises the record.
+
+        Parameters:
+        name     -    the name of the candidate, typically the file path.
+        ra       -    the right ascension in degrees (float), or None if unknown.
+        dec      -    the declination in degrees (float), or None if unknown.
+        period   -    the period in seconds (float), or None if unknown.
+        DM       -    the dispersion measure (float), or None if unknown.
+        SNR      -    the signal to noise ratio (float).
+
+        """
+        self.name   = name
+        self.ra     = ra
+        self.dec    = dec
+        self.period = period
+        self.DM     = DM
+        self.SNR    = SNR
+        self.sortAttribute = Coordinates.sortAttribute(ra,dec)
+
+    # ******************************
+    #
+    # UTILITY FUNCTIONS.
+    #
+    # ******************************
+
+    def getRAJ(self):
+        """
+        Returns the right ascension formatted as HH:MM:SS.sss, or "*" if unknown.
+        """
+        return Coordinates.RAToString(self.ra)
+
+    def getDECJ(self):
+        """
+        Returns the declination formatted as DD:MM:SS.ss, or "*" if unknown.
+        """
+        return Coordinates.DECToString(self.dec)
+
+    # ******************************
+
+    def __str__(self):
+        """
+        Overridden method that provides a neater string representation
+        of this class, matching that produced by KnownSource.
+
+        """
+        return self.name + "," + self.getRAJ() + "," + self.getDECJ() + "," + str(self.period) + "," + str(self.DM) + "," + str(self.sortAttribute)
+
+    # ******************************
+
+# ******************************
+#
+# MODULE FUNCTIONS.
+#
+# ******************************
+
+def toFloat(value):
+    """
+    Converts a catalog style parameter string to a float. Returns None
+    if the parameter is missing, or holds a placeholder such as "*".
+
+    """
+
+    if(value is None):
+        return None
+
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+# ******************************
+
+def fromKnownSource(source):
+    """
+    Builds a Candidate record from a KnownSource object. This is used when
+    catalog entries are themselves treated as candidates, i.e. during validation.
+
+    """
+
+    return Candidate(source.sourceName,
+                     source.ra,
+                     source.dec,
+                     toFloat(source.getParameterAtIndex("P0",0)),
+                     toFloat(source.getParameterAtIndex("DM",0)),
+                     toFloat(source.getParameterAtIndex("SNR",0)) or 0.0)
+
+# ******************************
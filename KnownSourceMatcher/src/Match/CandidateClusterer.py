@@ -0,0 +1,259 @@
+"""
+This file is part of the KnownSourceMatcher.
+
+KnownSourceMatcher is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+KnownSourceMatcher is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with KnownSourceMatcher.  If not, see <http://www.gnu.org/licenses/>.
+
+File name:    CandidateClusterer.py
+Created:      October 19th, 2026
+
+This code runs on python 2.4 or later.
+
+"""
+
+import math
+import Coordinates
+from Utilities import Utilities
+
+# ******************************
+#
+# CLASS DEFINITION
+#
+# ******************************
+
+class CandidateClusterer(Utilities):
+    """
+    Groups near-identical candidates before they are matched. A single physical
+    source often appears as many candidates, detected in adjacent beams, at
+    harmonically related periods and at neighbouring DM trials. Two candidates
+    are placed in the same group if:
+
+    1. They are separated by less than the cluster radius (in degrees) on the sky.
+
+    2. The period of one is within the period accuracy of a harmonic multiple of
+       the other, where the harmonics considered are those used by the matcher
+       (i.e. 1, 1/2, 2, 1/4, 4 and so on).
+
+    3. Their DMs agree to within the same percentage accuracy.
+
+    Candidates are visited in order of decreasing SNR, so the brightest candidate
+    in each group is its representative. Each subsequent candidate is compared only
+    to representatives found nearby, using a spatial and period index. The spatial
+    part divides the unit sphere into cubes, with sides equal to the chord length
+    spanned by the cluster radius, so that all neighbours of a candidate lie in the
+    27 cubes around it. Within each cube representatives are bucketed by log(period),
+    so that for every harmonic ratio only three buckets need to be inspected.
+
+    """
+
+    # ******************************
+    #
+    # INIT FUNCTION
+    #
+    # ******************************
+    def __init__(self,debugFlag,radius,accuracy,harmonics):
+        """
+        Initialises the class.
+
+        Parameters:
+        debugFlag    -    the debugging flag.
+        radius       -    the maximum separation in degrees between members of a group.
+        accuracy     -    the percentage accuracy used to compare periods and DMs.
+        harmonics    -    the list of harmonics used by the matcher, i.e. [1, 0.5, 0.3, 0.25 ...].
+
+        """
+        Utilities.__init__(self,debugFlag)
+        self.radius = float(radius)
+        self.accuracy = float(accuracy)/100
+
+        # Period ratios between members and their representative. Both
+        # directions are needed, as the representative may be a harmonic.
+        self.ratios = []
+        for h in harmonics:
+            for r in (float(h), 1.0/float(h)):
+                if(r not in self.ratios):
+                    self.ratios.append(r)
+
+        # Side length of the cubes used by the spatial index.
+        self.cellSize = 2.0 * math.sin(math.radians(self.radius) / 2.0)
+
+        # Width of the log(period) buckets.
+        self.binWidth = max(math.log1p(self.accuracy), 1.0e-9)
+
+    # ******************************
+    #
+    # FUNCTIONS.
+    #
+    # ******************************
+
+    def cluster(self,candidates):
+        """
+        Groups the supplied candidates.
+
+        Parameters:
+        candidates    -    a list of Candidate records.
+
+        Returns:
+        A list of groups, in the order the representatives appear in the input.
+        Each group is a list of (Candidate, ratio) tuples, where ratio is the harmonic
+        ratio between the period of the member and that of the representative (i.e. 2
+        if the member has twice the period). The representative is the first entry in
+        each group, with a ratio of 1.
+        """
+
+        index = {}
+        groups = []
+        groupOf = {}
+
+        order = sorted(range(len(candidates)), key=lambda i: -candidates[i].SNR)
+
+        for i in order:
+            candidate = candidates[i]
+            cell = self.cellFor(candidate)
+            found = None
+
+            # Candidates without a period are never grouped.
+            usable = candidate.period is not None and candidate.period > 0
+
+            if(usable):
+                found = self.findRepresentative(index,cell,candidate)
+
+            if(found is None):
+                groupOf[i] = len(groups)
+                groups.append([(candidate,1.0)])
+
+                if(usable):
+                    self.insert(index,cell,candidate,groupOf[i])
+            else:
+                group, ratio = found
+                groups[group].append((candidate,ratio))
+
+        # Restore the original input order of the representatives, so that
+        # the output is as close as possible to that produced without clustering.
+        first = {}
+        for i in range(len(candidates)):
+            if(i in groupOf):
+                first[groupOf[i]] = i
+
+        return [groups[g] for g in sorted(first.keys(), key=lambda g: first[g])]
+
+    # ****************************************************************************************************
+
+    def cellFor(self,candidate):
+        """
+        Returns the cube of the spatial index containing the candidate, or the
+        key (None,None,None) for candidates without a position. These can only
+        be grouped with other candidates without a position.
+        """
+
+        if(not Coordinates.hasPosition(candidate.ra,candidate.dec)):
+            return (None,None,None)
+
+        ra = math.radians(candidate.ra)
+        dec = math.radians(candidate.dec)
+
+        x = math.cos(dec) * math.cos(ra)
+        y = math.cos(dec) * math.sin(ra)
+        z = math.sin(dec)
+
+        return (int(math.floor(x / self.cellSize)), int(math.floor(y / self.cellSize)), int(math.floor(z / self.cellSize)))
+
+    # ****************************************************************************************************
+
+    def periodBin(self,period):
+        """
+        Returns the log(period) bucket that a period falls in.
+        """
+        return int(math.floor(math.log(period) / self.binWidth))
+
+    # ****************************************************************************************************
+
+    def insert(self,index,cell,candidate,group):
+        """
+        Adds a new representative to the index.
+        """
+        buckets = index.setdefault(cell,{})
+        buckets.setdefault(self.periodBin(candidate.period),[]).append((candidate,group))
+
+    # ****************************************************************************************************
+
+    def neighbouringCells(self,cell):
+        """
+        Returns the cells that could contain candidates within the cluster radius.
+        """
+
+        if(cell[0] is None):
+            return [cell]
+
+        cells = []
+        for dx in (-1,0,1):
+            for dy in (-1,0,1):
+                for dz in (-1,0,1):
+                    cells.append((cell[0]+dx,cell[1]+dy,cell[2]+dz))
+        return cells
+
+    # ****************************************************************************************************
+
+    def findRepresentative(self,index,cell,candidate):
+        """
+        Looks for an existing representative that the candidate duplicates.
+
+        Returns:
+        A (group, ratio) tuple, or None if the candidate starts a new group.
+        """
+
+        acc = self.accuracy * candidate.period
+
+        for neighbour in self.neighbouringCells(cell):
+
+            buckets = index.get(neighbour)
+            if(buckets is None):
+                continue
+
+            for ratio in self.ratios:
+
+                b = self.periodBin(candidate.period / ratio)
+
+                for key in (b-1,b,b+1):
+                    for representative, group in buckets.get(key,()):
+
+                        # The candidate period should be close to the
+                        # representative's period times the ratio.
+                        if(abs(candidate.period - representative.period * ratio) >= acc):
+                            continue
+
+                        if(not self.similarDM(candidate,representative)):
+                            continue
+
+                        if(cell[0] is not None and\
+                           Coordinates.separation(candidate.ra,candidate.dec,representative.ra,representative.dec) >= self.radius):
+                            continue
+
+                        return (group, ratio)
+
+        return None
+
+    # ****************************************************************************************************
+
+    def similarDM(self,a,b):
+        """
+        Checks whether the DMs of two candidates agree, using the same percentage
+        accuracy as the periods. If either DM is unknown they are assumed to agree.
+        """
+
+        if(a.DM is None or b.DM is None or a.DM == 0 or b.DM == 0):
+            return True
+
+        return abs(a.DM - b.DM) < self.accuracy * a.DM
+
+    # ****************************************************************************************************
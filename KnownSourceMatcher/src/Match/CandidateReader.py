@@ -0,0 +1,166 @@
+"""
+This file is part of the KnownSourceMatcher.
+
+KnownSourceMatcher is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+KnownSourceMatcher is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with KnownSourceMatcher.  If not, see <http://www.gnu.org/licenses/>.
+
+File name:    CandidateReader.py
+Created:      October 19th, 2026
+
+This code runs on python 2.4 or later.
+
+"""
+
+import gzip, os
+import Coordinates, Instrumentation, Logger
+import PFDFile as pfd
+from Candidate import Candidate
+from Utilities import Utilities
+from xml.dom import minidom
+
+# ******************************
+#
+# CLASS DEFINITION
+#
+# ******************************
+
+class CandidateReader(Utilities):
+    """
+    Extracts the parameters of a candidate from a PHCX or PFD file, and
+    returns them as a Candidate record. Used by both the standard and the
+    interactive matching modes.
+
+    """
+
+    # ******************************
+    #
+    # INIT FUNCTION
+    #
+    # ******************************
+    def __init__(self,debugFlag):
+        """
+        Initialises the class.
+
+        """
+        Utilities.__init__(self,debugFlag)
+
+    # ******************************
+    #
+    # FUNCTIONS.
+    #
+    # ******************************
+
+    def isCandidateFile(self,path):
+        """
+        Returns True if the supplied path describes a candidate file
+        this class can read, else False.
+
+        """
+        return path.endswith('.phcx.gz') or path.endswith('.pfd')
+
+    # ****************************************************************************************************
+
+    def read(self,path):
+        """
+        Reads the candidate at the supplied path, choosing the correct
+        method according to the file extension.
+
+        Parameters:
+        path    -    the path to the candidate file.
+
+        Returns:
+        A Candidate record, or None if the file type is not recognised.
+        """
+        if(path.endswith('.phcx.gz')):
+            return self.readPHCX(path)
+        elif(path.endswith('.pfd')):
+            return self.readPFD(path)
+        else:
+            return None
+
+    # ****************************************************************************************************
+
+    def readPHCX(self,path):
+        """
+        Reads a candidate from a ".phcx.gz" file. Each ".phcx.gz" file is a
+        compressed XML file, so here we use XML parsing modules to extract the
+        candidate parameters.
+        """
+        Logger.logger.debug("Processing PHCX file at: %s\n", path)
+
+        token = Instrumentation.stats.start("decode")
+
+        contents = gzip.open(path,'rb')
+        xmldata = minidom.parse(contents)
+        contents.close()
+
+        # Build candidate by extracting data from .phcx file.
+        period = float(xmldata.getElementsByTagName('BaryPeriod')[1].childNodes[0].data)
+        RAJ = xmldata.getElementsByTagName('RA')[0].childNodes[0].data
+        DECJ = xmldata.getElementsByTagName('Dec')[0].childNodes[0].data
+        DM = float(xmldata.getElementsByTagName('Dm')[1].childNodes[0].data)
+        SNR = float(xmldata.getElementsByTagName('Snr')[1].childNodes[0].data)
+
+        Instrumentation.stats.stop("decode:phcx",token,bytes=os.path.getsize(path))
+
+        return self.buildCandidate(path,RAJ,DECJ,period,DM,SNR)
+
+    # ****************************************************************************************************
+
+    def readPFD(self,path):
+        """
+        Reads a candidate from a ".pfd" file.
+        """
+        Logger.logger.debug("Processing PFD file at: %s\n", path)
+
+        token = Instrumentation.stats.start("decode")
+
+        cand = pfd.PFD(self.debug,path)
+        cand.load()
+
+        # Build candidate by extracting data from .pfd file.
+        period = float(cand.getPeriod())
+        RAJ = cand.getRA()
+        DECJ = cand.getDEC()
+        DM = cand.getDM()
+        SNR = cand.getSNR()
+
+        Instrumentation.stats.stop("decode:pfd",token,bytes=os.path.getsize(path))
+
+        return self.buildCandidate(path,RAJ,DECJ,period,DM,SNR)
+
+    # ****************************************************************************************************
+
+    def buildCandidate(self,path,RAJ,DECJ,period,DM,SNR):
+        """
+        Builds the Candidate record.
+
+        Here there are two possible cases to watch out for. Either RAJ and DECJ
+        are sexagesimal strings (PFD files), or they are numerical values in degrees
+        (PHCX files). Either way the position is stored in degrees, so that no
+        precision is lost converting to and from strings.
+        """
+
+        if (isinstance(RAJ, str)):
+            ra = Coordinates.parseRA(RAJ)
+            dec = Coordinates.parseDEC(DECJ)
+        else:
+            ra = float(RAJ)
+            dec = float(DECJ)
+
+        # DEBUGGING
+        Logger.logger.debug("Candidate -> %s Period = %s RA = %s DEC = %s DM = %s", path, period, ra, dec, DM)
+
+        return Candidate(path,ra,dec,float(period),float(DM),float(SNR))
+
+    # ****************************************************************************************************
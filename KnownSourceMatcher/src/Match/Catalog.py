@@ -0,0 +1,203 @@
+"""
+This file is part of the KnownSourceMatcher.
+
+KnownSourceMatcher is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+KnownSourceMatcher is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with KnownSourceMatcher.  If not, see <http://www.gnu.org/licenses/>.
+
+File name:    Catalog.py
+Created:      October 19th, 2026
+
+This code runs on python 2.4 or later.
+
+"""
+
+import numpy as np
+import Candidate
+
+# ******************************
+#
+# CLASS DEFINITION
+#
+# ******************************
+
+class Catalog(object):
+    """
+    A column oriented copy of the known sources held by KnownSourceDB. Each
+    parameter used during matching is stored in its own numpy array, indexed
+    in the same order as KnownSourceDB.orderedAccess (i.e. by sort attribute),
+    so index i in every array describes the known source orderedAccess[i].
+
+    Missing numerical values are stored as NaN. The period column is derived
+    from F0 when a source has no P0, just as compareCandidateToKnownSources()
+    has always done.
+
+    Further orderings, by declination (decOrder), period (periodOrder) and DM
+    (dmOrder), are also kept. Sources missing the value in question are left
+    out of each ordering. The period and DM orderings allow range queries via
+    periodRange() and dmRange().
+
+    """
+
+    # ******************************
+    #
+    # INIT FUNCTION
+    #
+    # ******************************
+    def __init__(self,sources):
+        """
+        Builds the columns.
+
+        Parameters:
+        sources    -    the list of KnownSource objects, in sort attribute order.
+
+        """
+
+        self.sources = list(sources)
+        count = len(self.sources)
+
+        self.names = np.array([s.sourceName for s in self.sources], dtype=object)
+        self.RAJ   = np.array([s.getParameterAtIndex("RAJ",0) or "*" for s in self.sources], dtype=object)
+        self.DECJ  = np.array([s.getParameterAtIndex("DECJ",0) or "*" for s in self.sources], dtype=object)
+
+        # The catalogs each source was read from, see KnownSource.getProvenance().
+        # Held as fixed width strings, so that they can be memory mapped.
+        self.provenance = np.array([s.getProvenance() for s in self.sources], dtype=str)
+
+        self.ra   = np.empty(count)
+        self.dec  = np.empty(count)
+        self.p0   = np.empty(count)
+        self.dm   = np.empty(count)
+        self.sort = np.empty(count, dtype=np.int64)
+
+        for i in range(count):
+            s = self.sources[i]
+            self.ra[i]   = np.nan if s.ra is None else s.ra
+            self.dec[i]  = np.nan if s.dec is None else s.dec
+            self.p0[i]   = self.period(s)
+            self.dm[i]   = self.toNumber(s.getParameterAtIndex("DM",0))
+            self.sort[i] = s.sortAttribute
+
+        positioned = np.flatnonzero(~np.isnan(self.ra) & ~np.isnan(self.dec))
+        self.decOrder = positioned[np.argsort(self.dec[positioned], kind='mergesort')]
+        self.sortedDec = self.dec[self.decOrder]
+
+        self.periodOrder, self.sortedPeriod = self.ordering(self.p0)
+        self.dmOrder, self.sortedDM = self.ordering(self.dm)
+
+    # ******************************
+    #
+    # FUNCTIONS.
+    #
+    # ******************************
+
+    def __len__(self):
+        """
+        Returns the number of known sources in the catalog.
+        """
+        return len(self.sources)
+
+    # ****************************************************************************************************
+
+    def ordering(self,column):
+        """
+        Sorts the known sources with a value in the supplied column.
+
+        Returns:
+        A (order, values) tuple, where order lists the positions of the sources
+        in increasing order of value, and values holds the sorted values.
+        """
+        known = np.flatnonzero(~np.isnan(column))
+        order = known[np.argsort(column[known], kind='mergesort')]
+        return (order, column[order])
+
+    # ****************************************************************************************************
+
+    def between(self,order,values,low,high):
+        """
+        Finds the sources with a value in the inclusive range low to high, using
+        one of the orderings above.
+
+        Returns:
+        A sorted numpy array of the positions of the sources found.
+        """
+        start = np.searchsorted(values, low, side='left')
+        end = np.searchsorted(values, high, side='right')
+        return np.sort(order[start:end])
+
+    # ****************************************************************************************************
+
+    def periodRange(self,low,high):
+        """
+        Returns the positions of the sources with a period between low and high (inclusive).
+        """
+        return self.between(self.periodOrder,self.sortedPeriod,low,high)
+
+    # ****************************************************************************************************
+
+    def dmRange(self,low,high):
+        """
+        Returns the positions of the sources with a DM between low and high (inclusive).
+        """
+        return self.between(self.dmOrder,self.sortedDM,low,high)
+
+    # ****************************************************************************************************
+
+    def toNumber(self,value):
+        """
+        Converts a parameter string to a float, returning NaN if it is missing.
+        """
+        value = Candidate.toFloat(value)
+
+        if(value is None):
+            return np.nan
+        return value
+
+    # ****************************************************************************************************
+
+    def period(self,source):
+        """
+        Returns the period of a known source, derived from F0 if P0 is missing.
+        """
+
+        p0 = self.toNumber(source.getParameterAtIndex("P0",0))
+
+        if(np.isnan(p0)):
+            f0 = self.toNumber(source.getParameterAtIndex("F0",0))
+            if(not np.isnan(f0) and f0 != 0):
+                p0 = 1.0 / f0
+
+        return p0
+
+    # ****************************************************************************************************
+
+# ******************************
+#
+# MODULE FUNCTIONS.
+#
+# ******************************
+
+def readOnly(columns):
+    """
+    Marks every numpy array held by an object (i.e. a Catalog or one of the indexes
+    built over it) as read only. Any attempt to modify the arrays then raises an error,
+    which guarantees they can be shared safely between threads.
+
+    Parameters:
+    columns    -    the object holding the arrays.
+    """
+
+    for value in vars(columns).values():
+        if(isinstance(value, np.ndarray)):
+            value.setflags(write=False)
+
+# ******************************
@@ -0,0 +1,181 @@
+"""
+This file is part of the KnownSourceMatcher.
+
+KnownSourceMatcher is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+KnownSourceMatcher is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with KnownSourceMatcher.  If not, see <http://www.gnu.org/licenses/>.
+
+File name:    CatalogReloader.py
+Created:      October 19th, 2026
+
+This code runs on python 2.4 or later.
+
+"""
+
+import datetime, threading
+import Instrumentation
+from Utilities import Utilities
+
+# ******************************
+#
+# CLASS DEFINITION
+#
+# ******************************
+
+class CatalogReloader(Utilities):
+    """
+    Keeps a KnownSourceDB up to date with its catalog files, i.e. as new discoveries
+    are scraped into them while a directory is watched. A background thread checks
+    the files every interval (see KnownSourceDB.hasChanged()). Once a change has
+    settled, a new KnownSourceDB is parsed, with every index built, by that same thread.
+    Matching carries on against the current KnownSourceDB in the meantime.
+
+    The new KnownSourceDB is only handed over by swap(), which the owner calls between
+    batches. So a batch in progress never sees a partly built index, and matching
+    never has to stop while the catalog is rebuilt.
+
+    """
+
+    # ******************************
+    #
+    # INIT FUNCTION
+    #
+    # ******************************
+    def __init__(self,debugFlag,db,interval):
+        """
+        Initialises the class.
+
+        Parameters:
+        debugFlag    -    the debugging flag.
+        db           -    the parsed KnownSourceDB in use.
+        interval     -    the time between checks of the catalog files in seconds.
+
+        """
+        Utilities.__init__(self,debugFlag)
+        self.db = db
+        self.interval = float(interval)
+
+        # A newly built KnownSourceDB, waiting to be swapped in.
+        self.ready = None
+        self.reloads = 0
+
+        self.lock = threading.Lock()
+        self.stopping = threading.Event()
+        self.thread = None
+
+    # ******************************
+    #
+    # FUNCTIONS.
+    #
+    # ******************************
+
+    def start(self):
+        """
+        Starts checking the catalog files in the background.
+        """
+
+        if(self.thread is None):
+            self.thread = threading.Thread(target=self.run)
+            self.thread.setDaemon(True)
+            self.thread.start()
+
+    # ****************************************************************************************************
+
+    def stop(self):
+        """
+        Stops checking the catalog files, waiting for any rebuild in progress to finish.
+        """
+
+        self.stopping.set()
+
+        if(self.thread is not None):
+            self.thread.join()
+            self.thread = None
+
+    # ****************************************************************************************************
+
+    def run(self):
+        """
+        The body of the background thread.
+        """
+
+        while(not self.stopping.isSet()):
+            self.stopping.wait(self.interval)
+
+            if(not self.stopping.isSet()):
+                self.check()
+
+    # ****************************************************************************************************
+
+    def check(self):
+        """
+        Checks the catalog files once, and rebuilds the catalog if they have changed.
+        Only the background thread calls this, so only it ever touches self.db.
+
+        Returns:
+        True if a new KnownSourceDB was built, else False.
+        """
+
+        if(not self.db.hasChanged()):
+            return False
+
+        print "\nCatalog changed, rebuilding it in the background"
+
+        start = datetime.datetime.now()
+        token = Instrumentation.stats.start("load")
+
+        # A file caught part way through being written may not parse at all.
+        try:
+            try:
+                db = self.db.reload()
+            except Exception, e:
+                print "Catalog rebuild failed (", e, "), still using the previous catalog."
+                return False
+        finally:
+            Instrumentation.stats.stop("load",token,bytes=self.db.getSize())
+
+        if(db is None):
+            print "Catalog rebuild failed, still using the previous catalog."
+            return False
+
+        self.lock.acquire()
+        try:
+            self.db = db
+            self.ready = db
+            self.reloads += 1
+        finally:
+            self.lock.release()
+
+        print "Catalog rebuilt, time taken: ", str(datetime.datetime.now() - start)
+
+        return True
+
+    # ****************************************************************************************************
+
+    def swap(self):
+        """
+        Hands over a newly built KnownSourceDB. Called by the owner between batches.
+
+        Returns:
+        The KnownSourceDB built since the last call, or None if there isn't one.
+        """
+
+        self.lock.acquire()
+        try:
+            db = self.ready
+            self.ready = None
+        finally:
+            self.lock.release()
+
+        return db
+
+    # ****************************************************************************************************
@@ -0,0 +1,217 @@
+"""
+This file is part of the KnownSourceMatcher.
+
+KnownSourceMatcher is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+KnownSourceMatcher is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with KnownSourceMatcher.  If not, see <http://www.gnu.org/licenses/>.
+
+File name:    CatalogSnapshot.py
+Created:      October 19th, 2026
+
+This code runs on python 2.4 or later.
+
+"""
+
+import gc, os, shutil, tempfile
+import numpy as np
+import Coordinates, HarmonicIndex
+from Utilities import Utilities
+
+# ******************************
+#
+# CLASS DEFINITION
+#
+# ******************************
+
+class CatalogSnapshot(Utilities):
+    """
+    Publishes the numerical columns of a loaded catalog, and the harmonic index built
+    over them, as a set of .npy files. Worker processes attach to these using memory
+    mapping (numpy's mmap_mode='r'), so every worker reads the same physical pages.
+    Nothing is parsed or copied, and the memory used by each worker stays flat no
+    matter how many workers run.
+
+    Workers only ever touch these arrays. They do the expensive part of matching,
+    finding the known sources close enough in both position and harmonic period
+    (see related()), and return source indices. The parent process, which holds
+    the KnownSource objects, applies the exact tests and writes the matches out.
+
+    """
+
+    # The arrays published from the Catalog and the HarmonicIndex, by name.
+    CATALOG_COLUMNS = ["ra", "dec", "p0", "provenance"]
+    INDEX_COLUMNS = ["values", "sources", "harmonic"]
+
+    # ******************************
+    #
+    # INIT FUNCTION
+    #
+    # ******************************
+    def __init__(self,debugFlag):
+        """
+        Initialises the class.
+
+        Parameters:
+        debugFlag    -    the debugging flag.
+
+        """
+        Utilities.__init__(self,debugFlag)
+        self.directory = None
+        self.owner = False
+
+    # ******************************
+    #
+    # FUNCTIONS.
+    #
+    # ******************************
+
+    def publish(self,db,directory=None):
+        """
+        Writes the snapshot of a parsed KnownSourceDB.
+
+        Parameters:
+        db           -    the parsed KnownSourceDB.
+        directory    -    the directory to write to (optional). If not supplied a temporary
+                          directory is created, which is removed again by release().
+
+        Returns:
+        The directory written to.
+        """
+
+        if(directory is None):
+            directory = tempfile.mkdtemp(prefix="catalog_snapshot_")
+            self.owner = True
+        elif(not os.path.isdir(directory)):
+            os.makedirs(directory)
+
+        for name in self.CATALOG_COLUMNS:
+            np.save(os.path.join(directory, "catalog_" + name + ".npy"), np.ascontiguousarray(getattr(db.catalog, name)))
+
+        for name in self.INDEX_COLUMNS:
+            np.save(os.path.join(directory, "harmonic_" + name + ".npy"), np.ascontiguousarray(getattr(db.harmonicIndex, name)))
+
+        np.save(os.path.join(directory, "harmonics.npy"), np.array(db.harmonics, dtype=np.float64))
+        np.save(os.path.join(directory, "settings.npy"), np.array([float(db.accuracy), float(db.radius)]))
+
+        self.directory = directory
+        self.o("Catalog snapshot written to: " + directory)
+
+        return directory
+
+    # ****************************************************************************************************
+
+    def attach(self,directory):
+        """
+        Attaches to a published snapshot, memory mapping each of its arrays read only.
+
+        Parameters:
+        directory    -    the directory the snapshot was published to.
+        """
+
+        self.directory = directory
+
+        for name in self.CATALOG_COLUMNS:
+            setattr(self, name, np.load(os.path.join(directory, "catalog_" + name + ".npy"), mmap_mode='r'))
+
+        index = [np.load(os.path.join(directory, "harmonic_" + name + ".npy"), mmap_mode='r') for name in self.INDEX_COLUMNS]
+
+        # The worker only needs the position of each harmonic, not its value.
+        harmonics = np.load(os.path.join(directory, "harmonics.npy"))
+        self.harmonicIndex = HarmonicIndex.fromArrays(range(len(harmonics)), *index)
+
+        self.accuracy, self.radius = [float(x) for x in np.load(os.path.join(directory, "settings.npy"))]
+
+    # ****************************************************************************************************
+
+    def related(self,ra,dec,period):
+        """
+        Finds the known sources within the search radius of a candidate, with a harmonic
+        period within the period accuracy of the candidate period. These are the only
+        sources that can match the candidate, the exact conditions are left to the caller.
+
+        Parameters:
+        ra        -    the candidate right ascension in degrees.
+        dec       -    the candidate declination in degrees.
+        period    -    the candidate period in seconds.
+
+        Returns:
+        A list of (source index, [harmonic position, ...], theta) tuples in catalog order,
+        where each harmonic position is an index into the harmonics of the KnownSourceDB.
+        None is returned for a candidate without a position, which must instead be
+        compared to the catalog as usual.
+        """
+
+        if(not Coordinates.hasPosition(ra,dec)):
+            return None
+
+        if(period is None or period <= 0):
+            return []
+
+        acc = (self.accuracy/100) * period
+        found = self.harmonicIndex.query(period,acc)
+
+        if(len(found) == 0):
+            return []
+
+        indices = np.array([index for index, harmonics in found], dtype=np.int64)
+        theta = Coordinates.separations(ra, dec, self.ra[indices], self.dec[indices])
+
+        return [(found[i][0], found[i][1], float(theta[i])) for i in range(len(found)) if theta[i] < self.radius]
+
+    # ****************************************************************************************************
+
+    def release(self):
+        """
+        Removes the snapshot files, if they were written to a temporary directory.
+        """
+
+        if(self.owner and self.directory is not None and os.path.isdir(self.directory)):
+            shutil.rmtree(self.directory, True)
+            self.directory = None
+
+    # ****************************************************************************************************
+
+# ******************************
+#
+# WORKER PROCESS FUNCTIONS.
+#
+# ******************************
+
+# The snapshot attached to by a worker process.
+worker = None
+
+def attachWorker(directory):
+    """
+    Initialises a worker process, by attaching it to a published snapshot.
+
+    A forked worker shares the parent's Python objects (i.e. the parsed KnownSource
+    records) copy on write. The garbage collector is disabled in the worker, as its
+    traversals would touch every one of those objects, and so copy them all.
+    """
+
+    global worker
+
+    gc.disable()
+
+    worker = CatalogSnapshot(False)
+    worker.attach(directory)
+
+# ******************************
+
+def relatedSources(candidates):
+    """
+    Runs CatalogSnapshot.related() in a worker process, for a list of (ra, dec, period)
+    tuples, returning a list of the results.
+    """
+    return [worker.related(ra,dec,period) for ra, dec, period in candidates]
+
+# ******************************
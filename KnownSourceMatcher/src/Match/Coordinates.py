@@ -0,0 +1,259 @@
+"""
+This file is part of the KnownSourceMatcher.
+
+KnownSourceMatcher is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+KnownSourceMatcher is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with KnownSourceMatcher.  If not, see <http://www.gnu.org/licenses/>.
+
+File name:    Coordinates.py
+Created:      October 19th, 2026
+
+This code runs on python 2.4 or later.
+
+Functions for working with equatorial coordinates. Candidate and known source
+positions are held as numbers (RA and DEC both in degrees) from the moment they
+are read, until they are written out. Conversion to the sexagesimal HH:MM:SS
+and DD:MM:SS formats only happens at output time, and the formatters below work
+on whole numpy arrays so that a batch of positions can be formatted in one go.
+
+"""
+
+import math
+import numpy as np
+
+# ******************************
+#
+# PARSING FUNCTIONS.
+#
+# ******************************
+
+def parseSexagesimal(text):
+    """
+    Converts a string of the form XX:MM:SS.ss, XX:MM or XX to a signed
+    decimal value expressed in units of XX. The sign applies to the whole
+    value, so "-00:30:00" is -0.5 rather than +0.5.
+
+    Parameters:
+    text    -    the string to convert.
+
+    Returns:
+    The decimal value, or None if the string cannot be parsed.
+    """
+
+    if(text is None):
+        return None
+
+    text = str(text).strip()
+    negative = text.startswith("-")
+    components = text.lstrip("+-").split(":")
+
+    try:
+        value = 0.0
+        scale = 1.0
+        for c in components[:3]:
+            value += float(c) / scale
+            scale *= 60.0
+    except ValueError:
+        return None
+
+    if(negative):
+        return -value
+    else:
+        return value
+
+# ******************************
+
+def parseRA(text):
+    """
+    Converts a right ascension string HH:MM:SS.ss to degrees.
+    Returns None if the string cannot be parsed.
+    """
+
+    hours = parseSexagesimal(text)
+
+    if(hours is None):
+        return None
+    else:
+        return hours * 15.0
+
+# ******************************
+
+def parseDEC(text):
+    """
+    Converts a declination string DD:MM:SS.ss to degrees.
+    Returns None if the string cannot be parsed.
+    """
+
+    return parseSexagesimal(text)
+
+# ******************************
+#
+# FORMATTING FUNCTIONS.
+#
+# ******************************
+
+def formatSexagesimal(values,places,wrap=None):
+    """
+    Formats an array of decimal values as XX:MM:SS.ss strings. The work is done
+    using integer arithmetic on whole arrays, so that seconds which round up to
+    60 correctly carry into the minutes and the first component.
+
+    Parameters:
+    values    -    a numpy array (or sequence) of decimal values.
+    places    -    the number of decimal places to give the seconds.
+    wrap      -    if supplied, the value at which the first component wraps
+                   back to zero (i.e. 24 for hours of right ascension).
+
+    Returns:
+    A numpy array of strings, one per input value.
+    """
+
+    values = np.asarray(values,dtype=np.float64)
+    scale = 10 ** places
+
+    # Work in integer units of 10^-places seconds.
+    total = np.rint(np.abs(values) * 3600.0 * scale).astype(np.int64)
+
+    if(wrap is not None):
+        total = np.mod(total, int(wrap) * 3600 * scale)
+
+    first, remainder = np.divmod(total, 3600 * scale)
+    minutes, seconds = np.divmod(remainder, 60 * scale)
+    whole, fraction = np.divmod(seconds, scale)
+
+    sign = np.where(values < 0, "-", "")
+    text = np.char.add(sign, np.char.mod("%02d", first))
+    text = np.char.add(text, np.char.mod(":%02d", minutes))
+    text = np.char.add(text, np.char.mod(":%02d", whole))
+
+    if(places > 0):
+        text = np.char.add(text, np.char.mod(".%0" + str(places) + "d", fraction))
+
+    return text
+
+# ******************************
+
+def formatRA(values,places=3):
+    """
+    Formats an array of right ascension values in degrees as HH:MM:SS.sss strings.
+    """
+    return formatSexagesimal(np.mod(np.asarray(values,dtype=np.float64),360.0) / 15.0, places, 24)
+
+# ******************************
+
+def formatDEC(values,places=2):
+    """
+    Formats an array of declination values in degrees as DD:MM:SS.ss strings.
+    Positive declinations are given an explicit "+" sign, as in the ATNF catalog.
+    """
+    values = np.asarray(values,dtype=np.float64)
+    text = formatSexagesimal(values, places)
+    return np.char.add(np.where(values < 0, "", "+"), text)
+
+# ******************************
+
+def RAToString(value):
+    """
+    Formats a single right ascension in degrees. Returns "*" if the value is None.
+    """
+    if(value is None):
+        return "*"
+    return str(formatRA([value])[0])
+
+# ******************************
+
+def DECToString(value):
+    """
+    Formats a single declination in degrees. Returns "*" if the value is None.
+    """
+    if(value is None):
+        return "*"
+    return str(formatDEC([value])[0])
+
+# ******************************
+#
+# COMPARISON FUNCTIONS.
+#
+# ******************************
+
+def separation(ra1,dec1,ra2,dec2):
+    """
+    Calculates the angular separation in degrees between two points on the sky,
+    each described by an RA and DEC in degrees. Uses the same formula as the
+    original findAngularSep() code written by Ben Stappers.
+    """
+
+    r1 = math.radians(ra1)
+    d1 = math.radians(dec1)
+    r2 = math.radians(ra2)
+    d2 = math.radians(dec2)
+
+    numerator = math.sqrt( math.pow(math.cos(d2)*math.sin(r2-r1),2) + math.pow(math.cos(d1)*math.sin(d2)-math.sin(d1)*math.cos(d2)*math.cos(r2-r1),2) )
+    denominator = math.sin(d1)*math.sin(d2) + math.cos(d1)*math.cos(d2)*math.cos(r2-r1)
+
+    return math.degrees(math.atan2(numerator,denominator))
+
+# ******************************
+
+def separations(ra1,dec1,ra2,dec2):
+    """
+    Vectorised version of separation(). Any of the inputs may be numpy
+    arrays, in which case an array of separations in degrees is returned.
+    """
+
+    r1 = np.radians(ra1)
+    d1 = np.radians(dec1)
+    r2 = np.radians(ra2)
+    d2 = np.radians(dec2)
+
+    numerator = np.sqrt( (np.cos(d2)*np.sin(r2-r1))**2 + (np.cos(d1)*np.sin(d2)-np.sin(d1)*np.cos(d2)*np.cos(r2-r1))**2 )
+    denominator = np.sin(d1)*np.sin(d2) + np.cos(d1)*np.cos(d2)*np.cos(r2-r1)
+
+    return np.degrees(np.arctan2(numerator,denominator))
+
+# ******************************
+
+def hasPosition(ra,dec):
+    """
+    Returns True if a usable position has been supplied. A position of
+    exactly 00:00:00 00:00:00 is used as a placeholder for "unspecified", as
+    it has always been by this application. A declination of zero on its own
+    is a valid position, i.e. for observations along the celestial equator.
+    """
+    return ra is not None and dec is not None and not (ra == 0.0 and dec == 0.0)
+
+# ******************************
+
+def sortAttribute(ra,dec):
+    """
+    Computes the sort attribute described in KnownSource.updateSortAttribute()
+    directly from an RA and DEC in degrees. The result is the same as that
+    obtained by formatting the position as HH:MM:SS and DD:MM:SS strings, and
+    passing those to KnownSource.convert_RA_or_DEC_toInt(). Note that in that
+    procedure the sign of the declination applies to the degrees only.
+    """
+
+    if(ra is None or dec is None):
+        return 0
+
+    # A small tolerance stops values such as 34.99999999 seconds, which are
+    # produced by the conversion to degrees, from being floored to 34.
+    tolerance = 1.0e-6
+
+    raSeconds = int(math.floor(ra / 15.0 * 3600.0 + tolerance))
+
+    degrees = int(dec) # Truncates towards zero, just like int("-10").
+    decSeconds = degrees * 3600 + int(math.floor((abs(dec) - abs(degrees)) * 3600.0 + tolerance))
+
+    return raSeconds + decSeconds
+
+# ******************************
@@ -0,0 +1,563 @@
+"""
+This file is part of the KnownSourceMatcher.
+
+KnownSourceMatcher is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+KnownSourceMatcher is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with KnownSourceMatcher.  If not, see <http://www.gnu.org/licenses/>.
+
+File name:    Equivalence.py
+Created:      October 19th, 2026
+
+This code runs on python 2.4 or later.
+
+Runs the legacy matching path and the newer match engines side by side, on the same
+catalog and candidates, and reports any difference in the matches they find. For example,
+
+python Equivalence.py --psrcat ../../lib/psrcat_web.db -p ../../test/data/pfds
+
+or, using candidates written by SyntheticGenerator.py,
+
+python Equivalence.py --psrcat ../../lib/psrcat_web.db --csv synthetic.csv --limit 100000
+
+The tool exits with status 1 if any difference is found that is not whitelisted.
+
+"""
+
+# Command Line processing Imports:
+from optparse import OptionParser
+import fnmatch, json, os, sys, time
+
+# Custom file Imports:
+import Settings
+from CandidateClusterer import CandidateClusterer
+from CandidateReader import CandidateReader
+from CatalogSnapshot import CatalogSnapshot
+from KnownSourceDB import KnownSourceDB
+from MatchContext import MatchContext
+from NeighbourhoodCache import NeighbourhoodCache
+from SweepJoin import SweepJoin
+from Utilities import Utilities
+
+# ******************************
+#
+# CLASS DEFINITION
+#
+# ******************************
+
+class Equivalence(Utilities):
+    """
+    Compares the matches found by different match engines. The engines are:
+
+    legacy        -    the original thresholded search, which compares a candidate to the
+                       known sources within the padding of its sort attribute, one by one.
+    exhaustive    -    compares every candidate to every known source. Slow, but the matches
+                       found are exactly those allowed by compareCandidateToKnownSources().
+    indexed       -    KnownSourceDB.match(), as used by a plain run, with the neighbourhood
+                       cache and the harmonic index.
+    sweep         -    a sweep join over the candidates, as used by --sweep and --threads.
+    snapshot      -    the memory mapped CatalogSnapshot used by --processes, run in process.
+    cluster       -    groups near-identical candidates with the CandidateClusterer, as used by
+                       --cluster, and matches each group with KnownSourceDB.findGroupMatches().
+
+    Each match is recorded as a (candidate, known source, harmonic, separation) record.
+    Two records agree if the candidate, source and harmonic are the same, and their
+    separations differ by no more than a tolerance. A member of a group is only compared to
+    the known sources near its representative, so the cluster engine may miss a match the
+    reference finds, but must never find one it does not. Only its extra matches are reported.
+
+    Differences that are intended, i.e. matches the legacy search missed that a new
+    engine finds, can be whitelisted. A whitelist file holds one rule per line,
+
+    engine,candidate,source,harmonic
+
+    where each field is a shell style pattern, i.e. "sweep,*,B0833-45,*". Lines starting
+    with '#' are ignored.
+
+    """
+
+    # The engines that can be compared.
+    ENGINES = ["legacy", "exhaustive", "indexed", "sweep", "snapshot", "cluster"]
+
+    # The engines whose matches need only be a subset of those of the reference.
+    SUBSETS = ["cluster"]
+
+    # ******************************
+    #
+    # INIT FUNCTION
+    #
+    # ******************************
+    def __init__(self,debugFlag,db,tolerance=1.0e-9,whitelist=None):
+        """
+        Initialises the class.
+
+        Parameters:
+        debugFlag    -    the debugging flag.
+        db           -    the parsed KnownSourceDB to match against.
+        tolerance    -    the largest difference in separation, in degrees, for two records to agree.
+        whitelist    -    a list of (engine, candidate, source, harmonic) patterns (optional).
+
+        """
+        Utilities.__init__(self,debugFlag)
+        self.db = db
+        self.tolerance = float(tolerance)
+        self.whitelist = whitelist or []
+        self.cacheSize = db.cache.size if db.cache is not None else 0
+
+    # ******************************
+    #
+    # FUNCTIONS.
+    #
+    # ******************************
+
+    def run(self,engine,candidates):
+        """
+        Matches candidates using one engine.
+
+        Parameters:
+        engine        -    the name of the engine, see ENGINES.
+        candidates    -    the list of Candidate records to match.
+
+        Returns:
+        A (records, seconds, comparisons) tuple. The records are a dictionary mapping
+        each (candidate, source, harmonic) key to its separation, seconds is the time
+        taken, and comparisons the number of candidate and known source pairs compared.
+        """
+
+        if(engine not in self.ENGINES):
+            raise ValueError("Unknown engine: " + str(engine) + ", expected one of " + ", ".join(self.ENGINES))
+
+        # Each engine starts from an empty neighbourhood cache.
+        if(self.cacheSize > 0):
+            self.db.cache = NeighbourhoodCache(False,self.cacheSize)
+
+        records = {}
+        context = MatchContext(None)
+
+        state = None
+        if(engine == "snapshot"):
+            state = CatalogSnapshot(False)
+            state.attach(state.publish(self.db))
+
+        try:
+            start = time.time()
+
+            if(engine == "sweep"):
+                neighbourhoods = SweepJoin(False,self.db.catalog,self.db.radius).join(candidates)
+
+            if(engine == "cluster"):
+                self.cluster(records,candidates,context)
+            else:
+                for i in range(len(candidates)):
+                    candidate = candidates[i]
+
+                    if(engine == "legacy"):
+                        matches = self.legacy(candidate,context)
+                    elif(engine == "exhaustive"):
+                        matches = self.exhaustive(candidate,context)
+                    elif(engine == "indexed"):
+                        matches = self.db.findMatches(candidate,context=context)
+                    elif(engine == "sweep"):
+                        matches = self.db.findMatches(candidate,neighbours=neighbourhoods.get(i),context=context)
+                    else:
+                        related = state.related(candidate.ra,candidate.dec,candidate.period)
+                        if(related is None):
+                            matches = self.db.findMatches(candidate,context=context)
+                        else:
+                            matches = self.related(candidate,related,context)
+
+                    self.record(records,candidate,matches)
+
+            seconds = time.time() - start
+        finally:
+            if(state is not None):
+                state.release()
+
+        return (records, seconds, context.comparisons)
+
+    # ****************************************************************************************************
+
+    def legacy(self,candidate,context):
+        """
+        Matches a candidate using the original thresholded search, without the
+        neighbourhood cache or the harmonic index.
+        """
+
+        db = self.db
+        context.matches = []
+        context.searchHarmonics = db.harmonics
+
+        # As before, only a candidate without an RA is compared to every known source.
+        # A placeholder position of 00:00:00 00:00:00 is searched around a sort attribute of zero.
+        if(candidate.ra is None):
+            return self.exhaustive(candidate,context)
+
+        padding = int(db.searchPadding)
+        index = db.divideAndConquerSearch(0,db.knownSourceCount,candidate.sortAttribute)
+        knownSource = db.orderedSourcesDict[db.orderedAccess[index]]
+
+        if(candidate.sortAttribute - padding <= knownSource.sortAttribute <= candidate.sortAttribute + padding):
+            db.compareCandidateToKnownSources(candidate,knownSource,context=context)
+            db.compareRight(candidate,index,padding,context)
+            db.compareLeft(candidate,index,padding,context)
+
+        return context.matches
+
+    # ****************************************************************************************************
+
+    def exhaustive(self,candidate,context):
+        """
+        Compares a candidate to every known source in the catalog.
+        """
+
+        context.matches = []
+        context.searchHarmonics = self.db.harmonics
+
+        for knownSource in self.db.catalog.sources:
+            self.db.compareCandidateToKnownSources(candidate,knownSource,context=context)
+
+        return context.matches
+
+    # ****************************************************************************************************
+
+    def cluster(self,records,candidates,context):
+        """
+        Groups candidates as --cluster does, then matches each group,
+        adding the matches found for every member to the records.
+        """
+
+        clusterer = CandidateClusterer(False,self.db.clusterRadius,self.db.accuracy,self.db.harmonics)
+
+        for group in clusterer.cluster(candidates):
+            found = self.db.findGroupMatches(group,context=context)
+
+            for (member, ratio), matches in zip(group,found):
+                self.record(records,member,matches)
+
+    # ****************************************************************************************************
+
+    def related(self,candidate,related,context):
+        """
+        Compares a candidate to the related sources found by a CatalogSnapshot,
+        as KnownSourceDB.matchRelated() does.
+        """
+
+        context.matches = []
+        context.searchHarmonics = self.db.harmonics
+
+        for index, positions, theta in related:
+            harmonics = [self.db.harmonics[k] for k in positions]
+            self.db.compareCandidateToKnownSources(candidate,self.db.catalog.sources[index],theta,harmonics,context)
+
+        return context.matches
+
+    # ****************************************************************************************************
+
+    def record(self,records,candidate,matches):
+        """
+        Adds the matches found for a candidate to a dictionary of records.
+        """
+
+        for knownSource, catalog_period, harmonic, catalog_RA, catalog_DEC, catalog_DM, theta in matches:
+            key = (candidate.name, knownSource.sourceName, "%.9g" % float(harmonic))
+
+            if(isinstance(theta,float)):
+                records[key] = theta
+            else:
+                records[key] = None
+
+    # ****************************************************************************************************
+
+    def compare(self,engine,reference,records):
+        """
+        Compares the records found by an engine to those found by the reference engine.
+
+        Parameters:
+        engine       -    the name of the engine compared.
+        reference    -    the records of the reference engine.
+        records      -    the records of the engine compared.
+
+        Returns:
+        A list of (status, key, reference separation, separation, whitelisted) tuples,
+        one per difference, where status is one of "missing" (found only by the reference,
+        never reported for the engines in SUBSETS),
+        "extra" (found only by the engine) or "separation" (found by both, but with
+        separations differing by more than the tolerance).
+        """
+
+        differences = []
+
+        for key in sorted(set(reference) | set(records)):
+            if(key not in records):
+                if(engine in self.SUBSETS):
+                    continue
+                status = "missing"
+            elif(key not in reference):
+                status = "extra"
+            elif(not self.sameSeparation(reference[key],records[key])):
+                status = "separation"
+            else:
+                continue
+
+            differences.append((status, key, reference.get(key), records.get(key), self.isWhitelisted(engine,key)))
+
+        return differences
+
+    # ****************************************************************************************************
+
+    def sameSeparation(self,a,b):
+        """
+        Returns True if two separations agree, within the tolerance.
+        """
+
+        if(a is None or b is None):
+            return a is None and b is None
+
+        return abs(a - b) <= self.tolerance
+
+    # ****************************************************************************************************
+
+    def isWhitelisted(self,engine,key):
+        """
+        Returns True if a difference found by an engine matches a whitelist rule.
+        """
+
+        fields = (engine,) + key
+
+        for rule in self.whitelist:
+            if(all([fnmatch.fnmatchcase(field, pattern) for field, pattern in zip(fields, rule)])):
+                return True
+
+        return False
+
+    # ******************************
+    #
+    # MAIN METHOD AND ENTRY POINT.
+    #
+    # ******************************
+
+# ******************************
+#
+# MODULE FUNCTIONS.
+#
+# ******************************
+
+def readWhitelist(path):
+    """
+    Reads a whitelist file, as described in Equivalence.
+
+    Returns:
+    A list of (engine, candidate, source, harmonic) pattern tuples.
+    """
+
+    rules = []
+
+    whitelistFile = open(path)
+    for line in whitelistFile:
+        line = line.strip()
+
+        if(len(line) == 0 or line.startswith("#")):
+            continue
+
+        fields = [field.strip() for field in line.split(",")]
+        if(len(fields) != 4):
+            raise ValueError("Whitelist rules must have four fields, engine,candidate,source,harmonic: " + line)
+
+        rules.append(tuple(fields))
+
+    whitelistFile.close()
+
+    return rules
+
+# ******************************
+
+def readCandidates(path,csv,limit):
+    """
+    Reads the candidates to match, either from candidate files or from a CSV file
+    written by SyntheticGenerator.py.
+
+    Parameters:
+    path     -    a candidate file, or a directory holding candidate files.
+    csv      -    the path to a CSV file of synthetic candidates.
+    limit    -    the largest number of candidates to read, or 0 for no limit.
+
+    Returns:
+    The list of Candidate records read.
+    """
+
+    candidates = []
+
+    if(csv):
+        import SyntheticGenerator
+        for candidate, truth in SyntheticGenerator.readCSV(csv):
+            if(limit and len(candidates) >= limit):
+                break
+            candidates.append(candidate)
+
+        return candidates
+
+    reader = CandidateReader(False)
+
+    if(os.path.isfile(path)):
+        paths = [path]
+    else:
+        paths = []
+        for root, directories, names in os.walk(path):
+            for name in names:
+                if(reader.isCandidateFile(name)):
+                    paths.append(os.path.join(root, name))
+        paths.sort()
+
+    if(limit):
+        paths = paths[:limit]
+
+    for candidatePath in paths:
+        candidates.append(reader.read(candidatePath))
+
+    return candidates
+
+# ******************************
+
+def describe(theta,found):
+    """
+    Describes the separation of a match record, for the differences listed.
+    """
+
+    if(not found):
+        return "-"
+    elif(theta is None):
+        return "unspecified"
+
+    return "%.9g" % theta
+
+# ******************************
+
+def main(argv=None):
+    """
+    Main entry point for the Application.
+
+    """
+
+    print "\n****************************"
+    print "|                          |"
+    print "|   Equivalence Harness    |"
+    print "|                          |"
+    print "|--------------------------|"
+    print "| Version 1.0              |"
+    print "| robert.lyon@cs.man.ac.uk |"
+    print "***************************\n"
+
+    source = os.path.dirname(os.path.abspath(__file__))
+    root = os.path.dirname(os.path.dirname(source))
+
+    parser = OptionParser()
+    parser.add_option("--psrcat", action="store", dest="psrcat",help='Path to the pulsar catalog data to use (required).',default="")
+    parser.add_option("-p", action="store", dest="path",help='Path to the directory/file containing candidates (optional).',default="")
+    parser.add_option("--csv", action="store", dest="csv",help='Path to candidates written by SyntheticGenerator.py, used instead of -p (optional).',default="")
+    parser.add_option("--settings", action="store", dest="settings",help='Path to the settings file to match with (optional).',default=os.path.join(root,"dist","Settings.txt"))
+    parser.add_option("--limit", action="store", dest="limit",type="int",help='The largest number of candidates to match, 0 for all (optional).',default=0)
+    parser.add_option("--reference", action="store", dest="reference",type="choice",choices=Equivalence.ENGINES,help='The engine the others are compared to (optional).',default="legacy")
+    parser.add_option("--engines", action="store", dest="engines",help='Comma separated engines to compare to the reference (optional).',default="indexed,sweep,snapshot,cluster")
+    parser.add_option("--tolerance", action="store", dest="tolerance",type="float",help='The largest difference in separation, in degrees, for two matches to agree (optional).',default=1.0e-9)
+    parser.add_option("--whitelist", action="store", dest="whitelist",help='Path to a file of differences that are intended (optional).',default="")
+    parser.add_option("--show", action="store", dest="show",type="int",help='The number of differences listed per engine (optional).',default=20)
+    parser.add_option("--output", action="store", dest="output",help='The path to write every difference and the timings to as JSON (optional).',default="")
+
+    (args,options) = parser.parse_args()# @UnusedVariable : Tells Eclipse IDE to ignore warning.
+
+    if(not os.path.isfile(args.psrcat)):
+        print "You haven't specified a pulsar catalog to use (via the --psrcat flag), exiting!"
+        sys.exit(2)
+
+    if(not os.path.isfile(args.settings)):
+        print "Settings file not found: ", args.settings, ", exiting!"
+        sys.exit(2)
+
+    if(not args.csv and not os.path.exists(args.path)):
+        print "You must specify candidates to match (via -p or --csv), exiting!"
+        sys.exit(2)
+
+    engines = [engine.strip() for engine in args.engines.split(",") if len(engine.strip()) > 0]
+    for engine in engines:
+        if(engine not in Equivalence.ENGINES):
+            print "Unknown engine: ", engine, ", expected one of ", ", ".join(Equivalence.ENGINES), ", exiting!"
+            sys.exit(2)
+
+    settings = Settings.Settings(False)
+    settings.path = args.settings
+    settings.read()
+
+    db = KnownSourceDB(args.psrcat, settings)
+    if(not db.parse()):
+        print "Catalog file or ANTF web output has unexpected structure! Exiting..."
+        sys.exit(2)
+
+    whitelist = []
+    if(args.whitelist):
+        whitelist = readWhitelist(args.whitelist)
+
+    candidates = readCandidates(args.path, args.csv, args.limit)
+    harness = Equivalence(False, db, args.tolerance, whitelist)
+
+    print "\nCandidates: ", len(candidates)
+    print "Known sources: ", db.knownSourceCount, "\n"
+
+    reference, seconds, comparisons = harness.run(args.reference, candidates)
+    results = {args.reference: {"matches": len(reference), "seconds": seconds, "comparisons": comparisons}}
+
+    print "%-12s %10s %10s %14s %12s %10s %12s" % ("Engine", "Matches", "Time (s)", "Candidates/s", "Comparisons", "Differ", "Whitelisted")
+    print "%-12s %10d %10.3f %14.1f %12d %10s %12s" % (args.reference, len(reference), seconds, len(candidates) / max(seconds, 1.0e-9), comparisons, "-", "-")
+
+    failures = 0
+    report = {}
+
+    for engine in engines:
+        records, seconds, comparisons = harness.run(engine, candidates)
+        differences = harness.compare(engine, reference, records)
+        whitelisted = len([d for d in differences if d[4]])
+
+        results[engine] = {"matches": len(records), "seconds": seconds, "comparisons": comparisons,
+                           "differences": len(differences), "whitelisted": whitelisted}
+        report[engine] = differences
+        failures += len(differences) - whitelisted
+
+        print "%-12s %10d %10.3f %14.1f %12d %10d %12d" % (engine, len(records), seconds, len(candidates) / max(seconds, 1.0e-9), comparisons, len(differences), whitelisted)
+
+    for engine in engines:
+        shown = [d for d in report[engine] if not d[4]][:args.show]
+
+        if(len(shown) > 0):
+            print "\nDifferences between ", engine, " and ", args.reference, ":"
+            for status, key, before, after, whitelisted in shown:
+                print "\t%-10s %s, %s, harmonic %s, separation %s / %s" % (status, key[0], key[1], key[2],\
+                    describe(before, status != "extra"), describe(after, status != "missing"))
+
+    if(args.output):
+        for engine in engines:
+            results[engine]["records"] = [{"status": status, "candidate": key[0], "source": key[1], "harmonic": key[2],
+                                           "reference": before, "separation": after, "whitelisted": whitelisted}
+                                          for status, key, before, after, whitelisted in report[engine]]
+
+        output = open(args.output, "w")
+        output.write(json.dumps({"reference": args.reference, "candidates": len(candidates), "engines": results},
+                                indent=2, sort_keys=True, separators=(",", ": ")) + "\n")
+        output.close()
+
+    if(failures > 0):
+        print "\n", failures, " difference(s) are not whitelisted"
+        sys.exit(1)
+
+    print "\nEvery engine agrees with ", args.reference
+
+# ******************************
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,282 @@
+"""
+This file is part of the KnownSourceMatcher.
+
+KnownSourceMatcher is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+KnownSourceMatcher is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with KnownSourceMatcher.  If not, see <http://www.gnu.org/licenses/>.
+
+File name:    HarmonicIndex.py
+Created:      October 19th, 2026
+
+This code runs on python 2.4 or later.
+
+"""
+
+import math
+import numpy as np
+
+# ******************************
+#
+# CLASS DEFINITION
+#
+# ******************************
+
+class HarmonicIndex(object):
+    """
+    An index over the harmonic periods of every known source in a Catalog.
+
+    A candidate with period x matches a known source with period P at harmonic h if,
+
+    P*h - acc < x < P*h + acc
+
+    where acc is a percentage of the candidate period. Each (source, harmonic) pair
+    therefore describes an interval centred on P*h. As every interval has the same
+    half-width for a given candidate, finding the intervals that contain x (a stabbing
+    query) is the same as finding the values P*h that lie in the range (x-acc, x+acc).
+    So the index simply stores every value P*h in a sorted array, and a query is two
+    binary searches. The query returns all of the harmonically related sources at
+    once, instead of testing every harmonic of every source in range.
+
+    The values are held as log(P*h) = log(P) + log(h), so each harmonic is just an
+    offset applied to the log periods of the catalog. For K harmonics and N sources
+    a query costs O(log(N*K)) plus the number of hits, so large sets of rational
+    harmonics (see rationalHarmonics()) remain cheap to search.
+
+    """
+
+    # ******************************
+    #
+    # INIT FUNCTION
+    #
+    # ******************************
+    def __init__(self,catalog,harmonics):
+        """
+        Builds the index.
+
+        Parameters:
+        catalog      -    the Catalog to index.
+        harmonics    -    the list of harmonics to index, i.e. KnownSourceDB.harmonics.
+
+        """
+
+        self.harmonics = list(harmonics)
+
+        periods = catalog.p0.copy()
+        periods[~(np.nan_to_num(periods) > 0)] = np.nan
+        values = np.add.outer(np.log(periods), np.log(np.array(self.harmonics, dtype=np.float64))).ravel()
+        sources, harmonic = np.divmod(np.arange(len(values)), len(self.harmonics))
+
+        known = ~np.isnan(values)
+        order = np.argsort(values[known], kind='mergesort')
+
+        self.values    = values[known][order]
+        self.sources   = sources[known][order]
+        self.harmonic  = harmonic[known][order]
+
+    # ******************************
+    #
+    # FUNCTIONS.
+    #
+    # ******************************
+
+    def range(self,period,acc):
+        """
+        Returns the positions in the index of the harmonic periods within acc of the
+        supplied period. The range is widened very slightly, since the index is only
+        a pre-filter; the exact test is still applied by the caller.
+
+        Parameters:
+        period    -    the candidate period.
+        acc       -    the period accuracy, in seconds.
+
+        Returns:
+        A (start, end) tuple of positions in the index.
+        """
+
+        slack = 1.0e-9
+
+        if(period - acc > 0):
+            start = np.searchsorted(self.values, math.log(period - acc) - slack, side='left')
+        else:
+            start = 0
+
+        if(period + acc > 0):
+            end = np.searchsorted(self.values, math.log(period + acc) + slack, side='right')
+        else:
+            end = 0
+
+        return (int(start), int(end))
+
+    # ****************************************************************************************************
+
+    def count(self,period,acc):
+        """
+        Returns the number of (source, harmonic) pairs within acc of the supplied period.
+        """
+        start, end = self.range(period,acc)
+        return end - start
+
+    # ****************************************************************************************************
+
+    def query(self,period,acc,low=None,high=None):
+        """
+        Finds the known sources with a harmonic period within acc of the supplied period.
+
+        Parameters:
+        period    -    the candidate period.
+        acc       -    the period accuracy, in seconds.
+        low       -    only sources at or after this index in the catalog are returned (optional).
+        high      -    only sources before this index in the catalog are returned (optional).
+
+        Returns:
+        A list of (source index, [harmonic, ...]) tuples, in catalog order. The harmonics
+        for each source are listed in the order they appear in self.harmonics.
+        """
+
+        start, end = self.range(period,acc)
+
+        sources = self.sources[start:end]
+        harmonic = self.harmonic[start:end]
+
+        if(low is not None):
+            keep = sources >= low
+            sources = sources[keep]
+            harmonic = harmonic[keep]
+
+        if(high is not None):
+            keep = sources < high
+            sources = sources[keep]
+            harmonic = harmonic[keep]
+
+        order = np.lexsort((harmonic, sources))
+
+        results = []
+        for i in order:
+            s = int(sources[i])
+            if(len(results) == 0 or results[-1][0] != s):
+                results.append((s,[]))
+            results[-1][1].append(self.harmonics[harmonic[i]])
+
+        return results
+
+    # ****************************************************************************************************
+
+# ******************************
+#
+# MODULE FUNCTIONS.
+#
+# ******************************
+
+def rationalHarmonics(maxHarmonic):
+    """
+    Builds the set of rational harmonics p/q, for all 1 <= p,q <= maxHarmonic with
+    no common factors. A candidate with period P*p/q is matched to a known source
+    with period P. So 1/2 describes the second harmonic, 2 a candidate found at twice
+    the true period, and 2/3 or 3/2 the fractional harmonics often seen in surveys.
+
+    Parameters:
+    maxHarmonic    -    the largest numerator or denominator to use.
+
+    Returns:
+    A (harmonics, labels) tuple. The harmonics are floats ordered by p+q, so that the
+    simplest ratios come first. The labels map each harmonic
+    to its harmonic number q/p as a string, used when writing matches out.
+    """
+
+    harmonics = []
+    labels = {}
+
+    for total in range(2, 2 * int(maxHarmonic) + 1):
+        for q in range(1, total):
+            p = total - q
+            if(p > maxHarmonic or q > maxHarmonic or gcd(p,q) != 1):
+                continue
+
+            h = float(p) / float(q)
+            harmonics.append(h)
+
+            if(p == 1):
+                labels[h] = str(q)
+            else:
+                labels[h] = str(q) + "/" + str(p)
+
+    return (harmonics, labels)
+
+# ******************************
+
+def parseHarmonics(text):
+    """
+    Parses a comma separated list of harmonics, each either a decimal or a
+    fraction p/q, i.e. "1,1/2,2/3,3/2".
+
+    Returns:
+    A (harmonics, labels) tuple, as described in rationalHarmonics().
+    """
+
+    harmonics = []
+    labels = {}
+
+    for item in text.split(","):
+        item = item.strip()
+
+        if(len(item) == 0):
+            continue
+
+        if("/" in item):
+            p, q = item.split("/")
+            p = int(p)
+            q = int(q)
+            h = float(p) / float(q)
+            labels[h] = str(q) if p == 1 else str(q) + "/" + str(p)
+        else:
+            h = float(item)
+
+        if(h not in harmonics):
+            harmonics.append(h)
+
+    return (harmonics, labels)
+
+# ******************************
+
+def fromArrays(harmonics,values,sources,harmonic):
+    """
+    Creates a HarmonicIndex from arrays built previously, i.e. those loaded from a
+    CatalogSnapshot, without rebuilding or copying them.
+
+    Parameters:
+    harmonics    -    the list of harmonics indexed.
+    values       -    the sorted log harmonic periods (HarmonicIndex.values).
+    sources      -    the catalog index of each value (HarmonicIndex.sources).
+    harmonic     -    the harmonic number of each value (HarmonicIndex.harmonic).
+
+    Returns:
+    The HarmonicIndex.
+    """
+
+    index = HarmonicIndex.__new__(HarmonicIndex)
+    index.harmonics = list(harmonics)
+    index.values = values
+    index.sources = sources
+    index.harmonic = harmonic
+    return index
+
+# ******************************
+
+def gcd(a,b):
+    """
+    Returns the greatest common divisor of two integers.
+    """
+    while(b != 0):
+        a, b = b, a % b
+    return a
+
+# ******************************
@@ -26,12 +26,14 @@ This code runs on python 2.4 or later.
 
 """
 
-import gzip, os
-import KnownSource
-import  numpy as np
-import PFDFile as pfd
+import os
+import Coordinates, CatalogSnapshot, Instrumentation, Logger, MatchContext
+from multiprocessing import Pool
+from multiprocessing.pool import ThreadPool
+from CandidateClusterer import CandidateClusterer
+from CandidateReader import CandidateReader
+from SweepJoin import SweepJoin
 from Utilities import Utilities
-from xml.dom import minidom
 
 # ******************************
 #
@@ -59,10 +61,40 @@ class InputProcessor(Utilities):
         self.matcher = mt         
         self.db = db
         self.settings = st
+        self.reader = CandidateReader(debugFlag)
+        
+        # When clustering or the sweep join are enabled candidates are collected
+        # here, then matched together once all of them have been read.
+        self.pending = []
+        if(self.matcher.cluster):
+            self.clusterer = CandidateClusterer(debugFlag,st.getClusterRadius(),st.getAccuracy(),db.harmonics)
+        else:
+            self.clusterer = None
+            
+        if(self.matcher.sweep):
+            self.sweep = SweepJoin(debugFlag,db.catalog,self.getSweepRadius())
+        else:
+            self.sweep = None
+            
+        # The number of threads matching candidates at once.
+        self.threads = max(1, int(self.matcher.threads))
+        
+        # The number of worker processes matching candidates at once.
+        self.processes = max(1, int(self.matcher.processes))
+        
+        self.batch = self.clusterer is not None or self.sweep is not None or self.threads > 1 or self.processes > 1
+        
+        # When watching a directory, a CatalogReloader may rebuild the catalog as its
+        # files change. The rebuilt catalog is swapped in between batches, see processPaths().
+        self.reloader = None
         
         # This call creates the headers for an output CSV file that will
         # be used to store shortened versions of candidate matches found.
-        self.createCSVFile(self.matcher.outputPath)
+        # When watching a directory, matches are appended to any existing output.
+        if(self.matcher.watch):
+            self.appendCSVFile(self.matcher.outputPath)
+        else:
+            self.createCSVFile(self.matcher.outputPath)
     
     # ******************************
     #
@@ -105,9 +137,15 @@ class InputProcessor(Utilities):
             
         else:
             self.o("Invalid input received")
+        
+        if(self.batch):
+            self.processBatch()
             
         print "Possible matches found: ", self.db.possibleMatches
         
+        if(self.db.cache is not None and self.db.cache.hits + self.db.cache.misses > 0):
+            print self.db.cache
+        
         
     # ****************************************************************************************************
     
@@ -129,7 +167,9 @@ class InputProcessor(Utilities):
         """
         self.o("Processing path file at: " + path + "\n")
         
-        count = 0
+        token = Instrumentation.stats.start("discovery")
+        
+        paths = []
         directoryFile = open(path,'rU') # Read only access
         
         content = directoryFile.readlines()
@@ -142,14 +182,14 @@ class InputProcessor(Utilities):
                 
                 if(self.fileExists(tmpLine)):
 
-                    if tmpLine.endswith('.phcx.gz'):
-                        self.processPHCX(tmpLine)
-                        count += 1
-                    elif tmpLine.endswith('.pfd'):
-                        self.processPFD(tmpLine)
-                        count += 1
+                    if tmpLine.endswith('.phcx.gz') or tmpLine.endswith('.pfd'):
+                        paths.append(tmpLine)
             else:
                 pass
+        
+        Instrumentation.stats.stop("discovery",token,len(paths))
+        
+        count = self.processFiles(paths)
             
         print "Compared ", count , " candidates to ", len(self.db.orderedSourcesDict), " known sources. "
     
@@ -173,7 +213,9 @@ class InputProcessor(Utilities):
         """
         self.o("Processing path file at: " + path + "\n")
         
-        count = 0
+        token = Instrumentation.stats.start("discovery")
+        
+        paths = []
         file = open(path,'rU') # Read only access
         content = file.readlines()
         file.close()
@@ -189,16 +231,14 @@ class InputProcessor(Utilities):
                 
                 if(self.fileExists(components[0])):
                     
-
-                    if components[0].endswith('.phcx.gz'):
-
-                        self.processPHCX(components[0])
-                        count += 1
-                    elif components[0].endswith('.pfd'):
-                        self.processPFD(components[0])
-                        count += 1
+                    if components[0].endswith('.phcx.gz') or components[0].endswith('.pfd'):
+                        paths.append(components[0])
             else:
                 pass
+        
+        Instrumentation.stats.stop("discovery",token,len(paths))
+        
+        count = self.processFiles(paths)
             
         print "Compared ", count , " candidates to ", len(self.db.orderedSourcesDict), " known sources. "
             
@@ -212,87 +252,115 @@ class InputProcessor(Utilities):
         """
         self.o("Processing directory at: " + path + "\n")
         
-        count = 0
+        token = Instrumentation.stats.start("discovery")
+        
+        paths = []
         
         # Search the supplied directory recursively.    
         for root, directories, files in os.walk(path):
             for file in files:
-                if file.endswith('.phcx.gz'):
-                    self.processPHCX(os.path.join(root, file))
-                    count += 1
-                elif file.endswith('.pfd'):
-                    self.processPFD(os.path.join(root, file))
-                    count += 1
+                if file.endswith('.phcx.gz') or file.endswith('.pfd'):
+                    paths.append(os.path.join(root, file))
+        
+        Instrumentation.stats.stop("discovery",token,len(paths))
+        
+        count = self.processFiles(paths)
         
         print "Compared ", count , " candidates to ", len(self.db.orderedSourcesDict), " known sources. "
         
     # ****************************************************************************************************
     
-    def processPHCX(self,path):
+    def processFiles(self,paths):
         """
-        Compares a candidate in a ".phcx.gz" file to the known sources in
-        the ATNF catalog. Each ".phcx.gz" file is a compressed XML file,
-        so here we use XML parsing modules to extract the candidate parameters.
-        """
-        self.o("Processing PHCX file at: " + path + "\n")
-        
-        contents = gzip.open(path,'rb')
-        xmldata = minidom.parse(contents)
-        contents.close()
-        
-        # Build candidate by extracting data from .phcx file.
-        period = float(xmldata.getElementsByTagName('BaryPeriod')[1].childNodes[0].data)
-        RAJ = xmldata.getElementsByTagName('RA')[0].childNodes[0].data
-        DECJ = xmldata.getElementsByTagName('Dec')[0].childNodes[0].data
-        DM = float(xmldata.getElementsByTagName('Dm')[1].childNodes[0].data)
-        SNR = float(xmldata.getElementsByTagName('Snr')[1].childNodes[0].data)
-        
-        # BUILD the candidate. 
-        # Here there are two possible cases to watch out for. Either RAJ and DECJ
-        # are user specified strings, or they are numerical values extracted from
-        # a candidate file. If these are numerical values, then they must be converted
-        # in to the correct string format for comparison.
-        
-        if (not isinstance(RAJ, str)):
-            # Convert the RA in degrees into HH:MM:SS
-            ra_hrs = float(RAJ) * 24.0 / 360.0
-            ra_hr = int( ra_hrs )
-            ra_min = int( float( ra_hrs - ra_hr ) * 60.0 )
-            ra_sec = int( float( ra_hrs - ra_hr - ra_min / 60 ) * 60.0 )
-            
-            # Convert the DEC in degrees into HH:MM:SS
-            dec_deg = int(float(DECJ))
-            dec_abs = np.abs(float(DECJ))
-            dec_min = int((float(dec_abs) - np.abs(dec_deg)) * 60.0 )
-            dec_sec = int((float(dec_abs) - np.abs(dec_deg) - dec_min / 60.0 ) * 60.0 )
-            
-            RAJ_str = str(ra_hr) + ":"+str(ra_min)+":"+str(ra_sec)
-            DECJ_str = str(dec_deg) + ":" + str(dec_min) + ":" + str(dec_sec)
-
-            #print "RAJ: " + RAJ_str + " DECJ: "+DECJ_str
-        
-        # DEBUGGING
-        self.o( "Candidate -> "+ path + " Period = " + str(period) + " RAJ = " + str(RAJ_str) + " DECJ = " + str(DECJ_str) + " DM = " + str(DM) )
-                 
-        # Build a KnownSource object from this candidate. We will then find its
-        # position in the ordered dictionary, and if no known sources have a sortAttribute
-        # within a user specified threshold ( the self.searchPadding variable).
-        # Note that not all sources will have a DM value.
-        candidateSource = KnownSource.KnownSource()
-        candidateSource.addParameter("PSRJ    " + path + "    0")
-        
-        if (isinstance(RAJ, str)):
-            candidateSource.addParameter("RAJ    " + RAJ + "    0")
-            candidateSource.addParameter("DECJ    " + DECJ + "    0")
+        Compares the candidates in a list of ".phcx.gz" and ".pfd" files to the
+        known sources in the ATNF catalog, in order. Other files are skipped.
+        
+        Returns:
+        The number of candidates compared.
+        """
+        
+        count = 0
+        
+        # On long runs a progress line is written, rather than a line per file.
+        if(self.batch):
+            progress = Logger.progress(len(paths),"Candidates read")
         else:
-            candidateSource.addParameter("RAJ    " + RAJ_str + "    0")
-            candidateSource.addParameter("DECJ    " + DECJ_str + "    0")
+            progress = Logger.progress(len(paths),"Candidates matched")
+        
+        for path in paths:
+            if path.endswith('.phcx.gz'):
+                self.processPHCX(path)
+                count += 1
+            elif path.endswith('.pfd'):
+                self.processPFD(path)
+                count += 1
             
-        candidateSource.addParameter("DM    " + str(DM) + "    0")
-        candidateSource.addParameter("P0    " + str(period) + "    0")
-        candidateSource.addParameter("SNR    " + str(SNR) + "    0")
+            progress.update()
         
-        self.db.match(candidateSource,self.matcher.outputPath)  
+        progress.finish()
+        
+        return count
+        
+    # ****************************************************************************************************
+    
+    def processPaths(self,paths):
+        """
+        Compares the candidates in a list of ".phcx.gz" and ".pfd" files to the
+        known sources in the ATNF catalog, i.e. those found by a Watcher.
+        """
+        
+        if(self.reloader is not None):
+            db = self.reloader.swap()
+            if(db is not None):
+                self.setCatalog(db)
+        
+        count = self.processFiles(paths)
+        
+        if(self.batch):
+            self.processBatch()
+        
+        print "Compared ", count , " candidates to ", len(self.db.orderedSourcesDict), " known sources. "
+        print "Possible matches found: ", self.db.possibleMatches
+        
+    # ****************************************************************************************************
+    
+    def setCatalog(self,db):
+        """
+        Swaps in a rebuilt KnownSourceDB, along with the sweep join over its catalog.
+        Only called between batches, so no candidate is ever matched against a mixture
+        of the two. The running count of matches found is carried over.
+        """
+        
+        db.possibleMatches += self.db.possibleMatches
+        self.db = db
+        
+        if(self.sweep is not None):
+            self.sweep = SweepJoin(self.debug,db.catalog,self.getSweepRadius())
+        
+        print "Matching against the rebuilt catalog of ", db.knownSourceCount, " known sources"
+        
+    # ****************************************************************************************************
+    
+    def getSweepRadius(self):
+        """
+        Returns the radius of the sweep join. When clustering, the neighbourhood of each
+        representative must also take in the sources near the other members of its group,
+        so the cluster radius is added, see KnownSourceDB.findGroupMatches().
+        """
+        
+        if(self.clusterer is not None):
+            return float(self.settings.getRadius()) + float(self.settings.getClusterRadius())
+        
+        return self.settings.getRadius()
+        
+    # ****************************************************************************************************
+    
+    def processPHCX(self,path):
+        """
+        Compares a candidate in a ".phcx.gz" file to the known sources in
+        the ATNF catalog.
+        """
+        self.processCandidate(self.reader.readPHCX(path))
         
     # ****************************************************************************************************
     
@@ -301,67 +369,193 @@ class InputProcessor(Utilities):
         Compares a candidate in a ".pfd" file to the known sources in
         the ATNF catalog. 
         """
-        self.o("Processing PFD file at: " + path + "\n")
-        
-        cand = pfd.PFD(self.debug,path)
-        cand.load()
-        
-        # Build candidate by extracting data from .phcx file.
-        period = float(cand.getPeriod())
-        RAJ = cand.getRA()
-        DECJ = cand.getDEC()
-        DM = cand.getDM()
-        SNR = cand.getSNR()
-        
-        # BUILD the candidate. 
-        # Here there are two possible cases to watch out for. Either RAJ and DECJ
-        # are user specified strings, or they are numerical values extracted from
-        # a candidate file. If these are numerical values, then they must be converted
-        # in to the correct string format for comparison.
-        
-        if (not isinstance(RAJ, str)):
-            # Convert the RA in degrees into HH:MM:SS
-            ra_hrs = float(RAJ) * 24.0 / 360.0
-            ra_hr = int( ra_hrs )
-            ra_min = int( float( ra_hrs - ra_hr ) * 60.0 )
-            ra_sec = int( float( ra_hrs - ra_hr - ra_min / 60 ) * 60.0 )
+        self.processCandidate(self.reader.readPFD(path))
+        
+    # ****************************************************************************************************
+    
+    def processCandidate(self,candidate):
+        """
+        Compares a candidate to the known sources in the ATNF catalog. If
+        clustering or the sweep join are enabled, the candidate is instead held
+        back until all candidates have been read (see processBatch()).
+        """
+        if(not self.batch):
+            self.db.match(candidate,self.matcher.outputPath)
+        else:
+            self.pending.append(candidate)
+        
+    # ****************************************************************************************************
+    
+    def processBatch(self):
+        """
+        Matches the candidates collected during processing. If clustering is enabled
+        the candidates are first grouped (see processClusters()), and only one
+        representative per group is matched. If the sweep join is enabled, the known
+        sources near every candidate to be matched are found in a single pass.
+        
+        If more than one thread is requested, the groups are matched in parallel
+        against the shared KnownSourceDB, each with its own MatchContext. Once every
+        group has been matched, the candidate positions held by all the contexts are
+        formatted together (see MatchContext.render()), and the results written in the
+        order the candidates were read.
+        """
+        
+        if(self.processes > 1 and self.clusterer is None):
+            candidates = self.pending
+            self.pending = []
+            return self.processParallel(candidates)
+        
+        if(self.clusterer is not None):
+            token = Instrumentation.stats.start("cluster")
+            groups = self.processClusters()
+            Instrumentation.stats.stop("cluster",token,len(groups))
+        else:
+            groups = [[(candidate,1.0)] for candidate in self.pending]
+        
+        self.pending = []
+        
+        if(self.sweep is not None):
+            token = Instrumentation.stats.start("join")
+            neighbourhoods = self.sweep.join([group[0][0] for group in groups])
+            Instrumentation.stats.stop("join",token,len(groups))
+        else:
+            neighbourhoods = {}
+        
+        task = lambda i: self.matchGroup(groups[i],neighbourhoods.get(i))
+        progress = Logger.progress(len(groups),"Candidates matched")
+        
+        contexts = []
+        
+        if(self.threads > 1):
+            pool = ThreadPool(self.threads)
+            try:
+                for context in pool.imap(task,range(len(groups))):
+                    contexts.append(context)
+                    progress.update()
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            for i in range(len(groups)):
+                contexts.append(task(i))
+                progress.update()
+        
+        progress.finish()
+        
+        # The candidate positions of every group are formatted in one batch, then written.
+        MatchContext.render(contexts)
+        
+        for context in contexts:
+            self.db.write(context)
+    
+    # ****************************************************************************************************
+    
+    def processParallel(self,candidates):
+        """
+        Matches candidates using several worker processes. The catalog is published once
+        as a memory mapped CatalogSnapshot, which every worker attaches to without copying.
+        The workers find the known sources near each candidate in position and harmonic
+        period, and this process applies the exact tests and writes the matches out, in the
+        order the candidates were read. The results are the same as those of the sweep join.
+        
+        Parameters:
+        candidates    -    the list of Candidate records to match.
+        """
+        
+        chunkSize = 256
+        chunks = [candidates[i:i+chunkSize] for i in range(0,len(candidates),chunkSize)]
+        
+        snapshot = CatalogSnapshot.CatalogSnapshot(self.debug)
+        directory = snapshot.publish(self.db)
+        
+        pool = Pool(self.processes,CatalogSnapshot.attachWorker,(directory,))
+        
+        try:
+            work = [[(c.ra,c.dec,c.period) for c in chunk] for chunk in chunks]
             
-            # Convert the DEC in degrees into HH:MM:SS
-            dec_deg = int(float(DECJ))
-            dec_abs = np.abs(float(DECJ))
-            dec_min = int((float(dec_abs) - np.abs(dec_deg)) * 60.0 )
-            dec_sec = int((float(dec_abs) - np.abs(dec_deg) - dec_min / 60.0 ) * 60.0 )
+            progress = Logger.progress(len(candidates),"Candidates matched")
             
-            RAJ_str = str(ra_hr) + ":"+str(ra_min)+":"+str(ra_sec)
-            DECJ_str = str(dec_deg) + ":" + str(dec_min) + ":" + str(dec_sec)
-
-            #print "RAJ: " + RAJ_str + " DECJ: "+DECJ_str
+            for chunk, results in zip(chunks,pool.imap(CatalogSnapshot.relatedSources,work)):
+                for candidate, related in zip(chunk,results):
+                    
+                    # Candidates without a position are compared to the catalog as usual.
+                    if(related is None):
+                        self.db.match(candidate,self.matcher.outputPath)
+                    else:
+                        self.db.matchRelated(candidate,related,self.matcher.outputPath)
+                
+                progress.update(len(chunk))
+            
+            progress.finish()
+        finally:
+            pool.close()
+            pool.join()
+            snapshot.release()
+    
+    # ****************************************************************************************************
+    
+    def matchGroup(self,group,neighbours):
+        """
+        Matches a group of candidates, without writing out the matches found.
+        
+        Parameters:
+        group         -    a list of (Candidate, ratio) tuples, see CandidateClusterer.cluster().
+        neighbours    -    the known sources near the first candidate, or None.
+        
+        Returns:
+        The MatchContext holding the matches found.
+        """
+        
+        context = MatchContext.MatchContext(self.matcher.outputPath)
+        
+        if(self.clusterer is not None):
+            self.db.matchGroup(group,self.matcher.outputPath,neighbours,context)
         else:
-            RAJ_str = RAJ
-            DECJ_str = DECJ
-        
-        # DEBUGGING
-        self.o( "Candidate -> "+ path + " Period = " + str(period) + " RAJ = " + str(RAJ_str) + " DECJ = " + str(DECJ_str) + " DM = " + str(DM) )
-                 
-        # Build a KnownSource object from this candidate. We will then find its
-        # position in the ordered dictionary, and if no known sources have a sortAttribute
-        # within a user specified threshold ( the self.searchPadding variable).
-        # Note that not all sources will have a DM value.
-        candidateSource = KnownSource.KnownSource()
-        candidateSource.addParameter("PSRJ    " + path + "    0")
-        
-        if (isinstance(RAJ, str)):
-            candidateSource.addParameter("RAJ    " + RAJ + "    0")
-            candidateSource.addParameter("DECJ    " + DECJ + "    0")
+            self.db.match(group[0][0],self.matcher.outputPath,neighbours,context)
+        
+        return context
+        
+    # ****************************************************************************************************
+    
+    def processClusters(self):
+        """
+        Groups the candidates collected during processing into clusters of
+        near-identical candidates. The membership of each group is written
+        to a separate CSV file, or appended to it when watching a directory.
+        
+        Returns:
+        The list of groups found by the CandidateClusterer.
+        """
+        
+        groups = self.clusterer.cluster(self.pending)
+        
+        groupsPath = self.matcher.outputPath.replace(".txt","_groups.csv")
+        
+        # When watching a directory, the groups of each poll are appended to those already written.
+        if(self.matcher.watch and os.path.isfile(groupsPath) and os.path.getsize(groupsPath) > 0):
+            groupsFile = open(groupsPath, 'a')
         else:
-            candidateSource.addParameter("RAJ    " + RAJ_str + "    0")
-            candidateSource.addParameter("DECJ    " + DECJ_str + "    0")
+            groupsFile = open(groupsPath, 'w')
+            groupsFile.write('Representative,Member,Period ratio,Angular separation(deg)\n')
+        
+        for group in groups:
+            
+            representative = group[0][0]
+            
+            for member, ratio in group:
+                
+                if(Coordinates.hasPosition(member.ra,member.dec) and Coordinates.hasPosition(representative.ra,representative.dec)):
+                    theta = str(Coordinates.separation(member.ra,member.dec,representative.ra,representative.dec))
+                else:
+                    theta = "unspecified"
+                    
+                groupsFile.write(representative.name + "," + member.name + "," + str(ratio) + "," + theta + "\n")
             
-        candidateSource.addParameter("DM    " + str(DM) + "    0")
-        candidateSource.addParameter("P0    " + str(period) + "    0")
-        candidateSource.addParameter("SNR    " + str(SNR) + "    0")
+        groupsFile.close()
         
-        self.db.match(candidateSource,self.matcher.outputPath)
+        print "Candidate groups found: ", len(groups)
+        
+        return groups
         
     # ****************************************************************************************************
     
@@ -450,5 +644,18 @@ class InputProcessor(Utilities):
         csvFile.write('Candidate,RAJ,DECJ,P0,DM,SNR,Known Source,RAJ,DECJ,P0,DM,Harmonic Number,Harmonic Period,Harmonic Period/Candidate Period,Angular separation(deg)\n')
         csvFile.close() 
         
+    # ****************************************************************************************************
+    
+    def appendCSVFile(self,path):
+        """
+        Creates a CSV output file with custom header and structure, unless one
+        already exists. Matches are then appended to the existing file.
+        """
+        
+        csvPath = path.replace(".txt",".csv")
+        
+        if(not os.path.isfile(csvPath) or os.path.getsize(csvPath) == 0):
+            self.createCSVFile(path)
+        
     # ****************************************************************************************************   
     
\ No newline at end of file
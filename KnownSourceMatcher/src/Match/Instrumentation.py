@@ -0,0 +1,241 @@
+"""
+This file is part of the KnownSourceMatcher.
+
+KnownSourceMatcher is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+KnownSourceMatcher is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with KnownSourceMatcher.  If not, see <http://www.gnu.org/licenses/>.
+
+File name:    Instrumentation.py
+Created:      October 19th, 2026
+
+This code runs on python 2.4 or later.
+
+"""
+
+import json, os, threading, time
+
+# ******************************
+#
+# CLASS DEFINITION
+#
+# ******************************
+
+class Instrumentation(object):
+    """
+    Records the time spent in each stage of a run, so it can be seen where the time
+    goes without attaching a profiler. A stage is timed by,
+
+    token = Instrumentation.stats.start("decode")
+    ...
+    Instrumentation.stats.stop("decode:pfd", token, bytes=size)
+
+    For each stage the number of times it ran, the wall clock and CPU time spent, and
+    the bytes read or written are totalled. The stages recorded are:
+
+    load           -    parsing the catalog.
+    discovery      -    finding the candidate files to match.
+    decode:<fmt>   -    reading a candidate from a file, per format (pfd or phcx).
+    cluster        -    grouping duplicate candidates (--cluster).
+    join           -    the sweep join (--sweep).
+    match:<how>    -    matching a candidate, per search strategy (see KnownSourceDB.findMatches()).
+    write          -    writing matches to the output files.
+    score          -    computing the scores of a PFD candidate.
+
+    Named counters are also kept, i.e. "comparisons", the number of candidate and known
+    source pairs compared (the C of KnownSourceDB.findMatches()), and "matches", the
+    number of matches written.
+
+    CPU time is that of the whole process. When threads are used, stages running at
+    the same time each see the CPU time of the others.
+
+    The name passed to start() is the family of the stage, i.e. "decode" for both
+    "decode:pfd" and "decode:phcx". It is only used to tell an attached Profiler
+    which stage has been entered, so that chosen stages can be profiled.
+
+    """
+
+    # ******************************
+    #
+    # INIT FUNCTION
+    #
+    # ******************************
+    def __init__(self):
+        """
+        Initialises the class.
+        """
+        self.lock = threading.Lock()
+        self.profiler = None
+        self.reset()
+
+    # ******************************
+    #
+    # FUNCTIONS.
+    #
+    # ******************************
+
+    def reset(self):
+        """
+        Discards everything recorded so far.
+        """
+        self.lock.acquire()
+        try:
+            # Maps each stage to [count, wall seconds, CPU seconds, bytes].
+            self.stages = {}
+            self.order = []
+            self.counters = {}
+        finally:
+            self.lock.release()
+
+    # ****************************************************************************************************
+
+    def attach(self,profiler):
+        """
+        Attaches a Profiler, told each time a stage starts and stops. Pass None to detach.
+        """
+        self.profiler = profiler
+
+    # ****************************************************************************************************
+
+    def start(self,family=None):
+        """
+        Returns a token marking the start of a stage, to be passed to stop().
+
+        Parameters:
+        family    -    the family of the stage started (optional), i.e. "decode" or "match".
+        """
+
+        profiled = None
+        if(self.profiler is not None and family is not None):
+            profiled = self.profiler.begin(family)
+
+        return (time.time(), cpuTime(), profiled)
+
+    # ****************************************************************************************************
+
+    def stop(self,stage,token,count=1,bytes=0):
+        """
+        Records the end of a stage.
+
+        Parameters:
+        stage    -    the name of the stage.
+        token    -    the token returned by start().
+        count    -    the number of items the stage processed.
+        bytes    -    the number of bytes read or written by the stage.
+        """
+
+        wall = time.time() - token[0]
+        cpu = cpuTime() - token[1]
+
+        if(token[2] is not None):
+            self.profiler.end(token[2])
+
+        self.lock.acquire()
+        try:
+            if(stage not in self.stages):
+                self.stages[stage] = [0, 0.0, 0.0, 0]
+                self.order.append(stage)
+
+            totals = self.stages[stage]
+            totals[0] += count
+            totals[1] += wall
+            totals[2] += cpu
+            totals[3] += bytes
+        finally:
+            self.lock.release()
+
+    # ****************************************************************************************************
+
+    def add(self,counter,value=1):
+        """
+        Adds a value to a named counter.
+        """
+        self.lock.acquire()
+        try:
+            self.counters[counter] = self.counters.get(counter, 0) + value
+        finally:
+            self.lock.release()
+
+    # ****************************************************************************************************
+
+    def isEmpty(self):
+        """
+        Returns True if nothing has been recorded.
+        """
+        return len(self.stages) == 0 and len(self.counters) == 0
+
+    # ****************************************************************************************************
+
+    def toDict(self):
+        """
+        Returns everything recorded as a dictionary, in the form written by dump().
+        """
+
+        self.lock.acquire()
+        try:
+            stages = []
+            for stage in self.order:
+                count, wall, cpu, bytes = self.stages[stage]
+                stages.append({"stage": stage, "count": count, "wall": wall, "cpu": cpu, "bytes": bytes})
+
+            return {"stages": stages, "counters": dict(self.counters)}
+        finally:
+            self.lock.release()
+
+    # ****************************************************************************************************
+
+    def dump(self,path):
+        """
+        Writes everything recorded to a JSON file.
+        """
+        output = open(path, "w")
+        output.write(json.dumps(self.toDict(), indent=2, sort_keys=True) + "\n")
+        output.close()
+
+    # ****************************************************************************************************
+
+    def __str__(self):
+        """
+        Summarises the stages and counters recorded as a table.
+        """
+
+        summary = self.toDict()
+
+        lines = ["%-24s %10s %10s %10s %14s" % ("Stage", "Count", "Wall (s)", "CPU (s)", "Bytes")]
+        for s in summary["stages"]:
+            lines.append("%-24s %10d %10.3f %10.3f %14d" % (s["stage"], s["count"], s["wall"], s["cpu"], s["bytes"]))
+
+        for counter in sorted(summary["counters"]):
+            lines.append("%-24s %10d" % (counter, summary["counters"][counter]))
+
+        return "\n".join(lines)
+
+    # ****************************************************************************************************
+
+# ******************************
+#
+# MODULE FUNCTIONS.
+#
+# ******************************
+
+def cpuTime():
+    """
+    Returns the user plus system CPU time used by this process, in seconds.
+    """
+    times = os.times()
+    return times[0] + times[1]
+
+# ******************************
+
+# The instrumentation shared by the whole run.
+stats = Instrumentation()
+
+# ******************************
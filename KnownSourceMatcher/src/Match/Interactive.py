@@ -26,12 +26,12 @@ This code runs on python 2.4 or later.
 
 """
 
-import copy, gzip, os, math, string, ordereddict, operator
+import copy, os, ordereddict, operator, Coordinates
+import numpy as np
 import KnownSource
-import  numpy as np
-import PFDFile as pfd
+from CandidateReader import CandidateReader
+from Prefetcher import Prefetcher
 from Utilities import Utilities
-from xml.dom import minidom
 
 # For viewing candidates.
 from PIL import Image  # @UnresolvedImport - Ignore this comment, simply stops my IDE complaining.
@@ -62,9 +62,11 @@ class Interactive(Utilities):
         """
         Utilities.__init__(self,debugFlag)  
         self.db = db
+        self.reader = CandidateReader(debugFlag)
         self.harmonics = [1, 0.5, 0.3, 0.25, 0.2, 0.16, 0.142, 0.125, 0.111, 0.1, 0.0909,0.0833,0.0769,0.0714,0.0666,0.0625,0.03125,0.015625]
         self.width          = 10 # The width of the image viewing panel.
         self.height         = 8  # The height of the image viewing panel.
+        self.prefetchDepth  = 4  # The number of candidates prepared ahead during manual matching.
     
     # ******************************
     #
@@ -121,13 +123,14 @@ class Interactive(Utilities):
         print "\n\t********************"
         print "\t1. Search by period"
         print "\t2. Search by DM"
+        print "\t3. Search by period and DM"
         print "\t********************\n"
         
         choice = 0
             
-        while (choice <= 0 or choice >=3):
+        while (choice <= 0 or choice >=4):
             try:
-                choice = int(raw_input("Enter choice (1 or 2): "))
+                choice = int(raw_input("Enter choice (1-3): "))
             except:
                 choice = 0
                 
@@ -135,6 +138,8 @@ class Interactive(Utilities):
             self.searchByPeriod()
         elif(choice == 2):        
             self.searchByDM()
+        elif(choice == 3):        
+            self.searchByPeriodAndDM()
     
     # ****************************************************************************************************
         
@@ -167,7 +172,8 @@ class Interactive(Utilities):
                 
                 open(outputFile, 'a').close()
                 
-                if(self.fileExists(outputFile)):
+                # Only a new log needs the header, an existing log is resumed.
+                if(self.fileExists(outputFile) and os.path.getsize(outputFile) == 0):
                     self.appendToFile(outputFile, "Manual match log,,,,,,,,',\n")
                     self.appendToFile(outputFile, "Candidate,RAJ,DECJ,P0,DM,Known Source,RAJ,DECJ,P0,DM,Harmonic,Angular Separation\n")
                 
@@ -184,84 +190,51 @@ class Interactive(Utilities):
                         
         count = 0
         
+        # Candidates labeled in an earlier session are skipped.
+        labeled = self.loadLabels(outputFile)
+        
+        if(len(labeled) > 0):
+            print "\n\tResuming session, ", len(labeled), " candidates already labeled will be skipped."
+        
         print "\n\tWill now loop over candidates found to be matched. Press x to break loop.\n\n"
         
-        # Temporary values
-        RAJ  = ""
-        DECJ = ""
-        P0   = 0
-        DM   = 0
-        matches = []
+        # Candidates are read, matched and have their images loaded by a background
+        # worker, while the user is still deciding on the previous candidate.
+        prefetcher = Prefetcher(self.debug,self.candidateFiles(directory,labeled),self.prepareCandidate,self.prefetchDepth)
+        
         imageShown = False
-                  
-        # Search the supplied directory recursively.    
-        for root, directories, files in os.walk(directory):
-            
-            for file in files:
+        
+        try:
+            for root, file, candidate, matches, candidateImage in prefetcher:
                 
-                # If the file found isn't some form of candidate file, then ignore it.
-                if(not file.endswith('.phcx.gz') and not file.endswith('.pfd')):
-                    continue
+                count += 1
+                
+                RAJ = candidate.getRAJ()
+                DECJ = candidate.getDECJ()
+                P0 = candidate.period
+                DM = candidate.DM
                 
-                # Else if we reach here we must have a candidate file.
                 print "\n\n************************************************************************************************************************\nProcessing file: ", file, "\n"
                 
-                # If we have a HTRU candidate
-                if file.endswith('.phcx.gz'):
-                    
-                    # Create a KnownSource object from the candidate file.
-                    candidate = self.processPHCX(os.path.join(root, file))
-                    count += 1
-                    
-                    RAJ = candidate.getParameterAtIndex("RAJ", 0)
-                    DECJ = candidate.getParameterAtIndex("DECJ",0)
-                    P0 = float(candidate.getParameterAtIndex("P0",0))
-                    DM = candidate.getParameterAtIndex("DM",0)
-                    
-                    # Output formatting and the details of the candidate found
-
-                    print '{:<55}'.format("Name") + "\t" + '{:<12}'.format("RA") + "\t" + '{:<13}'.format("DEC") + "\t" + '{:<20}'.format("Period") + "\t" + '{:<15}'.format("DM")
-                    print '{:<55}'.format(file) + "\t" + '{:<12}'.format(str(RAJ)) + "\t" + '{:<13}'.format(str(DECJ)) + "\t" + '{:<20}'.format(str(P0)) + "\t" + '{:<15}'.format(str(DM))
-                    print "\nPossible matches to check\n"
-                    
-                    # Look for potential matches.
-                    matches=self.searchPeriod(P0)
-                    
-                    pngPath = os.path.join(root, file) + ".png"
-                    
-                    if(self.fileExists(pngPath)):
-                        fig=plt.figure(figsize=(self.width,self.height))# @UnusedVariable
-                        plt.ion()
-                        candidateImage = mpimg.imread(pngPath)
-                        plt.imshow(candidateImage, aspect='auto')
-                        plt.show()
-                        imageShown = True
+                # Output formatting and the details of the candidate found
+                print '{:<55}'.format("Name") + "\t" + '{:<12}'.format("RA") + "\t" + '{:<13}'.format("DEC") + "\t" + '{:<20}'.format("Period") + "\t" + '{:<15}'.format("DM")
+                print '{:<55}'.format(file) + "\t" + '{:<12}'.format(str(RAJ)) + "\t" + '{:<13}'.format(str(DECJ)) + "\t" + '{:<20}'.format(str(P0)) + "\t" + '{:<15}'.format(str(DM))
+                print "\nPossible matches to check\n"
                 
-                # If we have a PFD candidate    
-                elif file.endswith('.pfd'):
-                    
-                    # Create a KnownSource object from the candidate file.
-                    candidate = self.processPFD(os.path.join(root, file))
-                    count += 1
-                    
-                    RAJ = candidate.getParameterAtIndex("RAJ", 0)
-                    DECJ = candidate.getParameterAtIndex("DECJ",0)
-                    P0 = float(candidate.getParameterAtIndex("P0",0))
-                    DM = candidate.getParameterAtIndex("DM",0)
-                    
-                    # Output formatting and the details of the candidate found
-                    print '{:<55}'.format("Name") + "\t" + '{:<12}'.format("RA") + "\t" + '{:<13}'.format("DEC") + "\t" + '{:<20}'.format("Period") + "\t" + '{:<15}'.format("DM")
-                    print '{:<55}'.format(file) + "\t" + '{:<12}'.format(str(RAJ)) + "\t" + '{:<13}'.format(str(DECJ)) + "\t" + '{:<20}'.format(str(P0)) + "\t" + '{:<15}'.format(str(DM))
-                    print "\nPossible matches to check\n"
-                    
-                    # Look for potential matches.
-                    matches=self.searchPeriod(P0)
+                if(candidateImage is not None):
+                    fig=plt.figure(figsize=(self.width,self.height))# @UnusedVariable
+                    plt.ion()
+                    plt.imshow(candidateImage, aspect='auto')
+                    plt.show()
+                    imageShown = True
                 
                 # If no matches found and we are dealing with a candidate file of some sort...    
                 if(len(matches)==0 and (file.endswith('.phcx.gz') or file.endswith('.pfd'))):
                     print "No match"
-                    #detail = file + "," + RAJ + "," + DECJ + "," + str(P0) + "," + str(DM) + ",,,,\n"
-                    #.appendToFile(outputFile, detail)
+                    
+                    # Recorded so the candidate isn't read again when the session is resumed.
+                    detail = str(os.path.join(root, file)) + "," + RAJ + "," + DECJ + "," + str(P0) + "," + str(DM) + ",none,,,,,,\n"
+                    self.appendToFile(outputFile, detail)
                 
                 # Else there is at least 1 potential match    
                 elif(len(matches) > 0 and (file.endswith('.phcx.gz') or file.endswith('.pfd'))):
@@ -280,10 +253,13 @@ class Interactive(Utilities):
                     separationFilteredDetails={}
                     count=0
                     for source, reasonForMatch in matches:
-                        angularSeparation = self.findAngularSep(source.getParameterAtIndex("RAJ", 0),source.getParameterAtIndex("DECJ",0), RAJ, DECJ)
+                        angularSeparation = self.findAngularSep(source.ra, source.dec, candidate.ra, candidate.dec)
                         if(angularSeparation <= maxAngSep ):
                             count+=1
                             harmonic = int(1.0/float(reasonForMatch))
+                            
+                            # The catalog is shared, so annotate a copy of the source.
+                            source = copy.copy(source)
                             source.harmonic = harmonic
                             source.angularSeparation = angularSeparation
                             separationFilteredMatches[source.sourceName]= source
@@ -338,17 +314,119 @@ class Interactive(Utilities):
                         detail_b = matches[choice].shortStrCSV() + "," + str(matches[choice].harmonic) + "," + str(matches[choice].angularSeparation) + "\n"
                         detail_c = detail_a+detail_b
                         self.appendToFile(outputFile, detail_c)
+                    else:
+                        # Record that the user chose none of the matches.
+                        detail = str(os.path.join(root, file)) + "," + RAJ + "," + DECJ + "," + str(P0) + "," + str(DM) + ",none,,,,,,\n"
+                        self.appendToFile(outputFile, detail)
                     
                     if(imageShown):
                         plt.clf()
                         plt.close()
                         imageShown = False
                     
+        finally:
+            prefetcher.stop()
         
         print "Compared ", count , " candidates to ", len(self.db.orderedSourcesDict), " known sources. "
                 
     # ****************************************************************************************************
     
+    def candidateFiles(self,directory,labeled=None):
+        """
+        Searches the supplied directory recursively for candidate files.
+        
+        Parameters:
+        directory    -    the directory to search.
+        labeled      -    a set of absolute paths to candidates to skip (optional), see loadLabels().
+        
+        Returns:
+        A generator of (root, file) tuples, one per candidate file found.
+        """
+        
+        for root, directories, files in os.walk(directory):
+            
+            for file in files:
+                
+                # If the file found isn't some form of candidate file, then ignore it.
+                if(not file.endswith('.phcx.gz') and not file.endswith('.pfd')):
+                    continue
+                
+                # Skipped before the candidate is read, as reading is the expensive part.
+                if(labeled is not None and os.path.abspath(os.path.join(root, file)) in labeled):
+                    continue
+                
+                yield (root, file)
+    
+    # ****************************************************************************************************
+    
+    def loadLabels(self,outputFile):
+        """
+        Reads the candidates already labeled in a manual match log. Every candidate shown
+        to the user has a row in the log, including those with no match (recorded as none).
+        
+        Parameters:
+        outputFile    -    the path to the manual match log.
+        
+        Returns:
+        The set of absolute paths of the candidates labeled.
+        """
+        
+        labeled = set()
+        
+        if(not self.fileExists(outputFile)):
+            return labeled
+        
+        log = open(outputFile,'r')
+        
+        for line in log:
+            path = line.split(",")[0].strip()
+            
+            # Skip the header rows.
+            if(path == "" or path == "Manual match log" or path == "Candidate"):
+                continue
+            
+            labeled.add(os.path.abspath(path))
+        
+        log.close()
+        
+        return labeled
+    
+    # ****************************************************************************************************
+    
+    def prepareCandidate(self,location):
+        """
+        Does all the work needed before a candidate can be shown to the user, i.e. reads the
+        candidate file, looks for potential matches, and loads the image of a HTRU candidate.
+        This is run by the prefetch worker, so must not draw anything itself.
+        
+        Parameters:
+        location    -    a (root, file) tuple giving the candidate file.
+        
+        Returns:
+        A (root, file, candidate, matches, image) tuple. The image is None if there isn't one.
+        """
+        
+        root, file = location
+        path = os.path.join(root, file)
+        image = None
+        
+        # Create a Candidate record from the candidate file.
+        if file.endswith('.phcx.gz'):
+            candidate = self.reader.readPHCX(path)
+            
+            pngPath = path + ".png"
+            if(self.fileExists(pngPath)):
+                image = mpimg.imread(pngPath)
+        else:
+            candidate = self.reader.readPFD(path)
+        
+        # Look for potential matches.
+        matches = self.searchPeriod(candidate.period)
+        
+        return (root, file, candidate, matches, image)
+    
+    # ****************************************************************************************************
+    
     def searchByPeriod(self):
         """
         Searches the loaded catalog by period.
@@ -362,58 +440,50 @@ class Interactive(Utilities):
                 period =0.0
         
         print "Name          \tRA            \tDEC            \tPeriod(s)\tDM"
-                
-        for key in self.db.orderedSourcesDict.keys():
-            
-            try:
-                knownSource = self.db.orderedSourcesDict[key]
-                cand_period = float(knownSource.getParameterAtIndex("P0",0))
-                
-                acc = (float(self.db.accuracy)/100)*float(cand_period)
-                
-                for i in range(0,len(self.harmonics)):
-                    # Evaluate the search condition
-                    search_cond = float(cand_period) > (float(period) * float(self.harmonics[i])) - float(acc) and\
-                    (float(cand_period) < (float(period) * float(self.harmonics[i])) + float(acc))
-                    
-                    if(search_cond):
-                        print knownSource.shortStr() + " Harmonic: " + str(self.harmonics[i])
-                    
-            except ValueError as ve:
-                pass
+        
+        for knownSource, harmonic in self.searchPeriod(period):
+            print knownSource.shortStr() + " Harmonic: " + harmonic
     
     # ****************************************************************************************************
             
     def searchPeriod(self,period):
         """
-        Searches the loaded catalog by period.
+        Searches the loaded catalog by period. Rather than visiting every known source,
+        the sources with a period near each harmonic are found by a range query over the
+        catalog's sorted periods (see Catalog.periodRange()), and the search condition
+        is then applied to just those sources.
+        
+        Parameters:
+        period    -    the period to search for, in seconds.
+        
+        Returns:
+        A list of (knownSource, harmonic) tuples, where the harmonic is a string. Sources
+        are listed in catalog order, and the harmonics of each source in the order they
+        appear in self.harmonics.
         """   
         
-              
-        #print "Name          \tRA            \tDEC            \tPeriod(s)\tDM"
-         
+        catalog = self.db.catalog
+        accuracy = float(self.db.accuracy)/100
+        
+        found = []
+        for i in range(0,len(self.harmonics)):
+            target = float(period) * float(self.harmonics[i])
+            low, high = self.window(target,accuracy,catalog.sortedPeriod)
+            
+            for index in catalog.periodRange(low,high):
+                found.append((index,i))
+        
         matches = []
-        count = 0         
-        for key in self.db.orderedSourcesDict.keys():
+        for index, i in sorted(found):
+            cand_period = catalog.p0[index]
+            target = float(period) * float(self.harmonics[i])
             
-            try:
-                knownSource = self.db.orderedSourcesDict[key]
-                cand_period = float(knownSource.getParameterAtIndex("P0",0))
-                
-                acc = (float(self.db.accuracy)/100)*float(cand_period)
-                
-                for i in range(0,len(self.harmonics)):
-                    # Evaluate the search condition
-                    search_cond = float(cand_period) > (float(period) * float(self.harmonics[i])) - float(acc) and\
-                    (float(cand_period) < (float(period) * float(self.harmonics[i])) + float(acc))
-                    
-                    if(search_cond):
-                        count+=1
-                        #print str(count) + "\t" + knownSource.shortStr() + " Harmonic: " + str(self.harmonics[i])
-                        matches.append(tuple([knownSource,str(self.harmonics[i])]))
-                    
-            except ValueError as ve:
-                pass
+            # Evaluate the search condition
+            search_cond = cand_period > target - accuracy * cand_period and\
+                          cand_period < target + accuracy * cand_period
+            
+            if(search_cond):
+                matches.append(tuple([catalog.sources[index],str(self.harmonics[i])]))
             
         return matches
         
@@ -421,7 +491,8 @@ class Interactive(Utilities):
     
     def searchByDM(self):
         """
-        Searches the loaded catalog by DM.
+        Searches the loaded catalog by DM, using a range query over the catalog's
+        sorted DMs (see Catalog.dmRange()).
         """
         dm = 0.0
         while (dm <= 0.0):
@@ -431,216 +502,136 @@ class Interactive(Utilities):
                 dm =0.0
         
         print "Name          \tRA            \tDEC            \tPeriod(s)\t\tDM"
-                
-        for key in self.db.orderedSourcesDict.keys():
+        
+        catalog = self.db.catalog
+        accuracy = float(self.db.accuracy)/100
+        low, high = self.window(dm,accuracy,catalog.sortedDM)
+        
+        for index in catalog.dmRange(low,high):
+            cand_dm = catalog.dm[index]
             
-            try:
-                knownSource = self.db.orderedSourcesDict[key]
-                cand_dm = float(knownSource.getParameterAtIndex("DM",0))
-                
-                acc = (float(self.db.accuracy)/100)*float(cand_dm)
-                
-                # Evaluate the search condition
-                search_cond = float(cand_dm) > (float(dm) ) - float(acc) and\
-                             (float(cand_dm) < (float(dm) ) + float(acc))
-                
-                if(search_cond):
-                    print knownSource.shortStr()
-                    
-            except ValueError as ve:
-                pass
+            # Evaluate the search condition
+            search_cond = cand_dm > dm - accuracy * cand_dm and\
+                          cand_dm < dm + accuracy * cand_dm
+            
+            if(search_cond):
+                print catalog.sources[index].shortStr()
         
     # ****************************************************************************************************
     
-    def processPHCX(self,path):
+    def window(self,value,accuracy,values):
         """
-        Compares a candidate in a ".phcx.gz" file to the known sources in
-        the ATNF catalog. Each ".phcx.gz" file is a compressed XML file,
-        so here we use XML parsing modules to extract the candidate parameters.
+        Returns the range of catalog values that could match a search value, where a
+        catalog value v matches if it is within accuracy*v of the search value, i.e.
+        value/(1+accuracy) < v < value/(1-accuracy). The range is widened very slightly,
+        as it only selects the sources to test.
+        
+        Parameters:
+        value       -    the value searched for.
+        accuracy    -    the accuracy as a fraction, i.e. 0.01 for 1%.
+        values      -    the sorted catalog values, used when the range is unbounded.
+        
+        Returns:
+        A (low, high) tuple.
         """
-        self.o("Processing PHCX file at: " + path + "\n")
-        
-        contents = gzip.open(path,'rb')
-        xmldata = minidom.parse(contents)
-        contents.close()
-        
-        # Build candidate by extracting data from .phcx file.
-        period = float(xmldata.getElementsByTagName('BaryPeriod')[1].childNodes[0].data)
-        RAJ = xmldata.getElementsByTagName('RA')[0].childNodes[0].data
-        DECJ = xmldata.getElementsByTagName('Dec')[0].childNodes[0].data
-        DM = float(xmldata.getElementsByTagName('Dm')[1].childNodes[0].data)
-        SNR = float(xmldata.getElementsByTagName('Snr')[1].childNodes[0].data)
-        
-        # BUILD the candidate. 
-        # Here there are two possible cases to watch out for. Either RAJ and DECJ
-        # are user specified strings, or they are numerical values extracted from
-        # a candidate file. If these are numerical values, then they must be converted
-        # in to the correct string format for comparison.
-        
-        if (not isinstance(RAJ, str)):
-            # Convert the RA in degrees into HH:MM:SS
-            ra_hrs = float(RAJ) * 24.0 / 360.0
-            ra_hr = int( ra_hrs )
-            ra_min = int( float( ra_hrs - ra_hr ) * 60.0 )
-            ra_sec = int( float( ra_hrs - ra_hr - ra_min / 60 ) * 60.0 )
-            
-            # Convert the DEC in degrees into HH:MM:SS
-            dec_deg = int(float(DECJ))
-            dec_abs = np.abs(float(DECJ))
-            dec_min = int((float(dec_abs) - np.abs(dec_deg)) * 60.0 )
-            dec_sec = int((float(dec_abs) - np.abs(dec_deg) - dec_min / 60.0 ) * 60.0 )
-            
-            RAJ_str = str(ra_hr) + ":"+str(ra_min)+":"+str(ra_sec)
-            DECJ_str = str(dec_deg) + ":" + str(dec_min) + ":" + str(dec_sec)
-
-            #print "RAJ: " + RAJ_str + " DECJ: "+DECJ_str
-        
-        # DEBUGGING
-        self.o( "Candidate -> "+ path + " Period = " + str(period) + " RAJ = " + str(RAJ_str) + " DECJ = " + str(DECJ_str) + " DM = " + str(DM) )
-                 
-        # Build a KnownSource object from this candidate. We will then find its
-        # position in the ordered dictionary, and if no known sources have a sortAttribute
-        # within a user specified threshold ( the self.searchPadding variable).
-        # Note that not all sources will have a DM value.
-        candidateSource = KnownSource.KnownSource()
-        candidateSource.addParameter("PSRJ    " + path + "    0")
-        
-        if (isinstance(RAJ, str)):
-            candidateSource.addParameter("RAJ    " + RAJ + "    0")
-            candidateSource.addParameter("DECJ    " + DECJ + "    0")
+        
+        slack = 1.0e-9
+        
+        if(accuracy < 1):
+            high = value / (1 - accuracy)
+        elif(len(values) > 0):
+            high = values[-1]
         else:
-            candidateSource.addParameter("RAJ    " + RAJ_str + "    0")
-            candidateSource.addParameter("DECJ    " + DECJ_str + "    0")
-            
-        candidateSource.addParameter("DM    " + str(DM) + "    0")
-        candidateSource.addParameter("P0    " + str(period) + "    0")
-        candidateSource.addParameter("SNR    " + str(SNR) + "    0")
+            high = value
         
-        return candidateSource
+        return (value / (1 + accuracy) * (1 - slack), high * (1 + slack))
+    
+    # ****************************************************************************************************
+    
+    def searchByPeriodAndDM(self):
+        """
+        Searches the loaded catalog by period and DM together.
+        """
         
+        period = 0.0
+        while (period <= 0.0):
+            try:
+                period = float(raw_input("Enter period(s): "))
+            except:
+                period =0.0
+        
+        dm = 0.0
+        while (dm <= 0.0):
+            try:
+                dm = float(raw_input("Enter DM: "))
+            except:
+                dm =0.0
+        
+        print "Name          \tRA            \tDEC            \tPeriod(s)\tDM"
+        
+        for knownSource, harmonic in self.searchPeriodAndDM(period,dm):
+            print knownSource.shortStr() + " Harmonic: " + harmonic
+    
     # ****************************************************************************************************
     
-    def processPFD(self,path):
+    def searchPeriodAndDM(self,period,dm):
         """
-        Compares a candidate in a ".pfd" file to the known sources in
-        the ATNF catalog. 
+        Searches the loaded catalog for known sources matching both a period (at any of
+        the harmonics) and a DM. The period-DM grid held by the KnownSourceDB (see PeriodDMIndex)
+        selects the sources inside both windows at once, and the usual search conditions
+        are then applied to just those sources.
+        
+        Parameters:
+        period    -    the period to search for, in seconds.
+        dm        -    the DM to search for.
+        
+        Returns:
+        A list of (knownSource, harmonic) tuples, where the harmonic is a string.
         """
-        self.o("Processing PFD file at: " + path + "\n")
-        
-        cand = pfd.PFD(self.debug,path)
-        cand.load()
-        
-        # Build candidate by extracting data from .phcx file.
-        period = float(cand.getPeriod())
-        RAJ = cand.getRA()
-        DECJ = cand.getDEC()
-        DM = cand.getDM()
-        SNR = cand.getSNR()
-        
-        # BUILD the candidate. 
-        # Here there are two possible cases to watch out for. Either RAJ and DECJ
-        # are user specified strings, or they are numerical values extracted from
-        # a candidate file. If these are numerical values, then they must be converted
-        # in to the correct string format for comparison.
-        
-        if (not isinstance(RAJ, str)):
-            # Convert the RA in degrees into HH:MM:SS
-            ra_hrs = float(RAJ) * 24.0 / 360.0
-            ra_hr = int( ra_hrs )
-            ra_min = int( float( ra_hrs - ra_hr ) * 60.0 )
-            ra_sec = int( float( ra_hrs - ra_hr - ra_min / 60 ) * 60.0 )
-            
-            # Convert the DEC in degrees into HH:MM:SS
-            dec_deg = int(float(DECJ))
-            dec_abs = np.abs(float(DECJ))
-            dec_min = int((float(dec_abs) - np.abs(dec_deg)) * 60.0 )
-            dec_sec = int((float(dec_abs) - np.abs(dec_deg) - dec_min / 60.0 ) * 60.0 )
+        
+        catalog = self.db.catalog
+        accuracy = float(self.db.accuracy)/100
+        harmonics = np.array(self.harmonics, dtype=np.float64)
+        
+        periodWindows = [self.window(period * h,accuracy,catalog.sortedPeriod) for h in harmonics]
+        dmLow, dmHigh = self.window(dm,accuracy,catalog.sortedDM)
+        
+        sources, windows = self.db.periodDMIndex.selectWindows([w[0] for w in periodWindows], [w[1] for w in periodWindows],\
+                                                               dmLow, dmHigh)
+        
+        matches = []
+        for i in np.lexsort((windows, sources)):
+            cand_period = catalog.p0[sources[i]]
+            cand_dm = catalog.dm[sources[i]]
+            target = period * harmonics[windows[i]]
             
-            RAJ_str = str(ra_hr) + ":"+str(ra_min)+":"+str(ra_sec)
-            DECJ_str = str(dec_deg) + ":" + str(dec_min) + ":" + str(dec_sec)
-
-            #print "RAJ: " + RAJ_str + " DECJ: "+DECJ_str
-        else:
-            RAJ_str = RAJ
-            DECJ_str = DECJ
-        
-        # DEBUGGING
-        self.o( "Candidate -> "+ path + " Period = " + str(period) + " RAJ = " + str(RAJ_str) + " DECJ = " + str(DECJ_str) + " DM = " + str(DM) )
-                 
-        # Build a KnownSource object from this candidate. We will then find its
-        # position in the ordered dictionary, and if no known sources have a sortAttribute
-        # within a user specified threshold ( the self.searchPadding variable).
-        # Note that not all sources will have a DM value.
-        candidateSource = KnownSource.KnownSource()
-        candidateSource.addParameter("PSRJ    " + path + "    0")
-        
-        if (isinstance(RAJ, str)):
-            candidateSource.addParameter("RAJ    " + RAJ + "    0")
-            candidateSource.addParameter("DECJ    " + DECJ + "    0")
-        else:
-            candidateSource.addParameter("RAJ    " + RAJ_str + "    0")
-            candidateSource.addParameter("DECJ    " + DECJ_str + "    0")
+            # Evaluate the search conditions. Sources without a DM never match.
+            search_cond = cand_period > target - accuracy * cand_period and cand_period < target + accuracy * cand_period and\
+                          cand_dm > dm - accuracy * cand_dm and cand_dm < dm + accuracy * cand_dm
             
-        candidateSource.addParameter("DM    " + str(DM) + "    0")
-        candidateSource.addParameter("P0    " + str(period) + "    0")
-        candidateSource.addParameter("SNR    " + str(SNR) + "    0")
+            if(search_cond):
+                matches.append(tuple([catalog.sources[sources[i]],str(self.harmonics[windows[i]])]))
         
-        return candidateSource
+        return matches
     
     # ****************************************************************************************************
     
-    def findAngularSep(self, knownSource_RAJ, knownSource_DECJ, candidate_RAJ, candidate_DECJ):
+    def findAngularSep(self, knownSource_RA, knownSource_DEC, candidate_RA, candidate_DEC):
         """
         Calculates the angular separation between a known source and a candidate pulsar.
-        The expected input is four strings, such that each string is of the form:
-        
-        00:00:00
-        
-        These correspond to the right ascension and declination of each of the sources.
-        The value returned is the separation between the two sources theta.
+        The expected input is four floats, the right ascension and declination of each
+        of the sources in degrees. The value returned is the separation between the two
+        sources theta, in degrees. If either position is unknown, the separation returned
+        is infinite, so that the source is never within the user's tolerance.
         
-        Code originally written by Ben Stappers.
+        Code originally written by Ben Stappers, see Coordinates.separation().
         
         """
-
-        # Split the strings
-        list_RAJ_A = string.split(knownSource_RAJ, ":")
-        list_DECJ_A = string.split(knownSource_DECJ, ":")
         
-        #print "Candidate -> RAJ = ", candidate_RAJ," DECJ = ", candidate_DECJ
-        #print "KnownSource -> RAJ = ", knownSource_RAJ," DECJ = ", knownSource_DECJ
+        if(None in (knownSource_RA, knownSource_DEC, candidate_RA, candidate_DEC)):
+            return float("inf")
         
-        pointA_RA_dec = float(str(list_RAJ_A[0])) + float(str(list_RAJ_A[1]))/60.0 + float(str(list_RAJ_A[2]))/3600.0
-        pointA_DEC_dec = float(str(list_DECJ_A[0])) + float(str(list_DECJ_A[1]))/60.0 + float(str(list_DECJ_A[2]))/3600.0
-
-        list_RAJ_B = string.split(candidate_RAJ, ":")
-        list_DECJ_B = string.split(candidate_DECJ, ":")
-
-        if(len(list_RAJ_B)==3):
-            pointB_RA_dec = float(str(list_RAJ_B[0])) + float(str(list_RAJ_B[1]))/60.0 + float(str(list_RAJ_B[2]))/3600.0
-        elif(len(list_RAJ_B)==2):
-            pointB_RA_dec = float(str(list_RAJ_B[0])) + float(str(list_RAJ_B[1]))/60.0
-        if(len(list_DECJ_B)==3):
-            pointB_DEC_dec = float(str(list_DECJ_B[0])) + float(str(list_DECJ_B[1]))/60.0 + float(str(list_DECJ_B[2]))/3600.0
-        elif(len(list_DECJ_B) == 2):
-            pointB_DEC_dec = float(str(list_DECJ_B[0])) + float(str(list_DECJ_B[1]))/60.0
-        
-
-        # Convert to Radians
-        r1 = (pointA_RA_dec/360) * 2 * math.pi
-        d1 = (pointA_DEC_dec/360)* 2 * math.pi
-
-        r2 = (pointB_RA_dec/360) * 2 * math.pi
-        d2 = (pointB_DEC_dec/360) * 2 * math.pi
-
-        # Calculate the angular separation theta
-        atanpart = math.atan(math.sqrt(  math.cos(d2)*math.cos(d2)*math.pow((math.sin(r2-r1)),2)  + math.pow((math.cos(d1)*math.sin(d2)-math.sin(d1)*math.cos(d2)*math.cos(r2-r1)),2 )) / (math.sin(d1)*math.sin(d2)+math.cos(d1)*math.cos(d2)*math.cos(r2-r1)))
-        if(atanpart < 0):
-            theta = (atanpart*180/math.pi) + 180
-        else:
-            theta = atanpart*180/math.pi
-
-        return theta
+        return Coordinates.separation(knownSource_RA, knownSource_DEC, candidate_RA, candidate_DEC)
     
     # ****************************************************************************************************
     
\ No newline at end of file
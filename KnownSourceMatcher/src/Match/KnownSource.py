@@ -35,6 +35,7 @@ and Dan Thornton <dan.thornton-2@postgrad.manchester.ac.uk>.
 """
 
 import math
+import Coordinates
 
 # ******************************
 #
@@ -76,11 +77,19 @@ class KnownSource:
         self.sourceName = name
         self.sortAttribute = 0
         
+        # The position in degrees, computed once the RAJ and DECJ parameters are known.
+        self.ra = None
+        self.dec = None
+        
         # Added as a quick fix to ordering by angular separation when manually matching
         self.angularSeparation = 0
         # Added as a quick fix to retain harmonic value when using the interactive matching approach.
         self.harmonic = 0
         
+        # The (catalog, name) pairs describing each catalog this source was read from,
+        # as more than one catalog can be merged into a single KnownSourceDB.
+        self.provenance = []
+        
     # ******************************
     #
     # UTILITY FUNCTIONS.
@@ -154,6 +163,21 @@ class KnownSource:
         if (self.sortAttribute == 0 ):
             self.updateSortAttribute()
     
+    # ******************************
+    
+    def reset(self):
+        """
+        Clears this object so that it can be reused to describe a different
+        source, without the cost of initialising a new object.
+        
+        """
+        self.sourceParameters.clear()
+        self.sortAttribute = 0
+        self.sourceName = "Unknown"
+        self.ra = None
+        self.dec = None
+        self.provenance = []
+        
     # ******************************
     # 
     # ******************************
@@ -179,6 +203,11 @@ class KnownSource:
             
             self.sortAttribute += self.convert_RA_or_DEC_toInt(RAJ_parameterList[0])
             self.sortAttribute += self.convert_RA_or_DEC_toInt(DECJ_parameterList[0])
+            
+            # Keep a numeric copy of the position, so that it
+            # never has to be parsed again during matching.
+            self.ra = Coordinates.parseRA(RAJ_parameterList[0])
+            self.dec = Coordinates.parseDEC(DECJ_parameterList[0])
         
     # ******************************
     # 
@@ -219,6 +248,32 @@ class KnownSource:
         else:
             return None
         
+    # ******************************
+    
+    def getAliases(self):
+        """
+        Returns the set of names this source is known by, i.e. its PSRJ and PSRB names.
+        
+        """
+        aliases = set([self.sourceName])
+        
+        for key in ("PSRJ","PSRB"):
+            name = self.getParameterAtIndex(key,0)
+            if(name is not None):
+                aliases.add(name)
+                
+        return aliases
+        
+    # ******************************
+    
+    def getProvenance(self):
+        """
+        Describes the catalogs this source was read from, and the name used by each,
+        i.e. "psrcat.db:B0021-72F;psrcat_web_addon.db:J0024-7204F".
+        
+        """
+        return ";".join([catalog + ":" + name for catalog, name in self.provenance])
+        
     # ******************************
     # 
     # ******************************
@@ -326,25 +381,44 @@ class KnownSource:
         
         """
         
-        h = 0
+        return convert_RA_or_DEC_toInt(RA_or_DEC)
+    
+    # ******************************
+
+# ******************************
+#
+# MODULE FUNCTIONS.
+#
+# ******************************
+
+def convert_RA_or_DEC_toInt(RA_or_DEC):
+    """
+    Converts a string of the form HH:MM:SS i.e. 00:00:00 or 00:00 to an
+    integer value. This is the function behind KnownSource.convert_RA_or_DEC_toInt(),
+    made available at module level so that candidate records can compute an
+    identical sort attribute without building a KnownSource object.
+    
+    """
+    
+    h = 0
+    m = 0
+    s = 0
+    
+    splitTime = str.split(RA_or_DEC, ":")
+
+    h = int(splitTime[0].replace("+",""))
+    try:
+        m = math.floor(float(splitTime[1]))
+    except IndexError:
         m = 0
+        
+        
+    # Some sources do not have seconds listed.
+    try:
+        s = math.floor(float(splitTime[2]))
+    except IndexError:
         s = 0
         
-        splitTime = str.split(RA_or_DEC, ":")
+    return int( (h * 3600) + (m * 60) + s )
 
-        h = int(splitTime[0].replace("+",""))
-        try:
-            m = math.floor(float(splitTime[1]))
-        except IndexError:
-            m = 0
-            
-            
-        # Some sources do not have seconds listed.
-        try:
-            s = math.floor(float(splitTime[2]))
-        except IndexError:
-            s = 0
-            
-        return int( (h * 3600) + (m * 60) + s )
-    
-    # ******************************
\ No newline at end of file
+# ******************************
\ No newline at end of file
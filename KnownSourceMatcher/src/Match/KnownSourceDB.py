@@ -35,7 +35,13 @@ and Dan Thornton <dan.thornton-2@postgrad.manchester.ac.uk>.
 
 """
 
-import ordereddict, collections, copy, KnownSource, math, operator, os, string, numpy as np
+import ordereddict, collections, copy, Coordinates, hashlib, KnownSource, math, operator, os, threading, numpy as np
+import Candidate, Instrumentation
+from Catalog import Catalog, readOnly
+from MatchContext import MatchContext
+import HarmonicIndex
+from PeriodDMIndex import PeriodDMIndex
+from NeighbourhoodCache import NeighbourhoodCache
 
 # ******************************
 #
@@ -50,6 +56,10 @@ class KnownSourceDB:
     
     """
     
+    # The column of each parameter in the ANTF web interface "Long with errors"
+    # output, as described in readCatalog().
+    WEB_COLUMNS = {"#": 0, "NAME": 1, "RAJ": 2, "DECJ": 4, "P0": 6, "F0": 8, "DM": 10}
+    
     # ******************************
     #
     # INIT FUNCTION
@@ -61,10 +71,23 @@ class KnownSourceDB:
         
         """             
         self.path = path
+        
+        # Several catalogs can be merged, given as a comma separated list of paths.
+        # Sources found in the first take precedence over those in the rest.
+        self.paths = [p.strip() for p in str(path).split(",") if len(p.strip()) > 0]
+        self.mergeRadius = settings.getMergeRadius()
+        self.mergeAccuracy = settings.getMergeAccuracy()
+        self.settings = settings
+        
+        # The (modification time, size, digest) of each catalog file when it was
+        # parsed, used to detect changes to the files, see hasChanged().
+        self.fingerprint = None
+        self.pendingFingerprint = None
+        
         self.harmonics = [1, 0.5, 0.3, 0.25, 0.2, 0.16, 0.125,0.0625,0.03125]
+        self.harmonicLabels = {}
         self.possibleMatches = 0
         self.knownSourceCount = 0
-        self.NaiveSearch = False
         self.KnownRFIFile = "KnownRFI.txt"
         self.telescope = settings.getTelescope()
         
@@ -73,6 +96,26 @@ class KnownSourceDB:
         self.searchPadding = settings.getPadding()
         self.DM_percentAccuracy = settings.getAccuracy()
         
+        # Members of a group of candidates lie within this radius of their representative, see findGroupMatches().
+        self.clusterRadius = settings.getClusterRadius()
+        
+        # The legacy harmonics above can be replaced by a set of rational p/q harmonics.
+        if(settings.getHarmonics() == "rational"):
+            self.harmonics, self.harmonicLabels = HarmonicIndex.rationalHarmonics(settings.getMaxHarmonic())
+        elif(settings.getHarmonics() != "legacy"):
+            self.harmonics, self.harmonicLabels = HarmonicIndex.parseHarmonics(settings.getHarmonics())
+        
+        # Once parsed, the catalog is only read. State belonging to a single call
+        # to match() is held in a MatchContext, so one KnownSourceDB can be shared
+        # by many threads. This lock guards the few shared totals, and the output files.
+        self.lock = threading.Lock()
+        
+        # Cache of the known sources near recently seen candidate positions.
+        if(int(settings.getCacheSize()) > 0):
+            self.cache = NeighbourhoodCache(False,settings.getCacheSize())
+        else:
+            self.cache = None
+        
     
     # ******************************
     #
@@ -82,9 +125,116 @@ class KnownSourceDB:
     
     def parse(self):
         """
-        Reads the catalog file or ATNF web form output line by line. A new KnownSource
-        object is created for each source found in the file.
+        Reads each catalog file, merges them into one set of known sources, and
+        builds the sorted structures and indexes used during matching.
+        
+        Returns:
+        True if any known sources were read, else False.
+        """
         
+        # Taken before reading, so that a change made while reading is still noticed.
+        self.fingerprint = self.fingerprints()
+        
+        knownSources = self.readCatalog(self.paths[0])
+        
+        for path in self.paths[1:]:
+            additions = self.readCatalog(path)
+            byName, byPosition = self.mergeCatalog(knownSources,additions)
+            
+            print "Merged ", os.path.basename(path), ": ", len(additions), " sources, duplicates by name: ",\
+                  byName, " by position and period: ", byPosition
+        
+        # Make sure dictionary isn't empty. If it is then the 
+        # file has not been read. So we empty the application.
+        if(len(knownSources) < 1):
+            return False
+            
+        # Next we create an ordered dictionary object. We
+        # can then store the known sources sorted according
+        # to their sortAttribute.
+         
+        # TODO: EDIT 2: Change to make compatible with Python 2.7
+        #self.orderedSourcesDict = collections.OrderedDict()
+        #self.orderedAccess = collections.OrderedDict()
+        self.orderedSourcesDict = ordereddict.OrderedDict()
+        self.orderedAccess = ordereddict.OrderedDict()
+        
+        index = 0
+        for source in (sorted(knownSources.values(), key=operator.attrgetter('sortAttribute'))):
+            self.orderedSourcesDict[copy.copy(source.sourceName)] = copy.deepcopy(source)
+            
+            # This next data structure is used for faster searching.
+            # It creates an ordered dictionary structured as follows:
+            # 
+            # [0:"PSR 1", 1:"PSR 2", 2:"PSR 3" ,..., n:"PSR n"]
+            #
+            # where the keys are pulsar names. It allows us to access known sources using an
+            # integer key, rather than a string key. This is extremely useful, as to iterate over a
+            # dictionary we must usually get the keys first. Obtaining keys, i.e. a call like:
+            #
+            # for key in self.orderedSourcesDict.keys():
+            #  ... do something
+            #
+            # This actually requires stepping through the entire dictionary to extract each key. This
+            # is an expensive operation (in terms of CPU time) if performed more than a handful of times.
+            #
+            # However using this orderedAccess dictionary we can iterate over
+            # known sources as though they were in a list, without the expensive
+            # call to get the keys. For instance we can just call:
+            #
+            # knownSource = self.orderedAccess[5]
+            #
+            # This might not seem to useful, but it allows us to build a much faster comparison algorithm.
+            
+            self.orderedAccess[index] = copy.copy(source.sourceName)
+            index += 1
+        
+        # Clean up this dictionary as it is no longer required.
+        knownSources.clear()
+        
+        # DEBUGGING -- Check contents of the ordered dictionary.
+        MissingParamsCount = 0
+        self.knownSourceCount = 0;
+        for key in self.orderedSourcesDict.keys():
+            value =  self.orderedSourcesDict[key]
+            #print key + " : "+ str(value.sortAttribute)
+            #print value.__str__()
+            self.knownSourceCount += 1
+            
+            # Count those entries without RAJ and DECJ
+            if (value.getParameter("RAJ") == None):
+                MissingParamsCount +=1
+        
+        print "Total sources: ", self.knownSourceCount       
+        print "Sources missing parameters: ", MissingParamsCount
+        
+        # Column oriented copy of the sources, used for batch joins.
+        self.catalog = Catalog([self.orderedSourcesDict[self.orderedAccess[i]] for i in range(self.knownSourceCount)])
+        self.harmonicIndex = HarmonicIndex.HarmonicIndex(self.catalog,self.harmonics)
+        self.periodDMIndex = PeriodDMIndex(self.catalog,self.DM_percentAccuracy)
+        
+        for columns in (self.catalog,self.harmonicIndex,self.periodDMIndex):
+            readOnly(columns)
+        
+        return True
+        
+    # ******************************
+    #
+    # CATALOG READING FUNCTIONS.
+    #
+    # ******************************
+    
+    def readCatalog(self,path):
+        """
+        Reads a catalog file, ATNF web form output, or the output of PulsarSiteScraper.py
+        line by line. A new KnownSource object is created for each source found in the file.
+        
+        Parameters:
+        path    -    the path to the file.
+        
+        Returns:
+        A dictionary of the KnownSource objects read, keyed by name. The provenance of
+        each records the file read from.
         """       
         # The ANTF catalog file contains a number of known sources.
         # Each source has a number of parameters, though the exact number
@@ -138,9 +288,9 @@ class KnownSourceDB:
         
         knownSources = {}
         
-        if(self.isCatalogueFile(self.path)==True):
+        if(self.isCatalogueFile(path)==True):
             
-            self.catalogueFile = open(self.path,'r') # Read only access
+            self.catalogueFile = open(path,'r') # Read only access
 
             # A temporary object that is used create new KnownSource instances.
             tempSource = KnownSource.KnownSource()
@@ -158,9 +308,7 @@ class KnownSourceDB:
                     # Simply resets the temporary object. Does
                     # not initialise a new object, thus saving
                     # CPU overhead (although minuscule, it all adds up). 
-                    tempSource.sourceParameters.clear()
-                    tempSource.sortAttribute = 0
-                    tempSource.sourceName = "Unknown"
+                    tempSource.reset()
                 
                 elif ( len(line) > 2 ):
                     # If the line doesn't begin with '#' or '@' and isn't
@@ -171,16 +319,17 @@ class KnownSourceDB:
         
             self.catalogueFile.close()
         
-        elif(self.isCatalogueWebOutput(self.path) == True):
+        elif(self.isCatalogueWebOutput(path) == True or self.isScraperOutput(path) == True):
             
-            self.catalogueFile = open(self.path,'r') # Read only access
+            self.catalogueFile = open(path,'r') # Read only access
         
             # A temporary object that is used create new KnownSource instances.
             tempSource = KnownSource.KnownSource()
             
             # Stores the headers in the file, so we can match parameters
-            # with their intended meaning.
-            columnDictionary = {}
+            # with their intended meaning. The output of PulsarSiteScraper.py
+            # has no headers, but uses the same columns as the web form.
+            columnDictionary = dict(self.WEB_COLUMNS)
             
             for line in self.catalogueFile.readlines():
                 if ( line[0] == '-'):
@@ -289,77 +438,108 @@ class KnownSourceDB:
                     # Particularly when this application may need to do
                     # 200,000,000,000 comparisons if checking all the candidates
                     # at /local/scratch/cands .
-                    tempSource.sourceParameters.clear()
-                    tempSource.sortAttribute = 0
-                    tempSource.sourceName = "Unknown"
+                    tempSource.reset()
         
             self.catalogueFile.close()
         
-        # Make sure dictionary isn't empty. If it is then the 
-        # file has not been read. So we empty the application.
-        if(len(knownSources) < 1):
-            return False
-            
-        # Next we create an ordered dictionary object. We
-        # can then store the known sources sorted according
-        # to their sortAttribute.
-         
-        # TODO: EDIT 2: Change to make compatible with Python 2.7
-        #self.orderedSourcesDict = collections.OrderedDict()
-        #self.orderedAccess = collections.OrderedDict()
-        self.orderedSourcesDict = ordereddict.OrderedDict()
-        self.orderedAccess = ordereddict.OrderedDict()
+        label = os.path.basename(path)
+        for source in knownSources.values():
+            source.provenance = [(label, source.sourceName)]
         
-        index = 0
-        for source in (sorted(knownSources.values(), key=operator.attrgetter('sortAttribute'))):
-            self.orderedSourcesDict[copy.copy(source.sourceName)] = copy.deepcopy(source)
+        return knownSources
+        
+    # ******************************
+    # 
+    # ******************************
+    
+    def mergeCatalog(self,knownSources,additions):
+        """
+        Merges the known sources read from a further catalog into those already held.
+        A source already held is not duplicated if it is found again, either by name
+        (any of its PSRJ or PSRB names), or by position and period, i.e. a new discovery
+        listed by a survey before its position was refined. A source is found by position
+        and period if it lies within the merge radius of one already held, with a period
+        agreeing to within the merge accuracy. Parameters missing from the source already
+        held are copied across, and the catalog is added to its provenance. Sources from
+        the same catalog are never merged with each other.
+        
+        Parameters:
+        knownSources    -    the dictionary of KnownSource objects held, keyed by name.
+        additions       -    the dictionary of KnownSource objects to merge, as returned by readCatalog().
+        
+        Returns:
+        A (byName, byPosition) tuple, counting the duplicates found each way.
+        """
+        
+        aliases = {}
+        for key, source in knownSources.items():
+            for alias in source.getAliases():
+                aliases.setdefault(alias, key)
+        
+        # The positions and periods of the sources held, for the proximity test.
+        keys = [key for key in sorted(knownSources) if knownSources[key].ra is not None and\
+                knownSources[key].dec is not None and not np.isnan(self.periodOf(knownSources[key]))]
+        periods = np.array([self.periodOf(knownSources[key]) for key in keys], dtype=np.float64)
+        ra = np.array([knownSources[key].ra for key in keys], dtype=np.float64)
+        dec = np.array([knownSources[key].dec for key in keys], dtype=np.float64)
+        
+        byName = 0
+        byPosition = 0
+        
+        for name, source in sorted(additions.items()):
             
-            # This next data structure is used for faster searching.
-            # It creates an ordered dictionary structured as follows:
-            # 
-            # [0:"PSR 1", 1:"PSR 2", 2:"PSR 3" ,..., n:"PSR n"]
-            #
-            # where the keys are pulsar names. It allows us to access known sources using an
-            # integer key, rather than a string key. This is extremely useful, as to iterate over a
-            # dictionary we must usually get the keys first. Obtaining keys, i.e. a call like:
-            #
-            # for key in self.orderedSourcesDict.keys():
-            #  ... do something
-            #
-            # This actually requires stepping through the entire dictionary to extract each key. This
-            # is an expensive operation (in terms of CPU time) if performed more than a handful of times.
-            #
-            # However using this orderedAccess dictionary we can iterate over
-            # known sources as though they were in a list, without the expensive
-            # call to get the keys. For instance we can just call:
-            #
-            # knownSource = self.orderedAccess[5]
-            #
-            # This might not seem to useful, but it allows us to build a much faster comparison algorithm.
+            duplicate = None
+            for alias in sorted(source.getAliases()):
+                if(alias in aliases):
+                    duplicate = aliases[alias]
+                    byName += 1
+                    break
             
-            self.orderedAccess[index] = copy.copy(source.sourceName)
-            index += 1
+            period = self.periodOf(source)
+            
+            if(duplicate is None and len(keys) > 0 and source.ra is not None and source.dec is not None and not np.isnan(period)):
+                theta = Coordinates.separations(source.ra, source.dec, ra, dec)
+                close = (theta < float(self.mergeRadius)) & (np.abs(periods - period) <= periods * float(self.mergeAccuracy) / 100)
+                
+                if(np.any(close)):
+                    duplicate = keys[int(np.flatnonzero(close)[np.argmin(theta[close])])]
+                    byPosition += 1
+            
+            if(duplicate is None):
+                knownSources[name] = source
+                continue
+            
+            held = knownSources[duplicate]
+            
+            for key in sorted(source.sourceParameters):
+                if(key not in ("PSRJ","PSRB") and held.getParameter(key) is None):
+                    held.addParameter(key + "    " + "    ".join(source.sourceParameters[key]))
+            
+            held.provenance.extend(source.provenance)
         
-        # Clean up this dictionary as it is no longer required.
-        knownSources.clear()
+        return (byName, byPosition)
         
-        # DEBUGGING -- Check contents of the ordered dictionary.
-        MissingParamsCount = 0
-        self.knownSourceCount = 0;
-        for key in self.orderedSourcesDict.keys():
-            value =  self.orderedSourcesDict[key]
-            #print key + " : "+ str(value.sortAttribute)
-            #print value.__str__()
-            self.knownSourceCount += 1
-            
-            # Count those entries without RAJ and DECJ
-            if (value.getParameter("RAJ") == None):
-                MissingParamsCount +=1
+    # ******************************
+    # 
+    # ******************************
+    
+    def periodOf(self,source):
+        """
+        Returns the period of a known source in seconds, derived from F0 if P0 is
+        missing, or NaN if neither is known. See Catalog.period().
+        """
         
-        print "Total sources: ", self.knownSourceCount       
-        print "Sources missing parameters: ", MissingParamsCount
+        period = Candidate.toFloat(source.getParameterAtIndex("P0",0))
         
-        return True
+        if(period is None):
+            f0 = Candidate.toFloat(source.getParameterAtIndex("F0",0))
+            if(f0):
+                period = 1.0 / f0
+        
+        if(period is None):
+            return np.nan
+        
+        return period
         
     # ******************************
     #
@@ -371,14 +551,283 @@ class KnownSourceDB:
     # 
     # ******************************
     
-    def match(self,candidateSource,outputFile):
+    def match(self,candidateSource,outputFile,neighbours=None,context=None):
+        """
+        Looks for matches in the ATNF catalog given the supplied parameters,
+        and writes any found to the output file.
+        
+        Parameters:
+        candidateSource    -    the Candidate record to match.
+        outputFile         -    the path to the file to write matches to.
+        neighbours         -    the known sources near the candidate, if already known (optional).
+                                See findMatches().
+        context            -    the MatchContext to record matches in (optional). If supplied the
+                                matches are not written out, the caller must pass the context to
+                                write() once ready. Otherwise they are written before returning.
+        
+        Returns:
+        The list of matches found, as described in findMatches().
+        """
+        
+        owner = context is None
+        if(owner):
+            context = MatchContext(outputFile)
+        
+        token = Instrumentation.stats.start("match")
+        comparisons = context.comparisons
+        
+        matches = self.findMatches(candidateSource,neighbours=neighbours,context=context)
+        
+        Instrumentation.stats.stop("match:" + context.strategy,token)
+        Instrumentation.stats.add("comparisons",context.comparisons - comparisons)
+        
+        for knownSource, catalog_period, harmonic, catalog_RA, catalog_DEC, catalog_DM, theta in matches:
+            self.recordPossibleMatch(candidateSource,knownSource.sourceName, catalog_period, harmonic,\
+                                     catalog_RA, catalog_DEC, catalog_DM, theta,knownSource.sortAttribute,context)
+        
+        if(owner):
+            self.write(context)
+        
+        return matches
+    
+    # ******************************
+    # 
+    # ******************************
+    
+    def matchRelated(self,candidateSource,related,outputFile,context=None):
+        """
+        Matches a candidate against the known sources already found to be near it in both
+        position and harmonic period, i.e. by a worker process attached to a CatalogSnapshot.
+        The exact comparison is still applied to each source, and the matches are recorded
+        just as by match().
+        
+        Parameters:
+        candidateSource    -    the Candidate record to match.
+        related            -    a list of (source index, [harmonic position, ...], theta) tuples,
+                                as returned by CatalogSnapshot.related().
+        outputFile         -    the path to the file to write matches to.
+        context            -    the MatchContext to record matches in (optional), see match().
+        
+        Returns:
+        The list of matches found, as described in findMatches().
+        """
+        
+        owner = context is None
+        if(owner):
+            context = MatchContext(outputFile)
+        
+        token = Instrumentation.stats.start("match")
+        comparisons = context.comparisons
+        
+        context.matches = []
+        context.searchHarmonics = self.harmonics
+        context.strategy = "snapshot"
+        
+        for index, positions, theta in related:
+            harmonics = [self.harmonics[k] for k in positions]
+            self.compareCandidateToKnownSources(candidateSource,self.catalog.sources[index],theta,harmonics,context)
+        
+        Instrumentation.stats.stop("match:snapshot",token)
+        Instrumentation.stats.add("comparisons",context.comparisons - comparisons)
+        
+        for knownSource, catalog_period, harmonic, catalog_RA, catalog_DEC, catalog_DM, theta in context.matches:
+            self.recordPossibleMatch(candidateSource,knownSource.sourceName, catalog_period, harmonic,\
+                                     catalog_RA, catalog_DEC, catalog_DM, theta,knownSource.sortAttribute,context)
+        
+        if(owner):
+            self.write(context)
+        
+        return context.matches
+    
+    # ******************************
+    # 
+    # ******************************
+    
+    def write(self,context):
+        """
+        Writes the matches recorded in a MatchContext to the output files.
+        """
+        token = Instrumentation.stats.start("write")
+        size = context.size()
+        
+        self.lock.acquire()
+        try:
+            written = context.write()
+            self.possibleMatches += written
+        finally:
+            self.lock.release()
+        
+        Instrumentation.stats.stop("write",token,written,size)
+        Instrumentation.stats.add("matches",written)
+    
+    # ******************************
+    # 
+    # ******************************
+    
+    def matchGroup(self,group,outputFile,neighbours=None,context=None):
+        """
+        Matches a group of near-identical candidates, as found by the CandidateClusterer.
+        The matches for every member are found by findGroupMatches(). Members are written
+        in a compact form to the human friendly output, beneath their representative.
+        
+        Parameters:
+        group         -    a list of (Candidate, ratio) tuples, where ratio is the harmonic
+                           ratio between the member's period and that of the representative.
+                           The representative is the first entry in the list, with a ratio of 1.
+        outputFile    -    the path to the file to write matches to.
+        neighbours    -    the known sources near the representative, if already known (optional).
+        context       -    the MatchContext to record matches in (optional), see match().
+        
+        Returns:
+        The list of matches found for the representative.
+        """
+        
+        representative = group[0][0]
+        
+        if(len(group) < 2):
+            return self.match(representative,outputFile,neighbours,context)
+        
+        owner = context is None
+        if(owner):
+            context = MatchContext(outputFile)
+        
+        token = Instrumentation.stats.start("match")
+        comparisons = context.comparisons
+        
+        found = self.findGroupMatches(group,neighbours,context)
+        
+        Instrumentation.stats.stop("match:" + context.strategy,token,len(group))
+        Instrumentation.stats.add("comparisons",context.comparisons - comparisons)
+        
+        for knownSource, catalog_period, harmonic, catalog_RA, catalog_DEC, catalog_DM, theta in found[0]:
+            self.recordPossibleMatch(representative,knownSource.sourceName, catalog_period, harmonic,\
+                                     catalog_RA, catalog_DEC, catalog_DM, theta,knownSource.sortAttribute,context)
+        
+        # Members are written in a compact form to the human friendly output,
+        # since their details are near-identical to those of the representative.
+        lines = []
+        
+        for i in range(1,len(group)):
+            member = group[i][0]
+            
+            for knownSource, catalog_period, harmonic, catalog_RA, catalog_DEC, catalog_DM, theta in found[i]:
+                lines.append(self.recordGroupMatch(member,knownSource.sourceName, catalog_period, harmonic,\
+                                                   catalog_RA, catalog_DEC, catalog_DM, theta,context))
+        
+        if(len(lines) > 0):
+            context.text.append("GROUP MEMBERS OF: \n" + representative.name + "\n")
+            context.text.extend(lines)
+            context.text.append("@-----------------------------------------------------------------" + "\n")
+        
+        if(owner):
+            self.write(context)
+        
+        return found[0]
+    
+    # ******************************
+    # 
+    # ******************************
+    
+    def findGroupMatches(self,group,neighbours=None,context=None):
+        """
+        Finds the matches for every candidate in a group found by the CandidateClusterer.
+        The representative is matched as by findMatches(). The known sources within the
+        search radius plus the cluster radius of the representative are then found once,
+        and each other member is compared to these using its own period, DM and position.
+        Every member lies within the cluster radius of the representative, so these take in
+        every source within the search radius of the member. Unless the neighbourhood came
+        from a sweep join, only the sources inside the member's own padding are compared,
+        as in the thresholded comparison. So no member is given a match it would not be
+        given if matched on its own.
+        
+        Members of a group without a position are each matched on their own.
+        
+        Parameters:
+        group         -    a list of (Candidate, ratio) tuples, see matchGroup().
+        neighbours    -    the known sources near the representative, if already known (optional).
+                           These must extend to the search radius plus the cluster radius.
+        context       -    the MatchContext used for this search (optional).
+        
+        Returns:
+        A list holding the matches found for each candidate in the group, in the same
+        order as the group, each as described in findMatches().
+        """
+        
+        if(context is None):
+            context = MatchContext(None)
+        
+        representative = group[0][0]
+        found = [self.findMatches(representative,neighbours=neighbours,context=context)]
+        strategy = context.strategy
+        
+        nearby = None
+        if(len(group) > 1 and Coordinates.hasPosition(representative.ra,representative.dec)):
+            if(neighbours is None):
+                nearby = self.scanNeighbourhood(representative,float(self.radius) + float(self.clusterRadius))
+            else:
+                nearby = neighbours
+        
+        padding = int(self.searchPadding)
+        
+        for member, ratio in group[1:]:
+            
+            if(nearby is None or not Coordinates.hasPosition(member.ra,member.dec)):
+                found.append(self.findMatches(member,context=context))
+                continue
+            
+            context.matches = []
+            context.searchHarmonics = self.harmonics
+            
+            for knownSource, theta in nearby:
+                if(neighbours is None and abs(knownSource.sortAttribute - member.sortAttribute) > padding):
+                    continue
+                
+                self.compareCandidateToKnownSources(member,knownSource,context=context)
+            
+            found.append(context.matches)
+        
+        context.strategy = strategy
+        
+        return found
+    
+    # ******************************
+    # 
+    # ******************************
+    
+    def findMatches(self,candidateSource,harmonics=None,neighbours=None,context=None):
         """
         Looks for matches in the ATNF catalog given the supplied parameters.
         
+        Parameters:
+        candidateSource    -    the Candidate record to match.
+        harmonics          -    the harmonics to search (optional). Defaults to self.harmonics.
+        neighbours         -    a list of (knownSource, theta) tuples describing the known sources
+                                near the candidate, i.e. as found by a SweepJoin (optional). If supplied
+                                only these sources are compared to the candidate.
+        context            -    the MatchContext used for this search (optional).
+        
+        Returns:
+        A list of tuples, one per match, of the form:
+        
+        (knownSource, catalog_period, harmonic, catalog_RA, catalog_DEC, catalog_DM, theta)
         """
         
-        # First define output file.
-        self.outputFile = outputFile
+        if(context is None):
+            context = MatchContext(None)
+        
+        context.matches = []
+        
+        if(harmonics is None):
+            context.searchHarmonics = self.harmonics
+        else:
+            context.searchHarmonics = harmonics
+        
+        # The harmonic index can only be used for the standard set of harmonics.
+        useIndex = context.searchHarmonics is self.harmonics and candidateSource.period is not None and candidateSource.period > 0
+        
+        if(useIndex):
+            acc = (float(self.accuracy)/100)*candidateSource.period
+            periodHits = self.harmonicIndex.count(candidateSource.period,acc)
         
         # SEARCH OPTION ONE: NAIVE COMPARISON
         # Given N known sources and M candidates, this will require N x M comparisons. 
@@ -386,16 +835,51 @@ class KnownSourceDB:
         # 22,088,000,000 comparisons.
         
         # Only allow the naive search if no RAJ or DECJ is provided
-        if(candidateSource.getParameter("RAJ") is None ):
-            self.NaiveSearch = True;
+        context.naiveSearch = candidateSource.ra is None
+        
+        # The strategy used is recorded for Instrumentation.py.
+        context.strategy = "sweep"
+        
+        if(neighbours is None and self.cache is not None and not context.naiveSearch and\
+           Coordinates.hasPosition(candidateSource.ra,candidateSource.dec)):
             
-        if (self.NaiveSearch == True):
+            # Candidates from the same pointing share a neighbourhood, so the
+            # thresholded search below only needs to be run once per pointing.
+            neighbours = self.findNeighbourhood(candidateSource)
+            context.strategy = "cache"
+        
+        # Whichever of the spatial or period filters is expected to leave
+        # fewer comparisons is applied first. Here the spatial filter leaves
+        # len(neighbours) sources to be checked at every harmonic, while the
+        # period filter leaves periodHits (source, harmonic) pairs to check.
+        if(neighbours is not None):
             
-            # For each known source....
-            for key in self.orderedSourcesDict.keys():
+            if(useIndex and periodHits < len(neighbours) * len(self.harmonics)):
+                context.strategy = "harmonic-index"
+                self.compareHarmonicallyRelated(candidateSource,acc,context=context,neighbours=neighbours)
+            else:
+                # The neighbourhood has already been found, i.e. by a sweep join.
+                for knownSource, theta in neighbours:
+                    self.compareCandidateToKnownSources(candidateSource,knownSource,theta,context=context)
             
-                knownSource = self.orderedSourcesDict[key]
-                self.compareCandidateToKnownSources(candidateSource,knownSource)
+        elif (context.naiveSearch == True):
+            
+            if(useIndex and self.testsDM(candidateSource)):
+                # Without a position only the period and DM windows remain,
+                # so these are intersected before any source is compared.
+                context.strategy = "period-dm-grid"
+                self.comparePeriodAndDM(candidateSource,acc,context)
+            elif(useIndex):
+                context.strategy = "harmonic-index"
+                self.compareHarmonicallyRelated(candidateSource,acc,context=context)
+            else:
+                context.strategy = "naive"
+                
+                # For each known source....
+                for key in self.orderedSourcesDict.keys():
+                
+                    knownSource = self.orderedSourcesDict[key]
+                    self.compareCandidateToKnownSources(candidateSource,knownSource,context=context)
                   
         # SEARCH OPTION TWO: THRESHOLDED COMPARISON:
         # Given N known sources and M candidates, this will require WORST case N x M comparisons.
@@ -427,6 +911,19 @@ class KnownSourceDB:
         
         else:
             
+            # The sources visited below are exactly those with a sort attribute inside the
+            # padding, which form a contiguous range of the sorted catalog.
+            if(useIndex):
+                low = int(np.searchsorted(self.catalog.sort, candidateSource.sortAttribute - int(self.searchPadding), side='left'))
+                high = int(np.searchsorted(self.catalog.sort, candidateSource.sortAttribute + int(self.searchPadding), side='right'))
+                
+                if(periodHits < (high - low) * len(self.harmonics)):
+                    context.strategy = "harmonic-index"
+                    self.compareHarmonicallyRelated(candidateSource,acc,low,high,context)
+                    return context.matches
+            
+            context.strategy = "thresholded"
+            
             # This call gives us an index in the sources dictionary,
             # where we can start looking for matches (rather than searching 
             # the whole data structure exhaustively).
@@ -439,24 +936,179 @@ class KnownSourceDB:
             
             # Check if the sort attribute is within the bounds.
             if( (candidateSource.sortAttribute - int(self.searchPadding)) <= knownSource.sortAttribute <= (candidateSource.sortAttribute + int(self.searchPadding)) ):
-                self.compareCandidateToKnownSources(candidateSource,knownSource)
+                self.compareCandidateToKnownSources(candidateSource,knownSource,context=context)
             
                 # Now recursively compare to the left and the right of this index.
                 # We use a user specified padding (defaults to 3600) to catch those sources that are nearby.
-                self.compareRight(candidateSource, indexToBeginSearch,  int(self.searchPadding) )
-                self.compareLeft(candidateSource, indexToBeginSearch,  int(self.searchPadding) )
+                self.compareRight(candidateSource, indexToBeginSearch,  int(self.searchPadding), context )
+                self.compareLeft(candidateSource, indexToBeginSearch,  int(self.searchPadding), context )
+        
+        return context.matches
+    
+    # ******************************
+    # 
+    # ******************************
+    
+    def compareHarmonicallyRelated(self,candidateSource,acc,low=None,high=None,context=None,neighbours=None):
+        """
+        Compares a candidate only to the known sources with a harmonic period close
+        to the candidate period, as found using the harmonic index. Each source is
+        compared just at the harmonics that matched, and the comparison still applies
+        the exact period, DM and position conditions.
+        
+        Parameters:
+        candidateSource    -    the Candidate record to match.
+        acc                -    the period accuracy, in seconds.
+        low                -    only sources at or after this position in the catalog are compared (optional).
+        high               -    only sources before this position in the catalog are compared (optional).
+        context            -    the MatchContext to record matches in.
+        neighbours         -    a list of (knownSource, theta) tuples, as passed to findMatches() (optional).
+                                If supplied only these sources are compared, so the sources considered
+                                are the same as when the neighbours are compared one by one.
+        """
+        
+        if(neighbours is None):
+            for index, harmonics in self.harmonicIndex.query(candidateSource.period,acc,low,high):
+                self.compareCandidateToKnownSources(candidateSource,self.catalog.sources[index],None,harmonics,context)
+            return
+        
+        # The separations of the neighbours are already known, so are reused.
+        separations = dict([(id(knownSource), theta) for knownSource, theta in neighbours])
+        
+        for index, harmonics in self.harmonicIndex.query(candidateSource.period,acc,low,high):
+            knownSource = self.catalog.sources[index]
+            
+            if(id(knownSource) in separations):
+                self.compareCandidateToKnownSources(candidateSource,knownSource,separations[id(knownSource)],harmonics,context)
+    
+    # ******************************
+    # 
+    # ******************************
+    
+    def testsDM(self,candidateSource):
+        """
+        Checks whether a candidate DM will be compared to the DM of the known sources,
+        i.e. the candidate has a DM, and the DM accuracy is not zero. A NaN DM is left
+        to the exact comparison, which only lets it match sources without a DM.
+        """
+        return candidateSource.DM is not None and candidateSource.DM == candidateSource.DM and\
+               candidateSource.DM != 0 and float(self.DM_percentAccuracy) != 0
+    
+    # ******************************
+    # 
+    # ******************************
+    
+    def comparePeriodAndDM(self,candidateSource,acc,context):
+        """
+        Compares a candidate only to the known sources inside both its period and DM
+        windows, as found using the period-DM grid. Each source is compared just at the
+        harmonics that matched, and the comparison still applies the exact conditions.
+        
+        Parameters:
+        candidateSource    -    the Candidate record to match, which must have a DM.
+        acc                -    the period accuracy, in seconds.
+        context            -    the MatchContext to record matches in.
+        """
         
+        dmAcc = (float(self.DM_percentAccuracy)/100)*candidateSource.DM
         
-        # Explicit cleanup.
-        candidateSource.sourceParameters.clear()
-        candidateSource.sortAttribute = 0
-        candidateSource.sourceName = "Unknown"
+        for index, harmonics in self.periodDMIndex.query(candidateSource.period,acc,candidateSource.DM,dmAcc,self.harmonics):
+            self.compareCandidateToKnownSources(candidateSource,self.catalog.sources[index],None,harmonics,context)
     
     # ******************************
     # 
     # ******************************
     
-    def compareCandidateToKnownSources(self,candidateSource,knownSource):
+    def findNeighbourhood(self,candidateSource):
+        """
+        Finds the known sources near to a candidate, using the neighbourhood cache.
+        
+        Parameters:
+        candidateSource    -    the Candidate record, which must have a position.
+        
+        Returns:
+        A list of (knownSource, theta) tuples, where theta is the angular separation of the
+        known source from the candidate in degrees. Sources are listed in the order in
+        which the thresholded comparison visits them.
+        """
+        
+        key = self.cache.key(candidateSource.ra,candidateSource.dec)
+        entry = self.cache.get(key)
+        
+        if(entry is None):
+            neighbours = self.scanNeighbourhood(candidateSource,float(self.radius) + self.cache.getMargin())
+            entry = (candidateSource.ra,candidateSource.dec,neighbours)
+            self.cache.put(key,entry)
+        
+        ra, dec, neighbours = entry
+        
+        # Most of the time the candidate is at exactly the position the neighbourhood
+        # was computed for. Otherwise the separations must be recomputed.
+        if(ra == candidateSource.ra and dec == candidateSource.dec):
+            return neighbours
+        
+        return [(knownSource,Coordinates.separation(candidateSource.ra, candidateSource.dec, knownSource.ra, knownSource.dec))\
+                for knownSource, theta in neighbours]
+        
+    # ******************************
+    # 
+    # ******************************
+    
+    def scanNeighbourhood(self,candidateSource,radius):
+        """
+        Finds the known sources within the supplied radius of a candidate, visiting
+        known sources in the same order as the thresholded comparison, i.e. the
+        closest source by sort attribute, then those to its right, then those to its left.
+        
+        Parameters:
+        candidateSource    -    the Candidate record, which must have a position.
+        radius             -    the search radius in degrees.
+        
+        Returns:
+        A list of (knownSource, theta) tuples, where theta is the angular separation
+        of the known source from the candidate in degrees.
+        """
+        
+        neighbours = []
+        padding = int(self.searchPadding)
+        low = candidateSource.sortAttribute - padding
+        high = candidateSource.sortAttribute + padding
+        
+        start = self.divideAndConquerSearch(0,self.knownSourceCount,candidateSource.sortAttribute)
+        
+        if( not (low <= self.orderedSourcesDict[self.orderedAccess[start]].sortAttribute <= high) ):
+            return neighbours
+        
+        indices = [start]
+        
+        index = start + 1
+        while(index < self.knownSourceCount and low <= self.orderedSourcesDict[self.orderedAccess[index]].sortAttribute <= high):
+            indices.append(index)
+            index += 1
+        
+        index = start - 1
+        while(index > -1 and low <= self.orderedSourcesDict[self.orderedAccess[index]].sortAttribute <= high):
+            indices.append(index)
+            index -= 1
+            
+        for index in indices:
+            knownSource = self.orderedSourcesDict[self.orderedAccess[index]]
+            
+            if(knownSource.ra is None or knownSource.dec is None):
+                continue
+            
+            theta = Coordinates.separation(candidateSource.ra, candidateSource.dec, knownSource.ra, knownSource.dec)
+            
+            if(theta < radius):
+                neighbours.append((knownSource,theta))
+                
+        return neighbours
+    
+    # ******************************
+    # 
+    # ******************************
+    
+    def compareCandidateToKnownSources(self,candidateSource,knownSource,theta=None,harmonics=None,context=None):
         """
         Performs the comparison. This works by evaluating a number of search 
         conditions w.r.t candidate period, DM, and its position. The following
@@ -476,23 +1128,32 @@ class KnownSourceDB:
         To change the defaults above, go the the CandidateCrosschecker.py file, and modify the
         parser arguments at the top.
         
+        If the angular separation theta is already known (i.e. from the neighbourhood cache)
+        it can be supplied, so that it isn't computed again. Likewise if only some harmonics
+        need to be tested (i.e. those found by the harmonic index), they can be supplied
+        rather than testing every one in context.searchHarmonics. Any match found is
+        added to context.matches. The known source itself is never modified.
+        
         """
         
+        context.comparisons += 1
+        
         # This check is added as the HTRU catalog file maintained
         # by Michael Keith has a F0 parameter but not P0. So here we convert F0
         # to P0 in this case.
-        if(knownSource.getParameter("P0") is None and  knownSource.getParameter("F0") is not None):
-            F0 = knownSource.getParameter("F0")[0]
-            P0 = 1 / float(F0)
-            knownSource.addParameter("P0    "  + str(P0) + "    0    0")
+        catalog_period = knownSource.getParameterAtIndex("P0",0)
+        
+        if(catalog_period is None and knownSource.getParameter("F0") is not None):
+            F0 = Candidate.toFloat(knownSource.getParameter("F0")[0])
+            if(F0):
+                catalog_period = str(1 / F0)
             
-        if(knownSource.getParameter("P0") is not None ):
+        if(catalog_period is not None ):
             
             #print knownSource.__str__()  
             # We now try to extract the parameters we need for our comparison.  
-            catalog_period = knownSource.getParameter("P0")[0]
-            catalog_RA = knownSource.getParameter("RAJ")[0]
-            catalog_DEC = knownSource.getParameter("DECJ")[0]
+            catalog_RA = knownSource.getParameterAtIndex("RAJ",0) or "*"
+            catalog_DEC = knownSource.getParameterAtIndex("DECJ",0) or "*"
             
             # If reading the ATNF plain catalog file DM may not be present.
             if(knownSource.getParameter("DM") is None):
@@ -503,42 +1164,56 @@ class KnownSourceDB:
             # DEBUGGING
             #print "PULSAR -> Period = ",catalog_period, " RA = ", catalog_RA, " DEC = ", catalog_DEC, " DM = ", catalog_DM
             
-            cand_RAJ = candidateSource.getParameter("RAJ")[0]
-            cand_DECJ = candidateSource.getParameter("DECJ")[0]
-            cand_period = candidateSource.getParameter("P0")[0]
-            cand_DM = candidateSource.getParameter("DM")[0]
+            # The candidate record already holds numeric values,
+            # so there is no need to parse strings here.
+            cand_period = candidateSource.period
+            cand_DM = candidateSource.DM
             
             # Extra check added to stop errors when a candidates is loaded in outside
             # the main application, i.e. via validation methods.
-            if("*" in cand_period):
-                cand_period=0
+            if(cand_period is None):
+                cand_period=0.0
                 
-            acc = (float(self.accuracy)/100)*float(cand_period)
+            acc = (float(self.accuracy)/100)*cand_period
+            
+            # Both positions are held in degrees, so the separation can be
+            # computed once here, rather than once per harmonic.
+            if(theta is not None):
+                withinRadius = theta < float(self.radius)
+            elif(Coordinates.hasPosition(candidateSource.ra,candidateSource.dec)):
                 
-            for i in range(0,len(self.harmonics)):
+                # A known source without a position can't be within the search radius.
+                if(knownSource.ra is None or knownSource.dec is None):
+                    return
+                
+                theta = Coordinates.separation(candidateSource.ra, candidateSource.dec, knownSource.ra, knownSource.dec)
+                withinRadius = theta < float(self.radius)
+            else:
+                theta = "unspecified"
+                withinRadius = True
+                
+            if(harmonics is None):
+                harmonics = context.searchHarmonics
+                
+            for i in range(0,len(harmonics)):
                         
                 # Some candidates have no P0 or F0, i.e. J0923-31
                 if(catalog_period is not "*"):
                             
-                    search_cond = float(cand_period) > (float(catalog_period) * float(self.harmonics[i])) - float(acc) and\
-                                 (float(cand_period) < (float(catalog_period) * float(self.harmonics[i])) + float(acc))
+                    search_cond = cand_period > (float(catalog_period) * float(harmonics[i])) - acc and\
+                                 (cand_period < (float(catalog_period) * float(harmonics[i])) + acc)
                         
-                    if( cand_DM is not "*" and float(cand_DM) != 0 and float(self.DM_percentAccuracy) != 0 and (catalog_DM != "unknown" and catalog_DM != "*")): # has the user input these as options? 
+                    if( cand_DM is not None and cand_DM != 0 and float(self.DM_percentAccuracy) != 0 and (catalog_DM != "unknown" and catalog_DM != "*")): # has the user input these as options? 
                         
-                        dm_acc = (float(self.DM_percentAccuracy)/100)*float(cand_DM) 
+                        dm_acc = (float(self.DM_percentAccuracy)/100)*cand_DM 
                                    
-                        search_cond = search_cond and ((float(catalog_DM) > float(cand_DM) - float(dm_acc)) and\
-                                                       (float(catalog_DM) < float(cand_DM) + float(dm_acc)))
+                        search_cond = search_cond and ((float(catalog_DM) > cand_DM - dm_acc) and\
+                                                       (float(catalog_DM) < cand_DM + dm_acc))
                             
-                    if(cand_RAJ != "00:00:00" and cand_DECJ != "00:00:00"):
-                        theta = self.findAngularSep(cand_RAJ, cand_DECJ, catalog_RA, catalog_DEC)
-                        search_cond = search_cond and (theta<float(self.radius))
-                    else:
-                        theta = "unspecified"
+                    search_cond = search_cond and withinRadius
                             
                     if(search_cond):  
-                        self.recordPossibleMatch(candidateSource,knownSource.sourceName, catalog_period, self.harmonics[i],\
-                                                 catalog_RA, catalog_DEC, catalog_DM, theta,knownSource.sortAttribute)
+                        context.matches.append((knownSource, catalog_period, harmonics[i], catalog_RA, catalog_DEC, catalog_DM, theta))
                 
     # ******************************
     # 
@@ -701,7 +1376,7 @@ class KnownSourceDB:
         else:
             return midpoint
 
-    def compareRight(self,candidateSource,index,padding):
+    def compareRight(self,candidateSource,index,padding,context):
         """
         Compares a candidate to those known sources which occur
         to the right of a specified index in the orderedSourcesDict to a candidate. 
@@ -715,10 +1390,10 @@ class KnownSourceDB:
             
             if( (candidateSource.sortAttribute - padding) <= knownSource.sortAttribute <= (candidateSource.sortAttribute + padding) ):
                 #print str(candidateSource.sortAttribute - padding), "<=" ,str(knownSource.sortAttribute), "<=", str(candidateSource.sortAttribute + padding)
-                self.compareCandidateToKnownSources(candidateSource,knownSource)
-                self.compareRight(candidateSource,index+1,padding)
+                self.compareCandidateToKnownSources(candidateSource,knownSource,context=context)
+                self.compareRight(candidateSource,index+1,padding,context)
             
-    def compareLeft(self,candidateSource,index,padding):
+    def compareLeft(self,candidateSource,index,padding,context):
         """
         Compares a candidate to those known sources which occur
         to the left of a specified index in the orderedSourcesDict to a candidate. 
@@ -732,66 +1407,25 @@ class KnownSourceDB:
             
             if( (candidateSource.sortAttribute - padding) <= knownSource.sortAttribute <= (candidateSource.sortAttribute + padding) ):
                 #print str(candidateSource.sortAttribute - padding), "<=" ,str(knownSource.sortAttribute), "<=", str(candidateSource.sortAttribute + padding)
-                self.compareCandidateToKnownSources(candidateSource,knownSource)
-                self.compareLeft(candidateSource,index-1,padding)
+                self.compareCandidateToKnownSources(candidateSource,knownSource,context=context)
+                self.compareLeft(candidateSource,index-1,padding,context)
             
         
     # ******************************
     # 
     # ******************************
                
-    def findAngularSep(self, knownSource_RAJ, knownSource_DECJ, candidate_RAJ, candidate_DECJ):
+    def findAngularSep(self, knownSource_RA, knownSource_DEC, candidate_RA, candidate_DEC):
         """
         Calculates the angular separation between a known source and a candidate pulsar.
-        The expected input is four strings, such that each string is of the form:
-        
-        00:00:00
-        
-        These correspond to the right ascension and declination of each of the sources.
-        The value returned is the separation between the two sources theta.
+        The expected input is four floats, the right ascension and declination of each
+        of the sources in degrees. The value returned is the separation between the two
+        sources theta, in degrees.
         
-        Code originally written by Ben Stappers.
+        Code originally written by Ben Stappers, see Coordinates.separation().
         
         """
-
-        # Split the strings
-        list_RAJ_A = string.split(knownSource_RAJ, ":")
-        list_DECJ_A = string.split(knownSource_DECJ, ":")
-        
-        #print "Candidate -> RAJ = ", candidate_RAJ," DECJ = ", candidate_DECJ
-        #print "KnownSource -> RAJ = ", knownSource_RAJ," DECJ = ", knownSource_DECJ
-        
-        pointA_RA_dec = float(str(list_RAJ_A[0])) + float(str(list_RAJ_A[1]))/60.0 + float(str(list_RAJ_A[2]))/3600.0
-        pointA_DEC_dec = float(str(list_DECJ_A[0])) + float(str(list_DECJ_A[1]))/60.0 + float(str(list_DECJ_A[2]))/3600.0
-
-        list_RAJ_B = string.split(candidate_RAJ, ":")
-        list_DECJ_B = string.split(candidate_DECJ, ":")
-
-        if(len(list_RAJ_B)==3):
-            pointB_RA_dec = float(str(list_RAJ_B[0])) + float(str(list_RAJ_B[1]))/60.0 + float(str(list_RAJ_B[2]))/3600.0
-        elif(len(list_RAJ_B)==2):
-            pointB_RA_dec = float(str(list_RAJ_B[0])) + float(str(list_RAJ_B[1]))/60.0
-        if(len(list_DECJ_B)==3):
-            pointB_DEC_dec = float(str(list_DECJ_B[0])) + float(str(list_DECJ_B[1]))/60.0 + float(str(list_DECJ_B[2]))/3600.0
-        elif(len(list_DECJ_B) == 2):
-            pointB_DEC_dec = float(str(list_DECJ_B[0])) + float(str(list_DECJ_B[1]))/60.0
-        
-
-        # Convert to Radians
-        r1 = (pointA_RA_dec/360) * 2 * math.pi
-        d1 = (pointA_DEC_dec/360)* 2 * math.pi
-
-        r2 = (pointB_RA_dec/360) * 2 * math.pi
-        d2 = (pointB_DEC_dec/360) * 2 * math.pi
-
-        # Calculate the angular separation theta
-        atanpart = math.atan(math.sqrt(  math.cos(d2)*math.cos(d2)*math.pow((math.sin(r2-r1)),2)  + math.pow((math.cos(d1)*math.sin(d2)-math.sin(d1)*math.cos(d2)*math.cos(r2-r1)),2 )) / (math.sin(d1)*math.sin(d2)+math.cos(d1)*math.cos(d2)*math.cos(r2-r1)))
-        if(atanpart < 0):
-            theta = (atanpart*180/math.pi) + 180
-        else:
-            theta = atanpart*180/math.pi
-
-        return theta
+        return Coordinates.separation(knownSource_RA, knownSource_DEC, candidate_RA, candidate_DEC)
     
     # ******************************
     #
@@ -799,40 +1433,56 @@ class KnownSourceDB:
     #
     # ******************************
 
-    def recordPossibleMatch(self,candidate,catalog_name, catalog_period, harmonic_n, catalog_RA, catalog_DEC, catalog_DM, theta_sep,catalog_sortAttribute):
+    def harmonicLabel(self,harmonic):
+        """
+        Returns the harmonic number written to the output for a harmonic, i.e. "2" for 0.5,
+        or "3/2" for the rational harmonic 2/3.
+        """
+        if(harmonic in self.harmonicLabels):
+            return self.harmonicLabels[harmonic]
+        return str(1/harmonic)
+    
+    # ******************************
+    
+    def recordPossibleMatch(self,candidate,catalog_name, catalog_period, harmonic_n, catalog_RA, catalog_DEC, catalog_DM, theta_sep,catalog_sortAttribute,context):
         """
-        Writes a possible known source match to the output file.
+        Records a possible known source match in the context, to be written to the output files.
         
         """
-        self.possibleMatches += 1
+        context.possibleMatches += 1
+        
+        # Missing candidate values are written using the same
+        # placeholder as the catalog, i.e. "*". The SNR is written in full, as
+        # it always has been for PFD files, which hold it as a numpy value.
+        snr_str = repr(candidate.SNR)
+        period_str = "*" if candidate.period is None else str(candidate.period)
+        dm_str = "*" if candidate.DM is None else str(candidate.DM)
         
-        harmonicNumber = str(1/harmonic_n)
+        # The ratio is to the candidate period as written out.
+        harmonicNumber = self.harmonicLabel(harmonic_n)
         harmonicPeriod = str(float(catalog_period)*float(harmonic_n))
-        harmonicPeriod_div_candidatePeriod = str(float(float(catalog_period)*float(harmonic_n))/float(candidate.getParameter("P0")[0]))
+        harmonicPeriod_div_candidatePeriod = str(float(float(catalog_period)*float(harmonic_n))/float(period_str))
         
-        try:
-            snr_str=str(candidate.getParameter("SNR")[0])
-        except TypeError as te:
-            snr_str = "0.0"
+        # The candidate position is formatted when the records are written, see MatchContext.render().
+        RAJ, DECJ = context.position(candidate.ra,candidate.dec)
             
         # First produce human friendly output
-        outputFile = open(self.outputFile, "a")
-        outputFile.write("POSSIBLE MATCH FOR: \n" + candidate.sourceName + "\n")
-        outputFile.write("Candidate Source -> RAJ: " + candidate.getParameter("RAJ")[0] + " DECJ:" + candidate.getParameter("DECJ")[0] + " P0:"  +\
-                          candidate.getParameter("P0")[0] + " DM:" + candidate.getParameter("DM")[0] + " SNR: "+ snr_str+" SORT ATTRIB: "+ str(candidate.sortAttribute) + "\n")
-        outputFile.write("Known Source     -> RAJ: " +str(catalog_RA) + " DECJ:" + str(catalog_DEC) + " P0:" +\
+        outputFile = context.text
+        outputFile.append("POSSIBLE MATCH FOR: \n" + candidate.name + "\n")
+        outputFile.append(["Candidate Source -> RAJ: ", RAJ, " DECJ:", DECJ, " P0:"  +\
+                          period_str + " DM:" + dm_str + " SNR: "+ snr_str+" SORT ATTRIB: "+ str(candidate.sortAttribute) + "\n"])
+        outputFile.append("Known Source     -> RAJ: " +str(catalog_RA) + " DECJ:" + str(catalog_DEC) + " P0:" +\
                           str(catalog_period) + " DM:" + str(catalog_DM) + " SORT ATTRIB: "+ str(catalog_sortAttribute) + "\n")
-        outputFile.write("PSR: " + catalog_name + "\n")
-        #outputFile.write("P0: " + str(catalog_period) + "\n")
-        outputFile.write("Harmonic Number = " + harmonicNumber + "\n")
-        outputFile.write("Harmonic Period: " + harmonicPeriod + "\n")
-        outputFile.write("Harmonic Period/Candidate Period: " + harmonicPeriod_div_candidatePeriod + "\n")
-        #outputFile.write("RA: " +str(catalog_RA) + "\n")
-        #outputFile.write("DEC: " + str(catalog_DEC) + "\n")
-        #outputFile.write("DM: " + str(catalog_DM) + "\n")
-        outputFile.write("Angular separation of psr and cand (deg): " + str(theta_sep) + "\n")
-        outputFile.write("@-----------------------------------------------------------------" + "\n")
-        outputFile.close()
+        outputFile.append("PSR: " + catalog_name + "\n")
+        #outputFile.append("P0: " + str(catalog_period) + "\n")
+        outputFile.append("Harmonic Number = " + harmonicNumber + "\n")
+        outputFile.append("Harmonic Period: " + harmonicPeriod + "\n")
+        outputFile.append("Harmonic Period/Candidate Period: " + harmonicPeriod_div_candidatePeriod + "\n")
+        #outputFile.append("RA: " +str(catalog_RA) + "\n")
+        #outputFile.append("DEC: " + str(catalog_DEC) + "\n")
+        #outputFile.append("DM: " + str(catalog_DM) + "\n")
+        outputFile.append("Angular separation of psr and cand (deg): " + str(theta_sep) + "\n")
+        outputFile.append("@-----------------------------------------------------------------" + "\n")
         
         # Now produce machine friendly CSV format.
         # 
@@ -840,12 +1490,36 @@ class KnownSourceDB:
         # Candidate name,RAJ,DECJ,P0,DM,SNR,Known Source,RAJ,DECJ,P0,DM,Harmonic Number,Harmonic Period,Harmonic Period/Candidate Period,Angular separation(deg)
         #
         
-        csvFile = open(self.outputFile.replace(".txt",".csv"), "a")
-        csvFile.write(candidate.sourceName + "," + candidate.getParameter("RAJ")[0] + "," + candidate.getParameter("DECJ")[0] + "," +\
-                       candidate.getParameter("P0")[0] + "," + candidate.getParameter("DM")[0] + "," + snr_str + "," + catalog_name + "," + str(catalog_RA) +\
+        context.csv.append([candidate.name + ",", RAJ, ",", DECJ, "," +\
+                       period_str + "," + dm_str + "," + snr_str + "," + catalog_name + "," + str(catalog_RA) +\
+                       "," + str(catalog_DEC) + "," + str(catalog_period) + "," + str(catalog_DM) + "," + harmonicNumber +\
+                       "," + harmonicPeriod + "," + harmonicPeriod_div_candidatePeriod +  "," + str(theta_sep) + "\n"])
+    
+    def recordGroupMatch(self,candidate,catalog_name, catalog_period, harmonic_n, catalog_RA, catalog_DEC, catalog_DM, theta_sep,context):
+        """
+        Records a possible known source match, fanned out from the representative
+        of a group to one of its members. A full CSV row is recorded in the context,
+        and a single line for the human friendly output file is returned.
+        
+        """
+        context.possibleMatches += 1
+        
+        # Values are written as by recordPossibleMatch().
+        period_str = str(candidate.period)
+        dm_str = "*" if candidate.DM is None else str(candidate.DM)
+        RAJ, DECJ = context.position(candidate.ra,candidate.dec)
+        
+        harmonicNumber = self.harmonicLabel(harmonic_n)
+        harmonicPeriod = str(float(catalog_period)*float(harmonic_n))
+        harmonicPeriod_div_candidatePeriod = str(float(float(catalog_period)*float(harmonic_n))/float(period_str))
+        
+        context.csv.append([candidate.name + ",", RAJ, ",", DECJ, "," +\
+                       period_str + "," + dm_str + "," + repr(candidate.SNR) + "," + catalog_name + "," + str(catalog_RA) +\
                        "," + str(catalog_DEC) + "," + str(catalog_period) + "," + str(catalog_DM) + "," + harmonicNumber +\
-                       "," + harmonicPeriod + "," + harmonicPeriod_div_candidatePeriod +  "," + str(theta_sep) + "\n")
-        csvFile.close()
+                       "," + harmonicPeriod + "," + harmonicPeriod_div_candidatePeriod +  "," + str(theta_sep) + "\n"])
+        
+        return candidate.name + " -> PSR: " + catalog_name + " Harmonic Number = " + harmonicNumber +\
+               " Angular separation (deg): " + str(theta_sep) + "\n"
     
     # ******************************
     #
@@ -895,11 +1569,122 @@ class KnownSourceDB:
                 tempFile.close()
                 return False
     
+    # ****************************************************************************************************
+    
+    def isScraperOutput(self,filePath):
+        """
+        Checks if the file at the supplied path was written by PulsarSiteScraper.py. These
+        files hold one source per line, using the same twelve columns as the ANTF web
+        interface output, but without any headers.
+        
+        """
+        
+        tempFile = open(filePath,'r') # Read only access
+        line = tempFile.readline()
+        tempFile.close()
+        
+        fields = line.split()
+        
+        return len(fields) == 12 and fields[0].isdigit()
+    
     def getPath(self):
         """
-        Returns the path to the catalog file.
+        Returns the path to the catalog file, or the comma separated paths
+        of the catalog files merged.
         """        
         return self.path
     
+    def getSize(self):
+        """
+        Returns the total size in bytes of the catalog files read.
+        """
+        return sum([os.path.getsize(path) for path in self.paths])
+    
+    # ****************************************************************************************************
+    
+    def fingerprints(self,previous=None):
+        """
+        Describes the current state of each catalog file by its modification time, size
+        and MD5 digest. Hashing is skipped for a file whose time and size are unchanged
+        from the previous fingerprint given.
+        
+        Returns:
+        A list of (modification time, size, digest) tuples, one per catalog file.
+        """
+        
+        if(previous is None):
+            previous = [None] * len(self.paths)
+        
+        fingerprint = []
+        
+        for path, last in zip(self.paths,previous):
+            stat = os.stat(path)
+            
+            if(last is not None and last[0] == stat.st_mtime and last[1] == stat.st_size):
+                fingerprint.append(last)
+                continue
+            
+            digest = hashlib.md5()
+            catalogFile = open(path,'rb')
+            try:
+                for block in iter(lambda: catalogFile.read(65536), ""):
+                    digest.update(block)
+            finally:
+                catalogFile.close()
+            
+            fingerprint.append((stat.st_mtime, stat.st_size, digest.hexdigest()))
+        
+        return fingerprint
+    
+    # ****************************************************************************************************
+    
+    def hasChanged(self):
+        """
+        Checks whether the contents of any catalog file have changed since it was parsed.
+        A file that is only touched, so that its contents are the same, is not a change.
+        Nor is a file that is still being written, so a change is only reported once the
+        same contents have been seen by two checks in a row. Each change is reported once.
+        
+        Returns:
+        True if the catalog should be parsed again, else False.
+        """
+        
+        try:
+            current = self.fingerprints(self.pendingFingerprint or self.fingerprint)
+        except (IOError, OSError):
+            # A file being replaced may briefly be missing.
+            return False
+        
+        if([f[2] for f in current] == [f[2] for f in self.fingerprint]):
+            self.fingerprint = current
+            self.pendingFingerprint = None
+            return False
+        
+        if(self.pendingFingerprint is None or [f[2] for f in current] != [f[2] for f in self.pendingFingerprint]):
+            self.pendingFingerprint = current
+            return False
+        
+        self.fingerprint = current
+        self.pendingFingerprint = None
+        return True
+    
+    # ****************************************************************************************************
+    
+    def reload(self):
+        """
+        Parses the catalog files again, into a new KnownSourceDB with every index built.
+        This object is left untouched, so it can carry on being used in the meantime.
+        
+        Returns:
+        The new KnownSourceDB, or None if the catalog could not be parsed.
+        """
+        
+        db = KnownSourceDB(self.path,self.settings)
+        
+        if(db.parse() != True):
+            return None
+        
+        return db
+    
     # ****************************************************************************************************
     
\ No newline at end of file
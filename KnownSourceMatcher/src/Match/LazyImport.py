@@ -0,0 +1,108 @@
+"""
+This file is part of the KnownSourceMatcher.
+
+KnownSourceMatcher is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+KnownSourceMatcher is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with KnownSourceMatcher.  If not, see <http://www.gnu.org/licenses/>.
+
+File name:    LazyImport.py
+Created:      October 19th, 2026
+
+This code runs on python 2.4 or later.
+
+Defers the import of heavy modules such as SciPy and matplotlib until they are
+first used. Importing these takes far longer than matching a batch of candidates,
+yet most runs never call the scoring or plotting code that needs them. So rather
+than,
+
+from scipy.optimize import leastsq
+import matplotlib.pyplot as plt
+
+a module that only needs them in a few functions can write,
+
+leastsq = LazyImport.lazyAttribute("scipy.optimize","leastsq")
+plt = LazyImport.lazyModule("matplotlib.pyplot")
+
+and use leastsq and plt exactly as before. The real import happens on first use.
+
+"""
+
+import importlib
+
+# ******************************
+#
+# CLASS DEFINITIONS
+#
+# ******************************
+
+class LazyModule(object):
+    """
+    Stands in for a module, importing it when one of its attributes is first used.
+    Its own attributes are prefixed with an underscore, so they never hide those of
+    the module.
+    """
+
+    def __init__(self,name):
+        self.__dict__["_name"] = name
+        self.__dict__["_module"] = None
+
+    def _load(self):
+        if(self.__dict__["_module"] is None):
+            self.__dict__["_module"] = importlib.import_module(self.__dict__["_name"])
+        return self.__dict__["_module"]
+
+    def __getattr__(self,attribute):
+        return getattr(self._load(), attribute)
+
+    def __repr__(self):
+        return "<lazy module '" + self.__dict__["_name"] + "'>"
+
+# ******************************
+
+class LazyAttribute(object):
+    """
+    Stands in for a function or class held by a module, importing the module
+    when the function is first called.
+    """
+
+    def __init__(self,module,attribute):
+        self.module = LazyModule(module)
+        self.attribute = attribute
+
+    def __call__(self,*args,**kwargs):
+        return getattr(self.module, self.attribute)(*args,**kwargs)
+
+    def __repr__(self):
+        return "<lazy attribute '" + self.module._name + "." + self.attribute + "'>"
+
+# ******************************
+#
+# MODULE FUNCTIONS.
+#
+# ******************************
+
+def lazyModule(name):
+    """
+    Returns a stand in for the named module, i.e. "matplotlib.pyplot".
+    """
+    return LazyModule(name)
+
+# ******************************
+
+def lazyAttribute(module,attribute):
+    """
+    Returns a stand in for a callable attribute of the named module,
+    i.e. ("scipy.optimize", "leastsq").
+    """
+    return LazyAttribute(module,attribute)
+
+# ******************************
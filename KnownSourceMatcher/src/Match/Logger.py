@@ -0,0 +1,264 @@
+"""
+This file is part of the KnownSourceMatcher.
+
+KnownSourceMatcher is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+KnownSourceMatcher is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with KnownSourceMatcher.  If not, see <http://www.gnu.org/licenses/>.
+
+File name:    Logger.py
+Created:      October 19th, 2026
+
+This code runs on python 2.4 or later.
+
+"""
+
+import sys, threading, time
+
+# The logging levels, in increasing order of importance.
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+
+# ******************************
+#
+# CLASS DEFINITIONS
+#
+# ******************************
+
+class Logger(object):
+    """
+    A leveled logger for messages written on hot paths, i.e. once per candidate.
+    Messages are given as a format string and its arguments,
+
+    Logger.logger.debug("Candidate -> %s Period = %s", path, period)
+
+    and are only formatted if their level is enabled. So a disabled message costs
+    one method call and one comparison, rather than building a string that is then
+    thrown away, as Utilities.o() does.
+
+    """
+
+    # ******************************
+    #
+    # INIT FUNCTION
+    #
+    # ******************************
+    def __init__(self,level=INFO,stream=None):
+        """
+        Initialises the logger.
+
+        Parameters:
+        level     -    the lowest level of message written.
+        stream    -    the stream written to (optional), standard output by default.
+
+        """
+        self.level = level
+        self.stream = stream
+        self.lock = threading.Lock()
+
+    # ******************************
+    #
+    # FUNCTIONS.
+    #
+    # ******************************
+
+    def setLevel(self,level):
+        self.level = level
+
+    def isEnabledFor(self,level):
+        return level >= self.level
+
+    # ****************************************************************************************************
+
+    def log(self,level,message,*args):
+        """
+        Writes a message, if its level is enabled.
+
+        Parameters:
+        level      -    the level of the message.
+        message    -    the message, or a format string if arguments are given.
+        args       -    the arguments to format the message with, using the % operator.
+        """
+
+        if(level < self.level):
+            return
+
+        if(len(args) > 0):
+            message = message % args
+
+        stream = self.stream or sys.stdout
+
+        self.lock.acquire()
+        try:
+            stream.write(message + "\n")
+        finally:
+            self.lock.release()
+
+    # ****************************************************************************************************
+
+    def debug(self,message,*args):
+        if(DEBUG >= self.level):
+            self.log(DEBUG,message,*args)
+
+    def info(self,message,*args):
+        if(INFO >= self.level):
+            self.log(INFO,message,*args)
+
+    def warning(self,message,*args):
+        if(WARNING >= self.level):
+            self.log(WARNING,message,*args)
+
+    def error(self,message,*args):
+        if(ERROR >= self.level):
+            self.log(ERROR,message,*args)
+
+    # ****************************************************************************************************
+
+# ******************************
+
+class Progress(object):
+    """
+    A progress line for long runs, giving the items processed, the rate and the time
+    remaining. It is written at most once per interval, so it costs next to nothing
+    however often update() is called. Runs that finish within one interval write
+    nothing at all.
+
+    On a terminal the line is redrawn in place. Otherwise, i.e. when output is sent
+    to a log file, a new line is written each time.
+
+    """
+
+    # ******************************
+    #
+    # INIT FUNCTION
+    #
+    # ******************************
+    def __init__(self,total,label,interval=1.0,stream=None,enabled=True):
+        """
+        Initialises the progress line.
+
+        Parameters:
+        total       -    the number of items to process, or None if unknown.
+        label       -    describes the items, i.e. "candidates matched".
+        interval    -    the minimum time in seconds between updates.
+        stream      -    the stream written to (optional), standard error by default.
+        enabled     -    if False nothing is written (optional).
+
+        """
+        self.total = total
+        self.label = label
+        self.interval = float(interval)
+        self.stream = stream or sys.stderr
+        self.enabled = enabled
+        self.done = 0
+        self.started = time.time()
+        self.next = self.started + self.interval
+        self.written = False
+        self.lock = threading.Lock()
+
+        try:
+            self.inPlace = self.stream.isatty()
+        except AttributeError:
+            self.inPlace = False
+
+    # ******************************
+    #
+    # FUNCTIONS.
+    #
+    # ******************************
+
+    def update(self,count=1):
+        """
+        Records that more items have been processed.
+        """
+
+        self.done += count
+
+        if(self.enabled and time.time() >= self.next):
+            self.write(False)
+
+    # ****************************************************************************************************
+
+    def finish(self):
+        """
+        Writes the final progress line, if any line has been written.
+        """
+
+        if(self.enabled and self.written):
+            self.write(True)
+
+    # ****************************************************************************************************
+
+    def write(self,final):
+        """
+        Writes the progress line.
+        """
+
+        self.lock.acquire()
+        try:
+            now = time.time()
+            self.next = now + self.interval
+            elapsed = max(now - self.started, 1.0e-9)
+            rate = self.done / elapsed
+
+            if(self.total):
+                line = "%s: %d/%d (%.1f%%) %.1f/s" % (self.label, self.done, self.total, 100.0 * self.done / self.total, rate)
+                if(not final and rate > 0):
+                    line += " ETA " + formatSeconds((self.total - self.done) / rate)
+            else:
+                line = "%s: %d %.1f/s" % (self.label, self.done, rate)
+
+            if(final):
+                line += " in " + formatSeconds(elapsed)
+
+            if(self.inPlace):
+                self.stream.write("\r" + line.ljust(79) + ("\n" if final else ""))
+            else:
+                self.stream.write(line + "\n")
+
+            self.stream.flush()
+            self.written = True
+        finally:
+            self.lock.release()
+
+    # ****************************************************************************************************
+
+# ******************************
+#
+# MODULE FUNCTIONS.
+#
+# ******************************
+
+def formatSeconds(seconds):
+    """
+    Formats a duration in seconds as H:MM:SS.
+    """
+    seconds = int(round(seconds))
+    return "%d:%02d:%02d" % (seconds // 3600, (seconds // 60) % 60, seconds % 60)
+
+# ******************************
+
+def progress(total,label):
+    """
+    Returns a Progress line for the shared logger. It is only written at the INFO
+    level; at DEBUG a line is already written for every item, and below INFO the
+    user asked for quiet.
+    """
+    return Progress(total,label,enabled=(logger.level == INFO))
+
+# ******************************
+
+# The logger shared by the whole run.
+logger = Logger()
+
+# ******************************
@@ -0,0 +1,214 @@
+"""
+This file is part of the KnownSourceMatcher.
+
+KnownSourceMatcher is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+KnownSourceMatcher is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with KnownSourceMatcher.  If not, see <http://www.gnu.org/licenses/>.
+
+File name:    MatchContext.py
+Created:      October 19th, 2026
+
+This code runs on python 2.4 or later.
+
+"""
+
+import Coordinates
+
+# ******************************
+#
+# CLASS DEFINITION
+#
+# ******************************
+
+class MatchContext(object):
+    """
+    Holds the state of a single call to KnownSourceDB.match() or matchGroup().
+    The KnownSourceDB itself is never modified once loaded, so one instance can
+    be shared by many threads, each matching with its own context.
+
+    Matches are not written straight to the output files. Instead the text and
+    CSV records are collected here, and written together by write(). This keeps
+    the records of each candidate together, and lets a caller matching candidates
+    in parallel write the results out in the order the candidates were read.
+
+    The candidate positions in the records are only formatted once the records are
+    written. A caller holding many contexts can format the positions of them all in
+    one batch, see render().
+
+    """
+
+    # ******************************
+    #
+    # INIT FUNCTION
+    #
+    # ******************************
+    def __init__(self,outputFile):
+        """
+        Initialises the context.
+
+        Parameters:
+        outputFile    -    the path to the text file to write matches to. Matches
+                           are also written to a CSV file of the same name.
+
+        """
+
+        self.outputFile = outputFile
+
+        # The matches found by the last search, see KnownSourceDB.findMatches().
+        self.matches = []
+
+        # The harmonics being searched.
+        self.searchHarmonics = None
+
+        # Set if the candidate has no position, so must be compared to every source.
+        self.naiveSearch = False
+
+        # The number of possible matches recorded, but not yet written.
+        self.possibleMatches = 0
+
+        # The search strategy used by the last search, and the number of
+        # candidate and known source pairs compared, see Instrumentation.py.
+        self.strategy = None
+        self.comparisons = 0
+
+        self.text = []
+        self.csv = []
+
+        # The (ra, dec) positions of the candidates recorded, see position().
+        self.positions = []
+
+    # ******************************
+    #
+    # FUNCTIONS.
+    #
+    # ******************************
+
+    def position(self,ra,dec):
+        """
+        Records the position of a candidate, to be formatted along with every other
+        position recorded when the records are rendered.
+
+        Parameters:
+        ra     -    the right ascension in degrees, or None if unknown.
+        dec    -    the declination in degrees, or None if unknown.
+
+        Returns:
+        A (RAJ, DECJ) tuple of placeholders, used in place of the formatted strings.
+        A record holding placeholders is held as a list of parts, see render().
+        """
+
+        self.positions.append((ra,dec))
+        index = len(self.positions) - 1
+
+        return (("RAJ",index), ("DECJ",index))
+
+    # ****************************************************************************************************
+
+    def render(self):
+        """
+        Formats the positions recorded in this context, see render() below.
+        """
+        render([self])
+
+    # ****************************************************************************************************
+
+    def size(self):
+        """
+        Returns the number of bytes recorded, but not yet written.
+        """
+        self.render()
+        return sum([len(line) for line in self.text]) + sum([len(line) for line in self.csv])
+
+    # ****************************************************************************************************
+
+    def write(self):
+        """
+        Appends the records collected to the output files, and clears them.
+
+        Returns:
+        The number of possible matches written.
+        """
+
+        self.render()
+
+        if(len(self.text) > 0):
+            outputFile = open(self.outputFile, "a")
+            outputFile.write("".join(self.text))
+            outputFile.close()
+
+        if(len(self.csv) > 0):
+            csvFile = open(self.outputFile.replace(".txt",".csv"), "a")
+            csvFile.write("".join(self.csv))
+            csvFile.close()
+
+        written = self.possibleMatches
+
+        self.text = []
+        self.csv = []
+        self.possibleMatches = 0
+
+        return written
+
+    # ****************************************************************************************************
+
+# ******************************
+#
+# BATCH FUNCTIONS.
+#
+# ******************************
+
+def render(contexts):
+    """
+    Formats every position recorded in the MatchContexts given in a single batch, using
+    one call to Coordinates.formatRA() and one to Coordinates.formatDEC(), then joins
+    each record held as a list of parts into a string, with the placeholders replaced.
+    Unknown values are given as "*".
+
+    Parameters:
+    contexts    -    the list of MatchContexts to render.
+    """
+
+    pending = [context for context in contexts if len(context.positions) > 0]
+
+    if(len(pending) == 0):
+        return
+
+    positions = []
+
+    for context in pending:
+        positions.extend(context.positions)
+
+    columns = {}
+
+    for column, i, formatter in (("RAJ",0,Coordinates.formatRA), ("DECJ",1,Coordinates.formatDEC)):
+        values = [position[i] for position in positions]
+        known = [k for k in range(len(values)) if values[k] is not None]
+        strings = ["*"] * len(values)
+
+        if(len(known) > 0):
+            for k, text in zip(known, formatter([values[k] for k in known])):
+                strings[k] = str(text)
+
+        columns[column] = strings
+
+    # The placeholders of each context index its own positions, so are offset by
+    # the number of positions held by the contexts before it.
+    offset = 0
+
+    for context in pending:
+        for records in (context.text, context.csv):
+            for i in range(len(records)):
+                if(isinstance(records[i],list)):
+                    records[i] = "".join([columns[part[0]][offset + part[1]] if isinstance(part,tuple) else part for part in records[i]])
+
+        offset += len(context.positions)
+        context.positions = []
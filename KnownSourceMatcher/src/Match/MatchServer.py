@@ -0,0 +1,492 @@
+"""
+This file is part of the KnownSourceMatcher.
+
+KnownSourceMatcher is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+KnownSourceMatcher is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with KnownSourceMatcher.  If not, see <http://www.gnu.org/licenses/>.
+
+File name:    MatchServer.py
+Created:      October 19th, 2026
+
+This code runs on python 2.4 or later.
+
+"""
+
+import collections, datetime, json, os, signal, socket, threading, time
+import SocketServer
+import numpy as np
+import Coordinates, Instrumentation
+import KnownSourceDB
+import Settings
+from Candidate import Candidate
+from CandidateReader import CandidateReader
+from MatchContext import MatchContext
+from SweepJoin import SweepJoin
+from Utilities import Utilities
+
+# ******************************
+#
+# CLASS DEFINITION
+#
+# ******************************
+
+class MatchServer(Utilities):
+    """
+    A long running matching daemon. The catalog is loaded once, then match requests
+    are served over a Unix domain socket, or a TCP socket on the local machine. This
+    avoids paying for interpreter startup, imports and catalog parsing on every batch.
+
+    Requests and replies are JSON objects, one per line. A connection may send any
+    number of requests, each answered in turn. The commands understood are:
+
+    {"command": "match", "id": 1, "candidates": [{"name": "c1", "ra": 83.63, "dec": 22.01,
+                                                  "period": 0.0334, "dm": 56.8, "snr": 12.0}],
+                                  "paths": ["/data/cand.pfd"]}
+    {"command": "stats"}
+    {"command": "reload"}
+    {"command": "shutdown"}
+
+    Candidate positions are given in degrees, or as RAJ/DECJ sexagesimal strings. Missing
+    values may be left out. Paths name .phcx.gz or .pfd files readable by the server. Every
+    reply carries the "id" of its request (if any), and a "status" of "ok" or "error".
+    A match reply lists one record per match found, in the order the candidates were given.
+
+    A reload (also triggered by SIGHUP) parses the catalog again in the background. Requests
+    keep being served by the old catalog until the new one is ready, when it is swapped in.
+    A request in progress always completes using the catalog it started with. The catalog
+    files are also checked for changes every reload interval, and reloaded the same way
+    once a change has settled (see KnownSourceDB.hasChanged()).
+
+    """
+
+    # The number of recent requests latency statistics are computed over.
+    LATENCY_WINDOW = 10000
+
+    # Seconds between checks for signals, while the server runs.
+    POLL = 0.5
+
+    # ******************************
+    #
+    # INIT FUNCTION
+    #
+    # ******************************
+    def __init__(self,debugFlag,db,psrcat,address,outputPath="",reloadInterval=0.0):
+        """
+        Initialises the class.
+
+        Parameters:
+        debugFlag     -    the debugging flag.
+        db            -    the parsed KnownSourceDB to serve.
+        psrcat        -    the path to the catalog, parsed again on reload.
+        address       -    the address to listen on. Either host:port for a TCP socket, or
+                           the path to a Unix domain socket.
+        outputPath    -    the path to a text file that matches are also written to (optional).
+        reloadInterval -   the time in seconds between checks of the catalog files for changes,
+                           or 0 to only reload when asked (optional).
+
+        """
+        Utilities.__init__(self,debugFlag)
+        self.db = db
+        self.psrcat = psrcat
+        self.address = address
+        self.outputPath = outputPath
+        self.reloadInterval = float(reloadInterval)
+        self.reader = CandidateReader(debugFlag)
+
+        self.server = None
+        self.started = None
+        self.stopping = threading.Event()
+        self.reloadRequested = threading.Event()
+
+        # Guards the statistics below, and the swap of the catalog on reload.
+        self.lock = threading.Lock()
+        self.reloading = False
+
+        self.requests = 0
+        self.candidates = 0
+        self.matches = 0
+        self.errors = 0
+        self.reloads = 0
+        self.latencies = collections.deque(maxlen=self.LATENCY_WINDOW)
+
+    # ******************************
+    #
+    # FUNCTIONS.
+    #
+    # ******************************
+
+    def run(self):
+        """
+        Starts the server, and serves requests until shut down by a request, SIGINT or SIGTERM.
+        """
+
+        # Matches are appended to the output files, which only need a header once.
+        if(self.outputPath):
+            csvPath = self.outputPath.replace(".txt",".csv")
+            if(not os.path.isfile(csvPath) or os.path.getsize(csvPath) == 0):
+                self.appendToFile(csvPath,'Candidate,RAJ,DECJ,P0,DM,SNR,Known Source,RAJ,DECJ,P0,DM,Harmonic Number,Harmonic Period,Harmonic Period/Candidate Period,Angular separation(deg)\n')
+
+        self.server = self.createServer(self.address)
+        self.server.matchServer = self
+        self.started = time.time()
+
+        signal.signal(signal.SIGHUP, lambda signum, frame: self.reloadRequested.set())
+        signal.signal(signal.SIGTERM, lambda signum, frame: self.stopping.set())
+        signal.signal(signal.SIGINT, lambda signum, frame: self.stopping.set())
+
+        # Requests are served by a separate thread, so this one is free to handle signals.
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.setDaemon(True)
+        thread.start()
+
+        print "Serving match requests on: ", self.address
+
+        # Reloads run on this thread, so requests are still served while the catalog is parsed.
+        check = time.time() + self.reloadInterval
+
+        try:
+            while(not self.stopping.isSet()):
+                self.stopping.wait(self.POLL)
+
+                if(self.reloadRequested.isSet()):
+                    self.reloadRequested.clear()
+                    self.reload()
+                elif(self.reloadInterval > 0 and time.time() >= check):
+                    check = time.time() + self.reloadInterval
+
+                    if(self.db.hasChanged()):
+                        print "Catalog changed, reloading"
+                        self.reload()
+        finally:
+            self.server.shutdown()
+            self.server.server_close()
+            thread.join()
+
+            if(isinstance(self.server, SocketServer.UnixStreamServer) and os.path.exists(self.address)):
+                os.remove(self.address)
+
+        print self.statistics()
+
+    # ****************************************************************************************************
+
+    def createServer(self,address):
+        """
+        Creates the socket server for an address, see __init__().
+        """
+
+        if(":" in address):
+            host, port = address.rsplit(":",1)
+            return ThreadingTCPServer((host or "127.0.0.1", int(port)), RequestHandler)
+
+        # A socket file left behind by a server that was killed must be removed
+        # before the address can be bound to again. A live server keeps its socket.
+        if(os.path.exists(address)):
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                try:
+                    probe.connect(address)
+                    raise IOError("A server is already listening on " + address)
+                except socket.error:
+                    os.remove(address)
+            finally:
+                probe.close()
+
+        return ThreadingUnixServer(address, RequestHandler)
+
+    # ****************************************************************************************************
+
+    def handle(self,request):
+        """
+        Answers a single request.
+
+        Parameters:
+        request    -    the request, decoded from JSON.
+
+        Returns:
+        The reply, to be encoded as JSON.
+        """
+
+        start = time.time()
+
+        command = request.get("command", "match")
+
+        if(command == "match"):
+            reply = self.match(request)
+        elif(command == "stats"):
+            reply = self.statistics()
+        elif(command == "reload"):
+            reply = {"reloaded": self.reload()}
+        elif(command == "shutdown"):
+            self.stopping.set()
+            reply = {}
+        else:
+            raise ValueError("Unknown command: " + str(command))
+
+        reply["id"] = request.get("id")
+        reply["status"] = "ok"
+        reply["seconds"] = time.time() - start
+
+        self.lock.acquire()
+        try:
+            self.requests += 1
+
+            if(command == "match"):
+                self.latencies.append(reply["seconds"])
+                self.candidates += reply["candidates"]
+                self.matches += len(reply["matches"])
+        finally:
+            self.lock.release()
+
+        return reply
+
+    # ****************************************************************************************************
+
+    def match(self,request):
+        """
+        Matches the candidates in a request.
+
+        Returns:
+        The reply, listing one record per match found.
+        """
+
+        # Taken once, so the whole request is matched against the same catalog,
+        # even if a reload completes part way through.
+        db = self.db
+
+        candidates = [self.buildCandidate(parameters) for parameters in request.get("candidates", [])]
+
+        for path in request.get("paths", []):
+            candidate = self.reader.read(str(path))
+            if(candidate is None):
+                raise ValueError("Not a candidate file: " + str(path))
+            candidates.append(candidate)
+
+        # Larger batches find the sources near every candidate in a single sweep.
+        if(len(candidates) > 1):
+            neighbourhoods = SweepJoin(self.debug,db.catalog,db.radius).join(candidates)
+        else:
+            neighbourhoods = {}
+
+        context = MatchContext(self.outputPath)
+        records = []
+
+        for i in range(len(candidates)):
+            for match in db.match(candidates[i],self.outputPath,neighbourhoods.get(i),context):
+                records.append(self.record(db,candidates[i],match))
+
+        if(self.outputPath):
+            db.write(context)
+
+        return {"candidates": len(candidates), "matches": records}
+
+    # ****************************************************************************************************
+
+    def buildCandidate(self,parameters):
+        """
+        Builds a Candidate record from the parameters given in a request.
+        """
+
+        ra = parameters.get("ra")
+        dec = parameters.get("dec")
+
+        if(isinstance(ra, basestring)):
+            ra = Coordinates.parseRA(str(ra))
+        elif(ra is not None):
+            ra = float(ra)
+
+        if(isinstance(dec, basestring)):
+            dec = Coordinates.parseDEC(str(dec))
+        elif(dec is not None):
+            dec = float(dec)
+
+        period = parameters.get("period")
+        dm = parameters.get("dm")
+
+        return Candidate(str(parameters.get("name", "")), ra, dec,
+                         None if period is None else float(period),
+                         None if dm is None else float(dm),
+                         float(parameters.get("snr", 0.0)))
+
+    # ****************************************************************************************************
+
+    def record(self,db,candidate,match):
+        """
+        Describes a match found by KnownSourceDB.findMatches(), using the fields of the CSV output.
+        """
+
+        knownSource, catalog_period, harmonic, catalog_RA, catalog_DEC, catalog_DM, theta = match
+        harmonicPeriod = float(catalog_period) * float(harmonic)
+
+        return {"candidate": candidate.name,
+                "source": knownSource.sourceName,
+                "ra": str(catalog_RA),
+                "dec": str(catalog_DEC),
+                "period": str(catalog_period),
+                "dm": str(catalog_DM),
+                "harmonic": db.harmonicLabel(harmonic),
+                "harmonicPeriod": harmonicPeriod,
+                "ratio": harmonicPeriod / candidate.period,
+                "separation": theta}
+
+    # ****************************************************************************************************
+
+    def reload(self):
+        """
+        Parses the catalog and settings again, and swaps them in once ready. Requests
+        are served by the previous catalog in the meantime. If the catalog cannot be
+        parsed, the previous catalog is kept.
+
+        Returns:
+        True if the catalog was reloaded, else False.
+        """
+
+        self.lock.acquire()
+        try:
+            if(self.reloading):
+                return False
+            self.reloading = True
+        finally:
+            self.lock.release()
+
+        try:
+            start = datetime.datetime.now()
+
+            settings = Settings.Settings(self.debug)
+            settings.load()
+
+            db = KnownSourceDB.KnownSourceDB(self.psrcat,settings)
+
+            # A file caught part way through being written may not parse at all.
+            token = Instrumentation.stats.start("load")
+            try:
+                try:
+                    parsed = db.parse()
+                except Exception, e:
+                    print "Catalog reload failed (", e, ")."
+                    parsed = False
+            finally:
+                Instrumentation.stats.stop("load",token,bytes=db.getSize())
+
+            if(parsed != True):
+                print "Catalog reload failed, still serving the previous catalog."
+                return False
+
+            self.lock.acquire()
+            try:
+                self.db = db
+                self.reloads += 1
+            finally:
+                self.lock.release()
+
+            print "Catalog reloaded, time taken: ", str(datetime.datetime.now() - start)
+            return True
+        finally:
+            self.lock.acquire()
+            try:
+                self.reloading = False
+            finally:
+                self.lock.release()
+
+    # ****************************************************************************************************
+
+    def statistics(self):
+        """
+        Returns the request counts and latency statistics (in seconds) of the server.
+        """
+
+        self.lock.acquire()
+        try:
+            latencies = np.array(self.latencies, dtype=np.float64)
+
+            stats = {"uptime": time.time() - self.started,
+                     "requests": self.requests,
+                     "candidates": self.candidates,
+                     "matches": self.matches,
+                     "errors": self.errors,
+                     "reloads": self.reloads,
+                     "knownSources": self.db.knownSourceCount,
+                     "instrumentation": Instrumentation.stats.toDict()}
+        finally:
+            self.lock.release()
+
+        if(len(latencies) > 0):
+            stats["latency"] = {"count": len(latencies),
+                                "mean": float(latencies.mean()),
+                                "p50": float(np.percentile(latencies, 50)),
+                                "p95": float(np.percentile(latencies, 95)),
+                                "p99": float(np.percentile(latencies, 99)),
+                                "max": float(latencies.max())}
+
+        return stats
+
+    # ****************************************************************************************************
+
+    def failed(self):
+        """
+        Counts a request that could not be answered.
+        """
+        self.lock.acquire()
+        try:
+            self.errors += 1
+        finally:
+            self.lock.release()
+
+    # ****************************************************************************************************
+
+# ******************************
+#
+# SOCKET SERVER CLASSES.
+#
+# ******************************
+
+class RequestHandler(SocketServer.StreamRequestHandler):
+    """
+    Reads the requests sent over a connection one line at a time, and writes
+    a reply line for each.
+    """
+
+    def handle(self):
+        server = self.server.matchServer
+
+        while(True):
+            line = self.rfile.readline()
+
+            if(not line):
+                break
+
+            if(len(line.strip()) == 0):
+                continue
+
+            request = {}
+            try:
+                request = json.loads(line)
+                reply = server.handle(request)
+            except Exception, e:
+                server.failed()
+                reply = {"id": request.get("id") if isinstance(request, dict) else None,
+                         "status": "error", "error": str(e)}
+
+            self.wfile.write(json.dumps(reply) + "\n")
+            self.wfile.flush()
+
+# ******************************
+
+class ThreadingTCPServer(SocketServer.ThreadingMixIn, SocketServer.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+# ******************************
+
+class ThreadingUnixServer(SocketServer.ThreadingMixIn, SocketServer.UnixStreamServer):
+    daemon_threads = True
+
+# ******************************
@@ -40,9 +40,12 @@ import datetime, sys
 import Utilities
 import Settings
 import KnownSourceDB
-import InputProcessor
-import Interactive
-import Validator
+import Instrumentation
+import Logger
+
+# The modules used by each mode are only imported once that mode is chosen.
+# Interactive mode for instance imports matplotlib and PIL, which take far
+# longer to load than a plain match takes to run. See StartupBenchmark.py.
 
 # ******************************
 #
@@ -88,9 +91,22 @@ class Matcher:
         parser.add_option("-p", action="store", dest="path",help='Path to the directory/file containing candidates.',default="")
         parser.add_option("-i", action="store_true", dest="interactive",help='Interactive mode flag (optional).'    ,default=False)
         parser.add_option("-v", action="store_true", dest="verbose",    help='Verbose debugging flag (optional).'   ,default=False)
+        parser.add_option("-q", action="store_true", dest="quiet",      help='Quiet flag, hides the progress line written on long runs (optional).',default=False)
         parser.add_option("--v", action="store_true", dest="validator",    help='Validation flag (optional).'   ,default=False)
         parser.add_option('-o', action="store", dest="outputPath",type="string",help='The path to write matches to (optional).',default="")
-        parser.add_option("--psrcat", action="store", dest="psrcat",help='Path to the pulsar catalog data to use (required).',default="")
+        parser.add_option("--psrcat", action="store", dest="psrcat",help='Path to the pulsar catalog data to use, or a comma separated list of catalogs to merge (required).',default="")
+        parser.add_option("--cluster", action="store_true", dest="cluster",help='Group duplicate candidates before matching (optional).',default=False)
+        parser.add_option("--sweep", action="store_true", dest="sweep",help='Match all candidates in a single sweep over the catalog (optional).',default=False)
+        parser.add_option("--processes", action="store", dest="processes",type="int",help='The number of worker processes used to match candidates (optional).',default=1)
+        parser.add_option("--threads", action="store", dest="threads",type="int",help='The number of threads used to match candidates (optional).',default=1)
+        parser.add_option("--serve", action="store", dest="serve",type="string",help='Run as a daemon serving match requests on a Unix socket path or host:port (optional).',default="")
+        parser.add_option("--watch", action="store_true", dest="watch",help='Watch the candidate directory, matching new or changed candidates as they appear (optional).',default=False)
+        parser.add_option("--interval", action="store", dest="interval",type="float",help='The time in seconds between polls of a watched directory (optional).',default=60.0)
+        parser.add_option("--reload-interval", action="store", dest="reloadInterval",type="float",help='The time in seconds between checks of the catalog files for changes, when serving or watching, 0 to disable (optional).',default=10.0)
+        parser.add_option("--stats", action="store", dest="statsPath",type="string",help='The path to write stage timings and counters to as JSON (optional).',default="")
+        parser.add_option("--profile", action="store", dest="profile",type="string",help='A comma separated list of stages to profile, from parse, discovery, decode, match, write, score, cluster and join (optional).',default="")
+        parser.add_option("--profiler", action="store", dest="profiler",type="choice",choices=["cprofile","sample"],help='The profiler used by --profile, either cprofile or sample (optional).',default="cprofile")
+        parser.add_option("--profile-out", action="store", dest="profilePrefix",type="string",help='The path prefix of the profiles written by --profile (optional).',default="profile")
         
         (args,options) = parser.parse_args()# @UnusedVariable : Tells Eclipse IDE to ignore warning.
         
@@ -101,6 +117,44 @@ class Matcher:
         self.outputPath     = args.outputPath
         self.psrcat         = args.psrcat
         self.validate       = args.validator
+        self.cluster        = args.cluster
+        self.sweep          = args.sweep
+        self.threads        = args.threads
+        self.processes      = args.processes
+        self.serve          = args.serve
+        self.watch          = args.watch
+        self.interval       = args.interval
+        self.reloadInterval = args.reloadInterval
+        self.statsPath      = args.statsPath
+        self.profile        = args.profile
+        
+        # Worker processes match single candidates against a CatalogSnapshot, so they
+        # can neither match groups of candidates, nor be combined with threads.
+        if(self.processes > 1 and self.cluster):
+            print "The --processes flag can't be used with --cluster, exiting"
+            sys.exit()
+        
+        if(self.processes > 1 and self.threads > 1):
+            print "The --processes and --threads flags can't be used together, exiting"
+            sys.exit()
+        
+        # Messages below this level cost next to nothing, see Logger.py.
+        if(self.debug):
+            Logger.logger.setLevel(Logger.DEBUG)
+        elif(args.quiet):
+            Logger.logger.setLevel(Logger.WARNING)
+        
+        # Profile the chosen stages, see Profiler.py.
+        profiler = None
+        if(self.profile):
+            import Profiler
+            try:
+                profiler = Profiler.Profiler(self.debug,[stage.strip() for stage in self.profile.split(",")],args.profiler,args.profilePrefix)
+            except ValueError as e:
+                print str(e) + ", exiting"
+                sys.exit()
+            Instrumentation.stats.attach(profiler)
+            profiler.start()
         
         # Non-user defined variables
         self.log = "log.txt"
@@ -110,9 +164,11 @@ class Matcher:
         
         utils.o("Loading Pulsar ATNF Catalog:")
         
-        if(utils.fileExists(self.psrcat)==False):
-            print "You haven't specified a pulsar catalog to use (via the --psrcat flag), exiting!"
-            sys.exit()
+        # Several catalogs can be merged, given as a comma separated list.
+        for path in self.psrcat.split(","):
+            if(utils.fileExists(path.strip())==False):
+                print "You haven't specified a pulsar catalog to use (via the --psrcat flag), exiting!"
+                sys.exit()
             
         # Build the settings object
         settings = Settings.Settings(self.debug)
@@ -120,8 +176,11 @@ class Matcher:
         
         psrcat = KnownSourceDB.KnownSourceDB(self.psrcat,settings)
         start = datetime.datetime.now()
+        token = Instrumentation.stats.start("load")
+        parsed = psrcat.parse()
+        Instrumentation.stats.stop("load",token,bytes=psrcat.getSize())
 
-        if(psrcat.parse() == True):
+        if(parsed == True):
             end = datetime.datetime.now()
             utils.o("Loaded, time taken: " + str(end - start) + "\n")
         else:
@@ -148,6 +207,7 @@ class Matcher:
             
             print "\nEntering interactive mode"
             
+            import Interactive
             interactive = Interactive.Interactive(self.debug,psrcat,self.outputPath)
             interactive.run()
             
@@ -155,8 +215,17 @@ class Matcher:
             
             print "\nEntering validation mode"
             
+            import Validator
             validator = Validator.Validator(self.debug,psrcat,self.outputPath)
             validator.run()
+            
+        elif(self.serve):
+            
+            print "\nEntering daemon mode"
+            
+            import MatchServer
+            server = MatchServer.MatchServer(self.debug,psrcat,self.psrcat,self.serve,self.outputPath,self.reloadInterval)
+            server.run()
               
         else:
             # Else user chooses normal mode.
@@ -183,6 +252,10 @@ class Matcher:
                 print "Invalid path input, exiting"
                 sys.exit()
             
+            if(self.watch and not self.processDirectory):
+                print "Only a directory can be watched, exiting"
+                sys.exit()
+            
             print "\n****************************"
             print "|  Command Line Arguments  |"
             print "****************************\n"
@@ -193,10 +266,45 @@ class Matcher:
             print "\tPSRCAT path:",         self.psrcat
             print "\tOutput path:",         self.outputPath
             print "\tProcess file:",        self.processFile
-            print "\tProcess directory:",   self.processDirectory,"\n\n"
+            print "\tProcess directory:",   self.processDirectory
+            print "\tCluster candidates:",  self.cluster
+            print "\tSweep join:",          self.sweep
+            print "\tThreads:",             self.threads
+            print "\tProcesses:",           self.processes
+            print "\tWatch directory:",     self.watch
+            print "\tPoll interval:",       self.interval,"\n\n"
             
+            import InputProcessor
             inputProcessor = InputProcessor.InputProcessor(self.debug,psrcat,settings,self)
-            inputProcessor.process()
+            
+            if(self.watch):
+                import Watcher
+                watcher = Watcher.Watcher(self.debug,self.path,self.interval,self.outputPath.replace(".txt","_watched.csv"))
+                
+                # The catalog is rebuilt in the background if its files change.
+                if(self.reloadInterval > 0):
+                    import CatalogReloader
+                    inputProcessor.reloader = CatalogReloader.CatalogReloader(self.debug,psrcat,self.reloadInterval)
+                    inputProcessor.reloader.start()
+                
+                try:
+                    watcher.run(inputProcessor.processPaths)
+                finally:
+                    if(inputProcessor.reloader is not None):
+                        inputProcessor.reloader.stop()
+            else:
+                inputProcessor.process()
+        
+        if(not Instrumentation.stats.isEmpty()):
+            print "\n" + str(Instrumentation.stats) + "\n"
+        
+        if(self.statsPath):
+            Instrumentation.stats.dump(self.statsPath)
+        
+        if(profiler is not None):
+            Instrumentation.stats.attach(None)
+            for path in profiler.save():
+                print "Profile written to: ", path
         
         print "Done."
     
@@ -0,0 +1,141 @@
+"""
+This file is part of the KnownSourceMatcher.
+
+KnownSourceMatcher is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+KnownSourceMatcher is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with KnownSourceMatcher.  If not, see <http://www.gnu.org/licenses/>.
+
+File name:    NeighbourhoodCache.py
+Created:      October 19th, 2026
+
+This code runs on python 2.4 or later.
+
+"""
+
+import math, threading
+import ordereddict
+from Utilities import Utilities
+
+# ******************************
+#
+# CLASS DEFINITION
+#
+# ******************************
+
+class NeighbourhoodCache(Utilities):
+    """
+    A least recently used (LRU) cache of the known sources found near a position
+    on the sky. All the candidates from a single beam share the same RA and DEC,
+    so once the neighbourhood of the first has been found, the remaining candidates
+    can reuse it, and only the period and DM checks need to be run for them.
+
+    Positions are quantized to the nearest arcsecond to build the cache key.
+    Candidates falling in the same cell but at a slightly different position are
+    still served from the cache, so the caller stores sources within the match
+    radius plus a small margin (see getMargin()), and recomputes the separations.
+
+    The cache may be shared by several threads, so all access to it is locked.
+
+    """
+
+    # One arcsecond, in degrees.
+    QUANTUM = 1.0/3600.0
+
+    # ******************************
+    #
+    # INIT FUNCTION
+    #
+    # ******************************
+    def __init__(self,debugFlag,size):
+        """
+        Initialises the class.
+
+        Parameters:
+        debugFlag    -    the debugging flag.
+        size         -    the maximum number of neighbourhoods to hold.
+
+        """
+        Utilities.__init__(self,debugFlag)
+        self.size = int(size)
+        self.entries = ordereddict.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    # ******************************
+    #
+    # FUNCTIONS.
+    #
+    # ******************************
+
+    def key(self,ra,dec):
+        """
+        Returns the cache key for a position given in degrees.
+        """
+        return (int(math.floor(ra / self.QUANTUM)), int(math.floor(dec / self.QUANTUM)))
+
+    # ****************************************************************************************************
+
+    def getMargin(self):
+        """
+        Returns the largest separation in degrees between two positions sharing a key.
+        """
+        return 2.0 * self.QUANTUM
+
+    # ****************************************************************************************************
+
+    def get(self,key):
+        """
+        Returns the neighbourhood stored for the key, or None if there isn't one.
+        The entry found becomes the most recently used.
+        """
+
+        self.lock.acquire()
+        try:
+            if(key in self.entries):
+                self.hits += 1
+                value = self.entries.pop(key)
+                self.entries[key] = value
+                return value
+            else:
+                self.misses += 1
+                return None
+        finally:
+            self.lock.release()
+
+    # ****************************************************************************************************
+
+    def put(self,key,value):
+        """
+        Stores a neighbourhood, evicting the least recently used entry if the cache is full.
+        """
+
+        self.lock.acquire()
+        try:
+            if(key in self.entries):
+                del self.entries[key]
+            elif(len(self.entries) >= self.size):
+                self.entries.popitem(last=False)
+
+            self.entries[key] = value
+        finally:
+            self.lock.release()
+
+    # ****************************************************************************************************
+
+    def __str__(self):
+        """
+        Summarises the use of the cache.
+        """
+        return "Neighbourhood cache hits: " + str(self.hits) + " misses: " + str(self.misses)
+
+    # ****************************************************************************************************
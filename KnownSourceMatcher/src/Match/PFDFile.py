@@ -46,11 +46,16 @@ from numpy import mean
 from numpy import zeros
 from numpy import shape
 from numpy import sqrt
-from scipy.stats import skew
-from scipy.stats import kurtosis
 from numpy import std
 
+# SciPy is only imported once scores are computed, see LazyImport.py.
+import LazyImport
+skew = LazyImport.lazyAttribute("scipy.stats","skew")
+kurtosis = LazyImport.lazyAttribute("scipy.stats","kurtosis")
+
 # Custom file Imports:
+import Instrumentation
+import Logger
 from CandidateFileInterface import CandidateFileInterface
 from PFDOperations import PFDOperations
 
@@ -246,7 +251,7 @@ class PFD(CandidateFileInterface):
             
         # Just go directly to score generation without checks.
         else:
-            self.out( "Candidate validity checks skipped.","")
+            Logger.logger.debug("Candidate validity checks skipped. ")
             self.profile = array(self.getprofile())
     
     # ****************************************************************************************************
@@ -588,6 +593,8 @@ class PFD(CandidateFileInterface):
         An array of 22 candidate scores as floating point values.
         """
         
+        token = Instrumentation.stats.start("score")
+        
         # Get scores 1-4
         self.computeSinusoidFittingScores()
         
@@ -603,6 +610,8 @@ class PFD(CandidateFileInterface):
         # Get scores 20-22
         self.computeSubBandScores()
 
+        Instrumentation.stats.stop("score",token)
+
         return self.scores
         
     # ****************************************************************************************************
@@ -41,11 +41,13 @@ from numpy import corrcoef
 import numpy as Num
 import numpy.fft as FFT
 
-from scipy.special import i0
-from scipy.optimize import leastsq
-from scipy import stats  # BWS
+# SciPy and matplotlib are only imported when first used, see LazyImport.py.
+import LazyImport
+i0 = LazyImport.lazyAttribute("scipy.special","i0")
+leastsq = LazyImport.lazyAttribute("scipy.optimize","leastsq")
+stats = LazyImport.lazyModule("scipy.stats")  # BWS
 
-import matplotlib.pyplot as plt # Revision:1
+plt = LazyImport.lazyModule("matplotlib.pyplot") # Revision:1
 
 # Custom file Imports:
 from ProfileOperations import ProfileOperations
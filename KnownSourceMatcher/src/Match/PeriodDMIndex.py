@@ -0,0 +1,276 @@
+"""
+This file is part of the KnownSourceMatcher.
+
+KnownSourceMatcher is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+KnownSourceMatcher is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with KnownSourceMatcher.  If not, see <http://www.gnu.org/licenses/>.
+
+File name:    PeriodDMIndex.py
+Created:      October 19th, 2026
+
+This code runs on python 2.4 or later.
+
+"""
+
+import math
+import numpy as np
+
+# ******************************
+#
+# CLASS DEFINITION
+#
+# ******************************
+
+class PeriodDMIndex(object):
+    """
+    A two dimensional grid over the period and DM of every known source in a Catalog.
+    When a candidate has no usable position, period and DM are the only parameters
+    left to filter on. Rather than testing the period of every source and then its
+    DM, the grid allows both windows to be intersected before any source is visited.
+
+    The grid is divided into cells over log(P) and log(DM). Both are compared to a
+    candidate using a percentage accuracy, so in log space each window has the same
+    width wherever it falls, and spans at most a few cells. Each source is given the
+    number of the cell it falls in, where cells are numbered row by row (one row per
+    period bin). The sources are then sorted by cell number, so that all the cells of
+    a row within a DM window form one contiguous range of the sorted array, found with
+    two binary searches.
+
+    Sources without a DM can never be excluded by a DM window, so they are kept in a
+    bucket of their own at the start of each row (column 0), which is always searched.
+    Sources with a DM of zero or less are held in column 1, which is only searched when
+    no DM window is applied. Sources without a period are not indexed at all.
+
+    """
+
+    # Columns reserved at the start of each row.
+    NO_DM = 0
+    NON_POSITIVE_DM = 1
+    FIRST_DM = 2
+
+    # ******************************
+    #
+    # INIT FUNCTION
+    #
+    # ******************************
+    def __init__(self,catalog,accuracy):
+        """
+        Builds the grid.
+
+        Parameters:
+        catalog     -    the Catalog to index.
+        accuracy    -    the percentage accuracy used to compare periods and DMs.
+                         This sets the size of the cells.
+
+        """
+
+        self.catalog = catalog
+
+        # Cells are as wide as the log of a window, so each window spans at most
+        # three cells. A minimum width stops a zero accuracy creating huge grids.
+        self.binWidth = max(math.log1p(float(accuracy)/100), 1.0e-3)
+
+        period = catalog.p0
+        dm = catalog.dm
+
+        indexed = np.flatnonzero(np.nan_to_num(period) > 0)
+
+        positive = np.nan_to_num(dm[indexed]) > 0
+        dmBins = np.zeros(len(indexed), dtype=np.int64)
+        dmBins[positive] = np.floor(np.log(dm[indexed][positive]) / self.binWidth).astype(np.int64)
+
+        if(np.any(positive)):
+            self.minDMBin = int(dmBins[positive].min())
+            maxDMBin = int(dmBins[positive].max())
+        else:
+            self.minDMBin = 0
+            maxDMBin = 0
+
+        columns = np.where(positive, dmBins - self.minDMBin + self.FIRST_DM, self.NON_POSITIVE_DM)
+        columns[np.isnan(dm[indexed])] = self.NO_DM
+
+        self.columns = maxDMBin - self.minDMBin + self.FIRST_DM + 1
+
+        rows = np.floor(np.log(period[indexed]) / self.binWidth).astype(np.int64)
+        cells = rows * self.columns + columns
+
+        order = np.lexsort((indexed, cells))
+
+        self.cells   = cells[order]
+        self.sources = indexed[order]
+        self.firstRow = int(rows.min()) if len(rows) else 0
+
+    # ******************************
+    #
+    # FUNCTIONS.
+    #
+    # ******************************
+
+    def row(self,period):
+        """
+        Returns the row of the grid that a period falls in.
+        """
+        return int(math.floor(math.log(period) / self.binWidth))
+
+    # ****************************************************************************************************
+
+    def column(self,dm):
+        """
+        Returns the column of the grid that a positive DM falls in, limited to the
+        columns that hold sources.
+        """
+        column = int(math.floor(math.log(dm) / self.binWidth)) - self.minDMBin + self.FIRST_DM
+        return min(max(column, self.FIRST_DM), self.columns - 1)
+
+    # ****************************************************************************************************
+
+    def select(self,periodLow,periodHigh,dmLow=None,dmHigh=None):
+        """
+        Finds the known sources with a period inside a window, and a DM inside a
+        second window or no DM at all. See selectWindows().
+
+        Returns:
+        A sorted numpy array of the positions of the selected sources in the catalog.
+        """
+        sources, windows = self.selectWindows([periodLow],[periodHigh],dmLow,dmHigh)
+        return np.sort(sources)
+
+    # ****************************************************************************************************
+
+    def selectWindows(self,periodLows,periodHighs,dmLow=None,dmHigh=None):
+        """
+        Finds the known sources with a period inside any of several windows, and a DM
+        inside a second window or no DM at all. All the windows are searched at once,
+        so that the cost of a query barely depends on the number of windows. The windows
+        are inclusive, and very slightly widened, as the grid is only a pre-filter.
+        Exact tests are left to the caller.
+
+        Parameters:
+        periodLows     -    the lower edges of the period windows.
+        periodHighs    -    the upper edges of the period windows.
+        dmLow          -    the lower edge of the DM window, or None to accept any DM.
+        dmHigh         -    the upper edge of the DM window, or None to accept any DM.
+
+        Returns:
+        A (sources, windows) tuple of numpy arrays, giving the position in the catalog of
+        each source selected, and the number of the period window it was selected by.
+        """
+
+        slack = 1.0e-9
+
+        applyDM = dmLow is not None and dmHigh is not None
+
+        if(applyDM and dmHigh <= 0):
+            # Only sources without a DM remain.
+            spans = [(self.NO_DM, self.NO_DM)]
+        elif(applyDM):
+            dmLow = max(dmLow, 0.0) * (1.0 - slack)
+            dmHigh = dmHigh * (1.0 + slack)
+            firstColumn = self.column(dmLow) if dmLow > 0 else self.FIRST_DM
+            spans = [(self.NO_DM, self.NO_DM), (firstColumn, self.column(dmHigh))]
+        else:
+            spans = [(0, self.columns - 1)]
+
+        lows = []
+        highs = []
+        windows = []
+        periodLows = np.maximum(np.asarray(periodLows, dtype=np.float64), 0.0) * (1.0 - slack)
+        periodHighs = np.asarray(periodHighs, dtype=np.float64) * (1.0 + slack)
+
+        for w in range(len(periodLows)):
+
+            if(periodHighs[w] <= 0 or periodHighs[w] < periodLows[w]):
+                continue
+
+            if(periodLows[w] > 0):
+                firstRow = max(self.row(periodLows[w]), self.firstRow)
+            else:
+                firstRow = self.firstRow
+
+            for row in range(firstRow, self.row(periodHighs[w]) + 1):
+                for first, last in spans:
+                    lows.append(row * self.columns + first)
+                    highs.append(row * self.columns + last)
+                    windows.append(w)
+
+        starts = np.searchsorted(self.cells, lows, side='left')
+        counts = np.searchsorted(self.cells, highs, side='right') - starts
+
+        # Expand each (start, count) range of the sorted array into its positions.
+        total = int(counts.sum())
+        offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+        positions = np.repeat(starts, counts) + offsets
+
+        sources = self.sources[positions]
+        windows = np.repeat(np.asarray(windows, dtype=np.int64), counts)
+
+        # Remove the sources that share a cell with a window, but lie outside it.
+        period = self.catalog.p0[sources]
+        keep = (period >= periodLows[windows]) & (period <= periodHighs[windows])
+
+        if(applyDM):
+            dm = self.catalog.dm[sources]
+            keep &= np.isnan(dm) | ((np.nan_to_num(dm) >= dmLow) & (np.nan_to_num(dm) <= dmHigh))
+
+        return (sources[keep], windows[keep])
+
+    # ****************************************************************************************************
+
+    def query(self,period,acc,dm,dmAcc,harmonics,low=None,high=None):
+        """
+        Finds the known sources with a harmonic period within acc of the candidate period,
+        and a DM within dmAcc of the candidate DM, as tested by KnownSourceDB.
+
+        Parameters:
+        period       -    the candidate period.
+        acc          -    the period accuracy, in seconds.
+        dm           -    the candidate DM, or None if the DM is not to be tested.
+        dmAcc        -    the DM accuracy.
+        harmonics    -    the harmonics to search, each greater than zero.
+        low          -    only sources at or after this index in the catalog are returned (optional).
+        high         -    only sources before this index in the catalog are returned (optional).
+
+        Returns:
+        A list of (source index, [harmonic, ...]) tuples, in catalog order, just as
+        returned by HarmonicIndex.query().
+        """
+
+        if(dm is None):
+            dmLow, dmHigh = None, None
+        else:
+            dmLow, dmHigh = dm - dmAcc, dm + dmAcc
+
+        h = np.array(harmonics, dtype=np.float64)
+        sources, windows = self.selectWindows((period - acc) / h, (period + acc) / h, dmLow, dmHigh)
+
+        if(low is not None):
+            keep = sources >= low
+            sources = sources[keep]
+            windows = windows[keep]
+
+        if(high is not None):
+            keep = sources < high
+            sources = sources[keep]
+            windows = windows[keep]
+
+        order = np.lexsort((windows, sources))
+
+        results = []
+        for i in order:
+            s = int(sources[i])
+            if(len(results) == 0 or results[-1][0] != s):
+                results.append((s,[]))
+            results[-1][1].append(harmonics[windows[i]])
+
+        return results
+
+    # ****************************************************************************************************
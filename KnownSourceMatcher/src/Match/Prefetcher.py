@@ -0,0 +1,172 @@
+"""
+This file is part of the KnownSourceMatcher.
+
+KnownSourceMatcher is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+KnownSourceMatcher is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with KnownSourceMatcher.  If not, see <http://www.gnu.org/licenses/>.
+
+File name:    Prefetcher.py
+Created:      October 19th, 2026
+
+This code runs on python 2.4 or later.
+
+"""
+
+import sys, threading, Queue
+from Utilities import Utilities
+
+# ******************************
+#
+# CLASS DEFINITION
+#
+# ******************************
+
+class Prefetcher(Utilities):
+    """
+    Prepares items in a background thread, so they are ready by the time they are
+    needed. A worker thread takes each item from an iterable in turn, applies a
+    function to it, and places the result in a bounded queue. The caller simply
+    iterates over the prefetcher to receive the results, in the original order.
+
+    The queue holds at most depth results, so the worker never runs more than depth
+    items ahead of the caller. This is used during manual matching, where candidates
+    are read, matched and have their images loaded while the user is still deciding
+    on the previous candidate.
+
+    Any exception raised by the worker is passed back, and raised again in the
+    thread iterating over the results.
+
+    """
+
+    # Seconds to wait on a full queue before checking whether to stop.
+    POLL = 0.1
+
+    # ******************************
+    #
+    # INIT FUNCTION
+    #
+    # ******************************
+    def __init__(self,debugFlag,items,function,depth):
+        """
+        Initialises the class, and starts the worker thread.
+
+        Parameters:
+        debugFlag    -    the debugging flag.
+        items        -    an iterable of items to prepare. This may be a generator,
+                          in which case it is only ever advanced by the worker thread.
+        function     -    the function applied to each item.
+        depth        -    the maximum number of prepared results to hold.
+
+        """
+        Utilities.__init__(self,debugFlag)
+        self.items = items
+        self.function = function
+        self.queue = Queue.Queue(max(1, int(depth)))
+        self.stopped = threading.Event()
+        self.finished = False
+
+        self.thread = threading.Thread(target=self.run)
+        self.thread.setDaemon(True)
+        self.thread.start()
+
+    # ******************************
+    #
+    # FUNCTIONS.
+    #
+    # ******************************
+
+    def run(self):
+        """
+        The body of the worker thread.
+        """
+
+        try:
+            for item in self.items:
+                if(self.stopped.isSet()):
+                    return
+
+                if(not self.put(("item", self.function(item)))):
+                    return
+        except Exception:
+            self.put(("error", sys.exc_info()))
+            return
+
+        self.put(("end", None))
+
+    # ****************************************************************************************************
+
+    def put(self,entry):
+        """
+        Adds an entry to the queue, waiting while it is full.
+
+        Returns:
+        False if the prefetcher was stopped before the entry could be added, else True.
+        """
+
+        while(not self.stopped.isSet()):
+            try:
+                self.queue.put(entry, True, self.POLL)
+                return True
+            except Queue.Full:
+                pass
+
+        return False
+
+    # ****************************************************************************************************
+
+    def __iter__(self):
+        return self
+
+    # ****************************************************************************************************
+
+    def next(self):
+        """
+        Returns the next prepared result, waiting for it if necessary.
+        """
+
+        if(self.finished):
+            raise StopIteration
+
+        kind, value = self.queue.get()
+
+        if(kind == "end"):
+            self.finished = True
+            raise StopIteration
+        elif(kind == "error"):
+            self.finished = True
+            raise value[0], value[1], value[2]
+
+        return value
+
+    # ****************************************************************************************************
+
+    def stop(self):
+        """
+        Stops the worker thread, discarding any results not yet collected. The
+        item the worker is preparing, if any, is allowed to finish.
+        """
+
+        self.stopped.set()
+        self.finished = True
+
+        while(True):
+            try:
+                self.queue.get_nowait()
+            except Queue.Empty:
+                break
+
+        self.thread.join(self.POLL * 10)
+
+        if(self.thread.isAlive()):
+            self.o("Prefetch worker still busy, it will exit once the current item is prepared.")
+
+    # ****************************************************************************************************
@@ -150,10 +150,12 @@ from numpy import histogram
 from numpy import corrcoef
 from numpy import append
 
-from scipy.optimize import leastsq
-from scipy import std
+# SciPy and matplotlib are only imported when first used, see LazyImport.py.
+import LazyImport
+leastsq = LazyImport.lazyAttribute("scipy.optimize","leastsq")
+std = LazyImport.lazyAttribute("scipy","std")
 
-import matplotlib.pyplot as plt # Revision:1
+plt = LazyImport.lazyModule("matplotlib.pyplot") # Revision:1
 
 # Custom file Imports:
 from ProfileOperationsInterface import ProfileOperationsInterface
@@ -30,7 +30,10 @@ data loaded from phcx or pfd files.
 
 # Scipy/numpy imports.
 from numpy import ceil
-from scipy import stats
+
+# SciPy is only imported when first used, see LazyImport.py.
+import LazyImport
+stats = LazyImport.lazyModule("scipy.stats")
 
 # Custom file imports.
 from Utilities import Utilities
@@ -0,0 +1,281 @@
+"""
+This file is part of the KnownSourceMatcher.
+
+KnownSourceMatcher is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+KnownSourceMatcher is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with KnownSourceMatcher.  If not, see <http://www.gnu.org/licenses/>.
+
+File name:    Profiler.py
+Created:      October 19th, 2026
+
+This code runs on python 2.4 or later.
+
+"""
+
+import cProfile, os, sys, threading, time
+from Utilities import Utilities
+
+# ******************************
+#
+# CLASS DEFINITION
+#
+# ******************************
+
+class Profiler(Utilities):
+    """
+    Profiles chosen stages of a run, so that evidence of a slow down can be captured
+    from the production run that shows it. The stages are those timed by Instrumentation:
+
+    parse      -    parsing the catalog (the "load" stage).
+    discovery  -    finding the candidate files to match.
+    decode     -    reading candidates from PFD and PHCX files.
+    match      -    matching candidates, whatever the search strategy.
+    write      -    writing matches to the output files.
+    score      -    computing PFD candidate scores.
+    cluster    -    grouping duplicate candidates.
+    join       -    the sweep join.
+
+    Each stage is profiled in one of two ways.
+
+    cprofile   -    the deterministic profiler in the standard library. All the calls made
+                    within the stage are recorded, to a <prefix>_<stage>.pstats file that can
+                    be read using the pstats module, or tools such as snakeviz or gprof2dot.
+    sample     -    a statistical profiler. A background thread records the call stack of
+                    each thread inside a profiled stage every few milliseconds. Its overhead is
+                    low and does not grow with the number of calls made. The stacks are written
+                    to a <prefix>_<stage>.collapsed file, one "frame;frame;frame count" line per
+                    stack, ready for flamegraph.pl or speedscope.
+
+    A stage entered while the same thread is already inside a profiled stage is counted
+    towards the outer stage. The cProfile profiler only follows the thread that entered a
+    stage, so the sampler is the better choice when several threads match at once.
+
+    """
+
+    # The stages that can be profiled, and the Instrumentation stage each is recorded as.
+    STAGES = {"parse": "load", "discovery": "discovery", "decode": "decode", "match": "match",
+              "write": "write", "score": "score", "cluster": "cluster", "join": "join"}
+
+    # Seconds between samples taken by the statistical profiler.
+    INTERVAL = 0.005
+
+    # ******************************
+    #
+    # INIT FUNCTION
+    #
+    # ******************************
+    def __init__(self,debugFlag,stages,mode="cprofile",prefix="profile"):
+        """
+        Initialises the class.
+
+        Parameters:
+        debugFlag    -    the debugging flag.
+        stages       -    the names of the stages to profile, see STAGES.
+        mode         -    either "cprofile" or "sample".
+        prefix       -    the path prefix of the files written.
+
+        """
+        Utilities.__init__(self,debugFlag)
+
+        for stage in stages:
+            if(stage not in self.STAGES):
+                raise ValueError("Unknown profiling stage: " + str(stage) + ", expected one of " + ", ".join(sorted(self.STAGES)))
+
+        if(mode not in ("cprofile", "sample")):
+            raise ValueError("Unknown profiler: " + str(mode) + ", expected cprofile or sample")
+
+        self.mode = mode
+        self.prefix = prefix
+        self.families = dict([(self.STAGES[stage], stage) for stage in stages])
+        self.lock = threading.Lock()
+
+        # Maps each thread inside a profiled stage to that stage.
+        self.active = {}
+
+        # The cProfile profiler, or the sampled stacks and their counts, for each stage.
+        self.profiles = {}
+        self.samples = {}
+
+        self.sampler = None
+        self.stopping = threading.Event()
+
+    # ******************************
+    #
+    # FUNCTIONS.
+    #
+    # ******************************
+
+    def start(self):
+        """
+        Starts the sampling thread, if the statistical profiler is used.
+        """
+
+        if(self.mode == "sample" and self.sampler is None):
+            self.sampler = threading.Thread(target=self.sample)
+            self.sampler.setDaemon(True)
+            self.sampler.start()
+
+    # ****************************************************************************************************
+
+    def begin(self,family):
+        """
+        Called by Instrumentation as a stage is entered.
+
+        Parameters:
+        family    -    the stage entered, i.e. "decode".
+
+        Returns:
+        The stage being profiled, to be passed to end(), or None if it is not profiled.
+        """
+
+        stage = self.families.get(family)
+
+        if(stage is None):
+            return None
+
+        thread = threading.currentThread().ident
+
+        self.lock.acquire()
+        try:
+            if(thread in self.active):
+                return None
+
+            if(self.mode == "cprofile"):
+                # One cProfile profiler can only follow one thread at a time.
+                if(stage in self.profiles and self.profiles[stage][1]):
+                    return None
+
+                if(stage not in self.profiles):
+                    self.profiles[stage] = [cProfile.Profile(), False]
+
+                self.profiles[stage][1] = True
+
+            self.active[thread] = stage
+        finally:
+            self.lock.release()
+
+        if(self.mode == "cprofile"):
+            self.profiles[stage][0].enable()
+
+        return stage
+
+    # ****************************************************************************************************
+
+    def end(self,stage):
+        """
+        Called by Instrumentation as a stage returned by begin() is left.
+        """
+
+        if(self.mode == "cprofile"):
+            self.profiles[stage][0].disable()
+
+        self.lock.acquire()
+        try:
+            del self.active[threading.currentThread().ident]
+
+            if(self.mode == "cprofile"):
+                self.profiles[stage][1] = False
+        finally:
+            self.lock.release()
+
+    # ****************************************************************************************************
+
+    def sample(self):
+        """
+        The body of the sampling thread.
+        """
+
+        while(not self.stopping.isSet()):
+            time.sleep(self.INTERVAL)
+
+            frames = sys._current_frames()
+
+            self.lock.acquire()
+            try:
+                for thread, stage in self.active.items():
+                    frame = frames.get(thread)
+
+                    if(frame is None):
+                        continue
+
+                    stack = collapse(frame)
+                    counts = self.samples.setdefault(stage, {})
+                    counts[stack] = counts.get(stack, 0) + 1
+            finally:
+                self.lock.release()
+
+    # ****************************************************************************************************
+
+    def save(self):
+        """
+        Stops profiling, and writes out the profile of each stage.
+
+        Returns:
+        The list of files written.
+        """
+
+        self.stopping.set()
+
+        if(self.sampler is not None):
+            self.sampler.join()
+
+        written = []
+
+        directory = os.path.dirname(self.prefix)
+        if(len(directory) > 0 and not os.path.isdir(directory)):
+            os.makedirs(directory)
+
+        self.lock.acquire()
+        try:
+            for stage in sorted(self.profiles):
+                path = self.prefix + "_" + stage + ".pstats"
+                self.profiles[stage][0].dump_stats(path)
+                written.append(path)
+
+            for stage in sorted(self.samples):
+                path = self.prefix + "_" + stage + ".collapsed"
+                output = open(path, "w")
+                for stack, count in sorted(self.samples[stage].items()):
+                    output.write(stack + " " + str(count) + "\n")
+                output.close()
+                written.append(path)
+        finally:
+            self.lock.release()
+
+        return written
+
+    # ****************************************************************************************************
+
+# ******************************
+#
+# MODULE FUNCTIONS.
+#
+# ******************************
+
+def collapse(frame):
+    """
+    Describes a call stack in the collapsed format used by flame graph tools,
+    with the outermost frame first, i.e. "Matcher.py:main;KnownSourceDB.py:match".
+    """
+
+    names = []
+
+    while(frame is not None):
+        code = frame.f_code
+        names.append(os.path.basename(code.co_filename) + ":" + code.co_name)
+        frame = frame.f_back
+
+    names.reverse()
+
+    return ";".join(names)
+
+# ******************************
@@ -66,6 +66,12 @@ class Settings(Utilities):
         self.path    = "Settings.txt"
         self.padding = 3600
         self.telescope = "Parkes"
+        self.clusterRadius = 0.5
+        self.cacheSize = 1024
+        self.harmonics = "legacy"
+        self.maxHarmonic = 8
+        self.mergeRadius = 0.5
+        self.mergeAccuracy = 0.1
 
     # ****************************************************************************************************
     
@@ -85,6 +91,12 @@ class Settings(Utilities):
         self.o("Radius   = " + str(self.radius)  + " (The radius in degrees to search).")
         self.o("Padding   = " + str(self.padding)  + " (The padding to use for advanced matching).")
         self.o("Telescope   = " + str(self.padding)  + " (Instrument used for observations).")
+        self.o("Cluster radius = " + str(self.clusterRadius)  + " (The radius in degrees used to group duplicate candidates).")
+        self.o("Cache size = " + str(self.cacheSize)  + " (The number of pointings to cache nearby known sources for, 0 to disable).")
+        self.o("Harmonics = " + str(self.harmonics)  + " (legacy, rational, or a list such as 1,1/2,2/3,3/2).")
+        self.o("Max harmonic = " + str(self.maxHarmonic)  + " (The largest p or q used for rational p/q harmonics).")
+        self.o("Merge radius = " + str(self.mergeRadius)  + " (The radius in degrees within which sources from different catalogs may be the same pulsar).")
+        self.o("Merge accuracy = " + str(self.mergeAccuracy)  + " (Percentage accuracy to which their periods must then agree).")
          
     # ****************************************************************************************************
         
@@ -143,6 +155,24 @@ class Settings(Utilities):
         elif(line.startswith("telescope")):
             value = line.replace("telescope=","")
             self.telescope = str(value)    
+        elif(line.startswith("clusterRadius")):
+            value = line.replace("clusterRadius=","")
+            self.clusterRadius = float(value)
+        elif(line.startswith("cacheSize")):
+            value = line.replace("cacheSize=","")
+            self.cacheSize = int(value)
+        elif(line.startswith("harmonics")):
+            value = line.replace("harmonics=","")
+            self.harmonics = value.strip()
+        elif(line.startswith("maxHarmonic")):
+            value = line.replace("maxHarmonic=","")
+            self.maxHarmonic = int(value)
+        elif(line.startswith("mergeRadius")):
+            value = line.replace("mergeRadius=","")
+            self.mergeRadius = float(value)
+        elif(line.startswith("mergeAccuracy")):
+            value = line.replace("mergeAccuracy=","")
+            self.mergeAccuracy = float(value)
     
     # ****************************************************************************************************
     
@@ -176,5 +206,41 @@ class Settings(Utilities):
         """
         return self.telescope
     
+    def getClusterRadius(self):
+        """
+        Gets the radius in degrees within which duplicate candidates are grouped.
+        """
+        return self.clusterRadius
+    
+    def getCacheSize(self):
+        """
+        Gets the number of pointings for which nearby known sources are cached.
+        """
+        return self.cacheSize
+    
+    def getHarmonics(self):
+        """
+        Gets the harmonic set to match against: "legacy", "rational", or a list of harmonics.
+        """
+        return self.harmonics
+    
+    def getMaxHarmonic(self):
+        """
+        Gets the largest numerator or denominator used for rational harmonics.
+        """
+        return self.maxHarmonic
+    
+    def getMergeRadius(self):
+        """
+        Gets the radius in degrees within which sources from different catalogs may be merged.
+        """
+        return self.mergeRadius
+    
+    def getMergeAccuracy(self):
+        """
+        Gets the percentage accuracy to which the periods of merged sources must agree.
+        """
+        return self.mergeAccuracy
+    
     # ****************************************************************************************************
     
\ No newline at end of file
@@ -0,0 +1,222 @@
+"""
+This file is part of the KnownSourceMatcher.
+
+KnownSourceMatcher is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+KnownSourceMatcher is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with KnownSourceMatcher.  If not, see <http://www.gnu.org/licenses/>.
+
+File name:    StartupBenchmark.py
+Created:      October 19th, 2026
+
+This code runs on python 2.4 or later.
+
+Measures the start up time of the Matcher command line tool, and checks which
+third party modules a plain match loads. Each run starts a fresh interpreter,
+imports Matcher and matches the candidates at the path given, then reports the
+time taken and the modules loaded. For example,
+
+python StartupBenchmark.py --psrcat ../../lib/psrcat_web.db -p ../../test/data/phcxs
+
+The tool exits with status 1 if a plain match loads any third party module other
+than NumPy (or those listed with --allow), i.e. if SciPy or matplotlib are imported
+when they are not needed.
+
+"""
+
+# Command Line processing Imports:
+from optparse import OptionParser
+import json, os, shutil, subprocess, sys, tempfile, time
+
+# ******************************
+#
+# CHILD PROCESS SCRIPT
+#
+# ******************************
+
+# Run in a fresh interpreter. Matches the candidates as Matcher would, then writes
+# the time taken to import Matcher, and the third party modules loaded, to a file.
+CHILD = """
+import atexit, json, sys, time
+start = time.time()
+report, source = sys.argv[1], sys.argv[2]
+sys.argv = ["Matcher.py"] + sys.argv[3:]
+sys.path.insert(0, source)
+timings = {}
+
+def write():
+    modules = set()
+    for name, module in sys.modules.items():
+        path = getattr(module, "__file__", None) or ""
+        if("site-packages" in path or "dist-packages" in path):
+            modules.add(name.split(".")[0])
+    timings["total"] = time.time() - start
+    timings["modules"] = sorted(modules)
+    output = open(report, "w")
+    output.write(json.dumps(timings))
+    output.close()
+
+atexit.register(write)
+
+import Matcher
+timings["import"] = time.time() - start
+Matcher.Matcher().main()
+"""
+
+# ******************************
+#
+# CLASS DEFINITION
+#
+# ******************************
+
+class StartupBenchmark:
+    """
+    Times the start up of plain matching runs, and lists the modules they load.
+
+    """
+
+    # ******************************
+    #
+    # MAIN METHOD AND ENTRY POINT.
+    #
+    # ******************************
+
+    def main(self,argv=None):
+        """
+        Main entry point for the Application.
+
+        """
+
+        print "\n****************************"
+        print "|                          |"
+        print "|    Startup Benchmark     |"
+        print "|                          |"
+        print "|--------------------------|"
+        print "| Version 1.0              |"
+        print "| robert.lyon@cs.man.ac.uk |"
+        print "***************************\n"
+
+        parser = OptionParser()
+        parser.add_option("-p", action="store", dest="path",help='Path to the directory/file containing candidates (required).',default="")
+        parser.add_option("--psrcat", action="store", dest="psrcat",help='Path to the pulsar catalog data to use (required).',default="")
+        parser.add_option("--runs", action="store", dest="runs",type="int",help='The number of runs to time (optional).',default=5)
+        parser.add_option("--allow", action="store", dest="allow",help='Comma separated third party modules a plain match may load (optional).',default="numpy")
+
+        (args,options) = parser.parse_args()# @UnusedVariable : Tells Eclipse IDE to ignore warning.
+
+        if(not os.path.exists(args.path) or not os.path.isfile(args.psrcat)):
+            print "You must specify a candidate path (-p) and a pulsar catalog (--psrcat), exiting!"
+            sys.exit(2)
+
+        source = os.path.dirname(os.path.abspath(__file__))
+        allowed = set([name.strip() for name in args.allow.split(",") if len(name.strip()) > 0])
+
+        # Reference points: an empty interpreter, and one that imports only NumPy.
+        bare = self.median([self.time([sys.executable, "-c", "pass"]) for i in range(args.runs)])
+        numpy = self.median([self.time([sys.executable, "-c", "import numpy"]) for i in range(args.runs)])
+
+        reports = []
+        for i in range(args.runs):
+            reports.append(self.run(source, ["--psrcat", os.path.abspath(args.psrcat), "-p", os.path.abspath(args.path)]))
+
+        modules = set()
+        for report in reports:
+            modules.update(report["modules"])
+
+        unexpected = sorted(modules - allowed)
+
+        print "Runs:                        ", args.runs
+        print "Empty interpreter (s):       ", "%.3f" % bare
+        print "Interpreter with NumPy (s):  ", "%.3f" % numpy
+        print "Import Matcher (s):          ", "%.3f" % self.median([r["import"] for r in reports])
+        print "Plain match, in process (s): ", "%.3f" % self.median([r["total"] for r in reports])
+        print "Plain match, wall clock (s): ", "%.3f" % self.median([r["wall"] for r in reports])
+        print "Third party modules loaded:  ", ", ".join(sorted(modules)) or "none"
+
+        if(len(unexpected) > 0):
+            print "\nUnexpected modules loaded by a plain match: ", ", ".join(unexpected)
+            sys.exit(1)
+
+        print "\nA plain match loads only the standard library and: ", ", ".join(sorted(allowed))
+
+    # ****************************************************************************************************
+
+    def run(self,source,arguments):
+        """
+        Runs a plain match in a fresh interpreter.
+
+        Parameters:
+        source       -    the directory holding Matcher.py.
+        arguments    -    the command line arguments passed to Matcher.
+
+        Returns:
+        A dictionary holding the time taken to import Matcher ("import"), the time taken
+        by the whole run in process ("total") and as seen from outside ("wall"), and
+        the list of third party modules loaded ("modules").
+        """
+
+        directory = tempfile.mkdtemp(prefix="startup_benchmark_")
+
+        try:
+            report = os.path.join(directory, "report.json")
+            command = [sys.executable, "-c", CHILD, report, source, "-o", os.path.join(directory, "out.txt")] + arguments
+
+            wall = self.time(command, directory)
+
+            if(not os.path.isfile(report)):
+                print "Matcher did not complete, exiting!"
+                sys.exit(2)
+
+            reportFile = open(report)
+            results = json.loads(reportFile.read())
+            reportFile.close()
+
+            results["wall"] = wall
+            return results
+        finally:
+            shutil.rmtree(directory, True)
+
+    # ****************************************************************************************************
+
+    def time(self,command,directory=None):
+        """
+        Returns the wall clock time taken to run a command, discarding its output.
+        """
+
+        devnull = open(os.devnull, "w")
+        start = time.time()
+
+        try:
+            subprocess.call(command, stdout=devnull, stderr=devnull, cwd=directory)
+        finally:
+            devnull.close()
+
+        return time.time() - start
+
+    # ****************************************************************************************************
+
+    def median(self,values):
+        """
+        Returns the median of a list of numbers.
+        """
+
+        values = sorted(values)
+        middle = len(values) // 2
+
+        if(len(values) % 2 == 1):
+            return values[middle]
+
+        return (values[middle - 1] + values[middle]) / 2.0
+
+    # ****************************************************************************************************
+
+if __name__ == '__main__':
+    StartupBenchmark().main()
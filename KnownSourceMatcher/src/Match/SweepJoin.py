@@ -0,0 +1,132 @@
+"""
+This file is part of the KnownSourceMatcher.
+
+KnownSourceMatcher is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+KnownSourceMatcher is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with KnownSourceMatcher.  If not, see <http://www.gnu.org/licenses/>.
+
+File name:    SweepJoin.py
+Created:      October 19th, 2026
+
+This code runs on python 2.4 or later.
+
+"""
+
+import numpy as np
+import Coordinates
+from Utilities import Utilities
+
+# ******************************
+#
+# CLASS DEFINITION
+#
+# ******************************
+
+class SweepJoin(Utilities):
+    """
+    Finds the known sources near to each of a batch of candidates in a single
+    pass. Rather than searching the catalog once per candidate, the batch is
+    sorted by declination and swept against the declination ordered catalog
+    (see Catalog.decOrder). Two pointers mark the band of catalog sources
+    within the search radius in declination of the current candidate. As the
+    candidates are visited in order of increasing declination, the pointers
+    only ever move forwards, so the whole join needs one merge pass over the
+    catalog, plus the exact separations computed for sources in each band.
+
+    Given N known sources and M candidates this requires O(M log M + N) steps
+    to form the bands, compared to O(M log N) random lookups for the thresholded
+    comparison. It also finds every source within the radius, whereas the
+    thresholded comparison can miss sources whose sort attribute lies outside
+    the padding, i.e. near RA 00:00:00.
+
+    """
+
+    # ******************************
+    #
+    # INIT FUNCTION
+    #
+    # ******************************
+    def __init__(self,debugFlag,catalog,radius):
+        """
+        Initialises the class.
+
+        Parameters:
+        debugFlag    -    the debugging flag.
+        catalog      -    the Catalog to join against.
+        radius       -    the search radius in degrees.
+
+        """
+        Utilities.__init__(self,debugFlag)
+        self.catalog = catalog
+        self.radius = float(radius)
+
+    # ******************************
+    #
+    # FUNCTIONS.
+    #
+    # ******************************
+
+    def join(self,candidates):
+        """
+        Finds the known sources within the search radius of each candidate.
+
+        Parameters:
+        candidates    -    a list of Candidate records.
+
+        Returns:
+        A dictionary mapping the index of each candidate with a position to a list
+        of (knownSource, theta) tuples, where theta is the angular separation in
+        degrees. Sources are listed in sort attribute order. Candidates without a
+        position are not included, as they must be compared to the whole catalog.
+        """
+
+        indices = [i for i in range(len(candidates)) if Coordinates.hasPosition(candidates[i].ra,candidates[i].dec)]
+
+        ra  = np.array([candidates[i].ra for i in indices], dtype=np.float64)
+        dec = np.array([candidates[i].dec for i in indices], dtype=np.float64)
+
+        order = np.argsort(dec, kind='mergesort')
+
+        catalogDec = self.catalog.sortedDec
+        decOrder = self.catalog.decOrder
+        count = len(catalogDec)
+
+        neighbourhoods = {}
+        low = 0
+        high = 0
+
+        for k in order:
+
+            # Advance both ends of the band. Neither pointer ever moves backwards.
+            while(low < count and catalogDec[low] < dec[k] - self.radius):
+                low += 1
+
+            if(high < low):
+                high = low
+
+            while(high < count and catalogDec[high] <= dec[k] + self.radius):
+                high += 1
+
+            band = decOrder[low:high]
+            theta = Coordinates.separations(ra[k], dec[k], self.catalog.ra[band], self.catalog.dec[band])
+            within = theta < self.radius
+
+            # Restore sort attribute order, which is the order the catalog is held in.
+            band = band[within]
+            theta = theta[within]
+            sortOrder = np.argsort(band, kind='mergesort')
+
+            neighbourhoods[indices[k]] = [(self.catalog.sources[j], float(t)) for j, t in zip(band[sortOrder], theta[sortOrder])]
+
+        return neighbourhoods
+
+    # ****************************************************************************************************
@@ -0,0 +1,632 @@
+"""
+This file is part of the KnownSourceMatcher.
+
+KnownSourceMatcher is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+KnownSourceMatcher is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with KnownSourceMatcher.  If not, see <http://www.gnu.org/licenses/>.
+
+File name:    SyntheticGenerator.py
+Created:      October 19th, 2026
+
+This code runs on python 2.4 or later.
+
+Generates synthetic candidates, with known ground truth, for testing the matcher at
+scale. For example, to write a million candidates and their ground truth to a CSV file,
+
+python SyntheticGenerator.py --psrcat ../../lib/psrcat_web.db -n 1000000 --csv synthetic.csv
+
+or to write ten thousand ".pfd" files, along with a truth.csv file describing them,
+
+python SyntheticGenerator.py --psrcat ../../lib/psrcat_web.db -n 10000 --files synthetic --format pfd
+
+A synthetic catalog, in the format of the ATNF catalog file, can also be written with --catalog.
+
+"""
+
+# Command Line processing Imports:
+from optparse import OptionParser
+import gzip, os, struct, sys
+
+import numpy as np
+
+# Custom file Imports:
+import Coordinates
+import Settings
+from Candidate import Candidate
+from KnownSourceDB import KnownSourceDB
+from Utilities import Utilities
+
+# ******************************
+#
+# CLASS DEFINITION
+#
+# ******************************
+
+class SyntheticGenerator(Utilities):
+    """
+    Generates synthetic candidates around the known sources in a catalog. Each candidate
+    is one of the following kinds:
+
+    match                -    a candidate within half the search radius of a known source,
+                              with a period within half the accuracy of a harmonic of the
+                              known source period, and a DM within half the accuracy of its DM.
+    near-miss:position   -    as a match, but from 1.2 to 2 search radii from the known source.
+    near-miss:period     -    as a match, but with a period 2 to 4 times the accuracy away.
+    near-miss:dm         -    as a match, but with a DM 2 to 4 times the accuracy away.
+    background           -    a random position on the sky, with a period drawn log uniformly
+                              from 1 ms to 10 s and a DM drawn uniformly from 1 to 1000.
+
+    The ground truth of each candidate records its kind, the known source it was made
+    from and the harmonic used. A match is expected to be found for each candidate of the
+    match kind, and not for the others. A candidate placed in a crowded field, i.e. a
+    globular cluster, may of course also match the neighbours of the source it was made
+    from, so the truth describes how each candidate was made, rather than every match.
+
+    Candidates are generated in chunks using numpy, and are returned by a generator, so
+    millions of candidates can be produced without holding them all in memory. The same
+    seed always gives the same candidates.
+
+    """
+
+    # The kinds of candidate generated, see above.
+    KINDS = ["match", "near-miss:position", "near-miss:period", "near-miss:dm", "background"]
+
+    # The number of candidates generated at once.
+    CHUNK = 65536
+
+    # The number of candidate files written to each sub directory.
+    FILES_PER_DIRECTORY = 1000
+
+    # The columns of the ground truth CSV file.
+    COLUMNS = ["name", "kind", "ra", "dec", "period", "dm", "snr", "source", "harmonic"]
+
+    # ******************************
+    #
+    # INIT FUNCTION
+    #
+    # ******************************
+    def __init__(self,debugFlag,db,seed=0,fractions=None):
+        """
+        Initialises the class.
+
+        Parameters:
+        debugFlag    -    the debugging flag.
+        db           -    the parsed KnownSourceDB to generate candidates around.
+        seed         -    the seed of the random number generator (optional).
+        fractions    -    a dictionary giving the fraction of candidates of each kind (optional).
+                          By default 40% are matches, 10% each kind of near miss, and the
+                          remaining 30% are background.
+
+        """
+        Utilities.__init__(self,debugFlag)
+
+        if(fractions is None):
+            fractions = {"match": 0.4, "near-miss:position": 0.1, "near-miss:period": 0.1, "near-miss:dm": 0.1}
+
+        for kind in fractions:
+            if(kind not in self.KINDS):
+                raise ValueError("Unknown kind of candidate: " + str(kind))
+
+        self.weights = np.array([float(fractions.get(kind, 0.0)) for kind in self.KINDS[:-1]])
+        if(self.weights.sum() > 1.0 or (self.weights < 0).any()):
+            raise ValueError("The fractions of each kind of candidate must sum to at most 1")
+        self.weights = np.append(self.weights, 1.0 - self.weights.sum())
+
+        self.seed = seed
+        self.radius = float(db.radius)
+        self.accuracy = float(db.accuracy) / 100.0
+        self.harmonics = np.array([float(h) for h in db.harmonics])
+
+        # Only known sources with a position, period and DM can be made into candidates.
+        catalog = db.catalog
+        known = ~np.isnan(catalog.ra) & ~np.isnan(catalog.dec) & ~np.isnan(catalog.p0) & ~np.isnan(catalog.dm)
+        usable = np.flatnonzero(known)
+        usable = usable[(catalog.p0[usable] > 0) & (catalog.dm[usable] > 0)]
+
+        if(len(usable) == 0 and self.weights[-1] < 1.0):
+            raise ValueError("The catalog has no sources with a position, period and DM")
+
+        self.names = catalog.names[usable]
+        self.ra = catalog.ra[usable]
+        self.dec = catalog.dec[usable]
+        self.p0 = catalog.p0[usable]
+        self.dm = catalog.dm[usable]
+
+    # ******************************
+    #
+    # FUNCTIONS.
+    #
+    # ******************************
+
+    def generate(self,count):
+        """
+        Generates synthetic candidates.
+
+        Parameters:
+        count    -    the number of candidates to generate.
+
+        Returns:
+        A generator of (Candidate, truth) tuples, where truth is a dictionary holding
+        the kind of candidate, and the name of the known source and the harmonic it was
+        made from ("" and 0 for background candidates).
+        """
+
+        random = np.random.RandomState(self.seed)
+        made = 0
+
+        while(made < count):
+            size = min(self.CHUNK, count - made)
+            chunk = self.chunk(random, size)
+
+            for i in range(size):
+                name = "synthetic_%09d" % (made + i)
+                candidate = Candidate(name, float(chunk["ra"][i]), float(chunk["dec"][i]), float(chunk["period"][i]), float(chunk["dm"][i]), float(chunk["snr"][i]))
+                truth = {"kind": self.KINDS[chunk["kind"][i]], "source": chunk["source"][i], "harmonic": float(chunk["harmonic"][i])}
+                yield (candidate, truth)
+
+            made += size
+
+    # ****************************************************************************************************
+
+    def chunk(self,random,size):
+        """
+        Generates the values describing a chunk of candidates.
+
+        Returns:
+        A dictionary of arrays, with the keys "kind", "ra", "dec", "period", "dm", "snr",
+        "source" and "harmonic".
+        """
+
+        kind = random.choice(len(self.KINDS), size, p=self.weights)
+        background = kind == len(self.KINDS) - 1
+
+        # Every candidate is first made a match, then the near misses are moved away.
+        # A catalog with no usable sources can only give background candidates.
+        if(len(self.names) > 0):
+            index = random.randint(0, len(self.names), size)
+            ra, dec, p0, dm = self.ra[index], self.dec[index], self.p0[index], self.dm[index]
+            names = self.names[index]
+        else:
+            ra, dec, p0, dm = np.zeros(size), np.zeros(size), np.ones(size), np.ones(size)
+            names = np.array([""] * size, dtype=object)
+
+        harmonic = self.harmonics[random.randint(0, len(self.harmonics), size)]
+
+        distance = self.radius * 0.5 * random.uniform(0.0, 1.0, size)
+        periodError = self.accuracy * 0.5 * random.uniform(-1.0, 1.0, size)
+        dmError = self.accuracy * 0.5 * random.uniform(-1.0, 1.0, size)
+
+        # Near misses fall 2 to 4 times the accuracy, or 1.2 to 2 radii, away.
+        sign = np.where(random.uniform(0.0, 1.0, size) < 0.5, -1.0, 1.0)
+        miss = sign * self.accuracy * random.uniform(2.0, 4.0, size)
+
+        position = kind == self.KINDS.index("near-miss:position")
+        distance[position] = self.radius * random.uniform(1.2, 2.0, position.sum())
+        periodError = np.where(kind == self.KINDS.index("near-miss:period"), miss, periodError)
+        dmError = np.where(kind == self.KINDS.index("near-miss:dm"), miss, dmError)
+
+        ra, dec = offset(ra, dec, distance, random.uniform(0.0, 360.0, size))
+        period = p0 * harmonic * (1.0 + periodError)
+        dm = dm * (1.0 + dmError)
+
+        # Background candidates are spread uniformly over the sky.
+        count = background.sum()
+        ra[background] = random.uniform(0.0, 360.0, count)
+        dec[background] = np.degrees(np.arcsin(random.uniform(-1.0, 1.0, count)))
+        period[background] = 10.0 ** random.uniform(-3.0, 1.0, count)
+        dm[background] = random.uniform(1.0, 1000.0, count)
+        harmonic[background] = 0.0
+        names = np.where(background, "", names)
+
+        snr = random.uniform(6.0, 50.0, size)
+
+        return {"kind": kind, "ra": ra, "dec": dec, "period": period, "dm": dm,
+                "snr": snr, "source": names, "harmonic": harmonic}
+
+    # ****************************************************************************************************
+
+    def writeCSV(self,path,count):
+        """
+        Writes synthetic candidates and their ground truth to a CSV file, with the
+        columns given by COLUMNS. Positions are written in degrees.
+
+        Returns:
+        The number of candidates written.
+        """
+
+        output = open(path, "w")
+        output.write(",".join(self.COLUMNS) + "\n")
+
+        written = 0
+        for candidate, truth in self.generate(count):
+            output.write(truthLine(candidate, truth))
+            written += 1
+
+        output.close()
+
+        return written
+
+    # ****************************************************************************************************
+
+    def writeFiles(self,directory,count,fmt):
+        """
+        Writes synthetic candidates as candidate files, in sub directories of up to
+        FILES_PER_DIRECTORY files each, i.e. directory_0, directory_1 and so on. The
+        ground truth is written to truth.csv, with the path of each file as its name.
+
+        Parameters:
+        directory    -    the directory to write to.
+        count        -    the number of candidates to write.
+        fmt          -    either "pfd" or "phcx".
+
+        Returns:
+        The number of files written.
+        """
+
+        if(fmt == "pfd"):
+            write, extension = writePFD, ".pfd"
+        elif(fmt == "phcx"):
+            write, extension = writePHCX, ".phcx.gz"
+        else:
+            raise ValueError("Unknown candidate file format: " + str(fmt))
+
+        if(not os.path.isdir(directory)):
+            os.makedirs(directory)
+
+        truthFile = open(os.path.join(directory, "truth.csv"), "w")
+        truthFile.write(",".join(self.COLUMNS) + "\n")
+
+        # The profiles are random too, so depend on the seed.
+        random = np.random.RandomState(self.seed + 1)
+        written = 0
+
+        for candidate, truth in self.generate(count):
+            subdirectory = os.path.join(directory, "directory_" + str(written // self.FILES_PER_DIRECTORY))
+            if(written % self.FILES_PER_DIRECTORY == 0 and not os.path.isdir(subdirectory)):
+                os.makedirs(subdirectory)
+
+            candidate.name = os.path.join(subdirectory, candidate.name + extension)
+            write(candidate.name, candidate, random)
+            truthFile.write(truthLine(candidate, truth))
+            written += 1
+
+        truthFile.close()
+
+        return written
+
+    # ****************************************************************************************************
+
+    def writeCatalog(self,path,count):
+        """
+        Writes a synthetic catalog of known sources, in the format of the ATNF catalog
+        file (see KnownSourceDB.parse()). Sources are spread uniformly over the sky,
+        with the same distributions of period and DM as background candidates.
+
+        Returns:
+        The number of sources written.
+        """
+
+        random = np.random.RandomState(self.seed + 2)
+
+        output = open(path, "w")
+        output.write("#CATALOGUE synthetic\n#\n# Synthetic known sources written by SyntheticGenerator.py\n#\n")
+
+        written = 0
+        while(written < count):
+            size = min(self.CHUNK, count - written)
+
+            ra = random.uniform(0.0, 360.0, size)
+            dec = np.degrees(np.arcsin(random.uniform(-1.0, 1.0, size)))
+            period = 10.0 ** random.uniform(-3.0, 1.0, size)
+            dm = random.uniform(1.0, 1000.0, size)
+            RAJ = Coordinates.formatRA(ra)
+            DECJ = Coordinates.formatDEC(dec)
+
+            for i in range(size):
+                output.write("PSRJ     S%08d\n" % (written + i))
+                output.write("RAJ      %s\n" % RAJ[i])
+                output.write("DECJ     %s\n" % DECJ[i])
+                output.write("P0       %.12f\n" % period[i])
+                output.write("DM       %.3f\n" % dm[i])
+                output.write("@-----------------------------------------------------------------\n")
+
+            written += size
+
+        output.close()
+
+        return written
+
+    # ****************************************************************************************************
+
+# ******************************
+#
+# MODULE FUNCTIONS.
+#
+# ******************************
+
+def offset(ra,dec,distance,bearing):
+    """
+    Moves positions on the sky a given angular distance along a given bearing.
+
+    Parameters:
+    ra          -    an array of right ascensions in degrees.
+    dec         -    an array of declinations in degrees.
+    distance    -    an array of angular distances in degrees.
+    bearing     -    an array of bearings in degrees, east of north.
+
+    Returns:
+    A (ra, dec) tuple of arrays, in degrees.
+    """
+
+    ra1, dec1 = np.radians(ra), np.radians(dec)
+    d, b = np.radians(distance), np.radians(bearing)
+
+    sinDec = np.sin(dec1) * np.cos(d) + np.cos(dec1) * np.sin(d) * np.cos(b)
+    dec2 = np.arcsin(np.clip(sinDec, -1.0, 1.0))
+    ra2 = ra1 + np.arctan2(np.sin(b) * np.sin(d) * np.cos(dec1), np.cos(d) - np.sin(dec1) * sinDec)
+
+    return (np.mod(np.degrees(ra2), 360.0), np.degrees(dec2))
+
+# ******************************
+
+def truthLine(candidate,truth):
+    """
+    Describes a candidate and its ground truth as a line of the ground truth CSV file.
+    """
+
+    return "%s,%s,%.8f,%.8f,%.12g,%.6f,%.3f,%s,%.6g\n" % (candidate.name, truth["kind"], candidate.ra, candidate.dec,
+                                                         candidate.period, candidate.DM, candidate.SNR,
+                                                         truth["source"], truth["harmonic"])
+
+# ******************************
+
+def readCSV(path):
+    """
+    Reads the candidates and ground truth written by SyntheticGenerator.writeCSV().
+
+    Returns:
+    A generator of (Candidate, truth) tuples, as returned by SyntheticGenerator.generate().
+    """
+
+    inputFile = open(path)
+
+    try:
+        inputFile.readline()
+
+        for line in inputFile:
+            name, kind, ra, dec, period, dm, snr, source, harmonic = line.rstrip("\r\n").split(",")
+            candidate = Candidate(name, float(ra), float(dec), float(period), float(dm), float(snr))
+            yield (candidate, {"kind": kind, "source": source, "harmonic": float(harmonic)})
+    finally:
+        inputFile.close()
+
+# ******************************
+
+def profile(random,candidate,bins,centre=None,width=None,height=None):
+    """
+    Returns a noisy pulse profile, with a single Gaussian pulse. By default the
+    pulse is placed at random, and its height grows with the candidate SNR.
+
+    Parameters:
+    random       -    the numpy RandomState to use.
+    candidate    -    the Candidate the profile is made for.
+    bins         -    the number of bins in the profile.
+    centre       -    the phase of the centre of the pulse, from 0 to 1 (optional).
+    width        -    the width of the pulse, as a fraction of the period (optional).
+    height       -    the height of the pulse, relative to the noise (optional).
+    """
+
+    if(centre is None):
+        centre = random.uniform(0.2, 0.8)
+    if(width is None):
+        width = random.uniform(0.02, 0.08)
+    if(height is None):
+        height = candidate.SNR
+
+    phase = np.arange(bins) / float(bins)
+
+    # The distance in phase to the pulse centre, wrapped to lie between -0.5 and 0.5.
+    distance = np.mod(phase - centre + 0.5, 1.0) - 0.5
+    pulse = height * np.exp(-0.5 * (distance / width) ** 2)
+
+    return pulse + random.normal(0.0, 1.0, bins)
+
+# ******************************
+
+def writePFD(path,candidate,random):
+    """
+    Writes a candidate as a little endian ".pfd" file, in the format written by
+    PRESTO's prepfold and read by PFDFile.load(). The header holds the candidate
+    position, barycentric period and best DM. The folded data hold a pulse made by
+    profile(), delayed in each sub band as if dispersed by the best DM, so that the
+    PFD scores can be computed too.
+    """
+
+    numdms, numperiods, numpdots = 41, 1, 1
+    nsub, npart, proflen, numchan = 8, 8, 64, 64
+    lofreq, chan_wid = 1182.0, 6.25
+    dt = 64.0e-6
+    samples = 2 ** 14
+
+    def string(text):
+        return struct.pack("<i", len(text)) + text
+
+    def fixed(text):
+        return text[:15].ljust(16, "\0")
+
+    header = struct.pack("<" + "i" * 12, numdms, numperiods, numpdots, nsub, npart,
+                         proflen, numchan, 1, 1, 1, 1, 1)
+    header += string("synthetic.fil") + string(os.path.basename(path)) + string("Parkes") + string("/null")
+    header += fixed(Coordinates.RAToString(candidate.ra)) + fixed(Coordinates.DECToString(candidate.dec))
+    header += struct.pack("<dd", dt, 0.0)
+
+    # endT, tepoch, bepoch, avgvoverc, lofreq, chan_wid, bestdm.
+    header += struct.pack("<" + "d" * 7, 1.0, 55000.0, 55000.0, 0.0, lofreq, chan_wid, candidate.DM)
+
+    frequency = 1.0 / candidate.period
+    for i in range(3):
+        # The topocentric, barycentric and folding powers and periods.
+        if(i == 2):
+            header += struct.pack("<ff", 0.0, 0.0) + struct.pack("<ddd", frequency, 0.0, 0.0)
+        else:
+            header += struct.pack("<ff", 0.0, 0.0) + struct.pack("<ddd", candidate.period, 0.0, 0.0)
+
+    header += struct.pack("<" + "d" * 7, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
+    dms = np.linspace(0.5, 1.5, numdms) * candidate.DM
+    header += struct.pack("<" + "d" * numdms, *dms) + struct.pack("<d", frequency) + struct.pack("<d", 0.0)
+
+    # The delay of each sub band, in phase, computed as PFDFile.dedisperse() does.
+    subdeltafreq = chan_wid * (numchan // nsub)
+    subfreqs = np.arange(nsub) * subdeltafreq + lofreq + subdeltafreq - chan_wid
+    delays = candidate.DM / (0.000241 * subfreqs * subfreqs)
+    delays = np.floor((delays - delays[-1]) * frequency * proflen + 0.5) / proflen
+
+    centre = random.uniform(0.2, 0.8)
+    width = random.uniform(0.02, 0.08)
+    height = candidate.SNR / np.sqrt(npart * nsub)
+
+    profiles = np.empty((npart, nsub, proflen))
+    for part in range(npart):
+        for sub in range(nsub):
+            profiles[part, sub] = profile(random, candidate, proflen, centre + delays[sub], width, height) + 100.0
+
+    stats = np.empty((npart, nsub, 7))
+    stats[:, :, 0] = samples
+    stats[:, :, 1] = profiles.mean(axis=2)
+    stats[:, :, 2] = profiles.var(axis=2)
+    stats[:, :, 3] = proflen
+    stats[:, :, 4] = profiles.mean(axis=2)
+    stats[:, :, 5] = profiles.var(axis=2)
+    stats[:, :, 6] = 1.0
+
+    output = open(path, "wb")
+    output.write(header)
+    output.write(profiles.astype("<f8").tostring())
+    output.write(stats.astype("<f8").tostring())
+    output.close()
+
+# ******************************
+
+def writePHCX(path,candidate,random):
+    """
+    Writes a candidate as a ".phcx.gz" file, a compressed XML file in the format read
+    by CandidateReader.readPHCX(). As in files written by the HTRU pipeline, the values
+    used are those of the second section, the first holding those of the FFT search.
+    """
+
+    data = profile(random, candidate, 128)
+    data = (data - data.min()) / max(data.max() - data.min(), 1.0e-9) * 255.0
+    hexadecimal = "".join(["%02X" % value for value in data.astype(int)])
+
+    section = """	<Section name='%s'>
+		<BestValues>
+			<TopoPeriod units='seconds'>%.14f</TopoPeriod>
+			<BaryPeriod units='seconds'>%.14f</BaryPeriod>
+			<Dm>%.6f</Dm>
+			<Accn units='m/s/s'>0.000000</Accn>
+			<Jerk units='m/s/s/s'>0.000000</Jerk>
+			<Snr>%.6f</Snr>
+			<Width>-1.000000</Width>
+		</BestValues>
+		<Profile nBins='128' format='02X' min='0.000000' max='1.000000'>%s</Profile>
+	</Section>
+"""
+
+    output = gzip.open(path, "wb")
+    output.write("<?xml version='1.0'?>\n<phcf>\n\t<head>\n")
+    output.write("\t\t<SourceID>%s</SourceID>\n\t\t<Telescope>parkes</Telescope>\n" % os.path.basename(path)[:15])
+    output.write("\t\t<Coordinate>\n\t\t\t<RA units='degrees'>%.6f</RA>\n\t\t\t<Dec units='degrees'>%.6f</Dec>\n" % (candidate.ra, candidate.dec))
+    output.write("\t\t\t<Epoch>J2000</Epoch>\n\t\t</Coordinate>\n\t\t<CentreFreq units='MHz'>1382.000000</CentreFreq>\n")
+    output.write("\t\t<BandWidth units='MHz'>-400.000000</BandWidth>\n\t\t<MjdStart>55000.000000</MjdStart>\n")
+    output.write("\t\t<ObservationLength units='seconds'>540.000000</ObservationLength>\n\t</head>\n")
+    output.write(section % ("FFT", candidate.period, candidate.period, candidate.DM, candidate.SNR * 0.9, hexadecimal))
+    output.write(section % ("FFT-pdmpd", candidate.period, candidate.period, candidate.DM, candidate.SNR, hexadecimal))
+    output.write("</phcf>\n")
+    output.close()
+
+# ******************************
+
+# ******************************
+#
+# MAIN METHOD AND ENTRY POINT.
+#
+# ******************************
+
+def main(argv=None):
+    """
+    Main entry point for the Application. Unlike the other tools, the generator
+    needs a parsed catalog before it can be built, so this is a module function.
+
+    """
+
+    print "\n****************************"
+    print "|                          |"
+    print "|   Synthetic Generator    |"
+    print "|                          |"
+    print "|--------------------------|"
+    print "| Version 1.0              |"
+    print "| robert.lyon@cs.man.ac.uk |"
+    print "***************************\n"
+
+    parser = OptionParser()
+    parser.add_option("--psrcat", action="store", dest="psrcat",help='Path to the pulsar catalog to generate candidates around (required).',default="")
+    parser.add_option("-n", action="store", dest="count",type="int",help='The number of candidates to generate (optional).',default=100000)
+    parser.add_option("--seed", action="store", dest="seed",type="int",help='The seed of the random number generator (optional).',default=0)
+    parser.add_option("--match", action="store", dest="match",type="float",help='The fraction of candidates made to match a known source (optional).',default=0.4)
+    parser.add_option("--near", action="store", dest="near",type="float",help='The fraction of candidates made to narrowly miss a known source, split evenly between position, period and DM (optional).',default=0.3)
+    parser.add_option("--csv", action="store", dest="csv",help='The path to write the candidates and their ground truth to as CSV (optional).',default="")
+    parser.add_option("--files", action="store", dest="files",help='The directory to write candidate files to (optional).',default="")
+    parser.add_option("--format", action="store", dest="format",type="choice",choices=["pfd","phcx"],help='The format of the candidate files written, pfd or phcx (optional).',default="phcx")
+    parser.add_option("--catalog", action="store", dest="catalog",help='The path to write a synthetic catalog of -n known sources to (optional).',default="")
+
+    (args,options) = parser.parse_args()# @UnusedVariable : Tells Eclipse IDE to ignore warning.
+
+    if(not os.path.isfile(args.psrcat)):
+        print "You haven't specified a pulsar catalog to use (via the --psrcat flag), exiting!"
+        sys.exit(2)
+
+    if(not (args.csv or args.files or args.catalog)):
+        print "Nothing to write, give one of --csv, --files or --catalog, exiting!"
+        sys.exit(2)
+
+    # The search radius and accuracy near misses are placed around are read from Settings.txt.
+    settings = Settings.Settings(False)
+    settings.load()
+
+    db = KnownSourceDB(args.psrcat, settings)
+    if(not db.parse()):
+        print "Catalog file or ANTF web output has unexpected structure! Exiting..."
+        sys.exit(2)
+
+    fractions = {"match": args.match}
+    for kind in ("near-miss:position", "near-miss:period", "near-miss:dm"):
+        fractions[kind] = args.near / 3.0
+
+    try:
+        generator = SyntheticGenerator(False, db, args.seed, fractions)
+    except ValueError as e:
+        print str(e) + ", exiting!"
+        sys.exit(2)
+
+    if(args.csv):
+        print "Wrote ", generator.writeCSV(args.csv, args.count), " candidates to: ", args.csv
+
+    if(args.files):
+        print "Wrote ", generator.writeFiles(args.files, args.count, args.format), " candidate files to: ", args.files
+
+    if(args.catalog):
+        print "Wrote ", generator.writeCatalog(args.catalog, args.count), " known sources to: ", args.catalog
+
+# ******************************
+
+if __name__ == '__main__':
+    main()
@@ -26,9 +26,14 @@ This code runs on python 2.4 or later.
 
 """
 
+import numpy as np
+import time
+
 from Utilities import Utilities
-import KnownSource
-import copy
+from MatchContext import MatchContext
+from SweepJoin import SweepJoin
+import Candidate
+import Coordinates
 
 # ******************************
 #
@@ -65,152 +70,123 @@ class Validator(Utilities):
     
     def run(self):
         """
-        Runs the validation code.
+        Runs the validation code. The matches found by the self join, then those
+        of the mutated candidates, are written to the output files.
         """
         print "Running validation tests"
         
-        cands_1 = self.getRealCands()
+        context = MatchContext(self.outputFile)
+        self.selfJoin(context)
+        self.db.write(context)
+        
         cands_2 = self.getMutatedCands()
         
-        for cand in cands_1:
-            self.db.match(cand,self.outputFile)
-           
         for cand in cands_2:
             self.db.match(cand,self.outputFile)
         
     # ****************************************************************************************************
     
-    def getRealCands(self):
+    def selfJoin(self,context,report=True):
         """
-        Here we simply try to match candidates in the catalog to themselves.
-        If the matching algorithm works, then all known sources should be matched to
-        themselves. This can be checked by looking at the output file produced by this 
-        function and checking the matches.
+        Matches every known source in the catalog against the catalog itself. If the
+        matching algorithm works, then every known source with a period is matched to
+        itself at harmonic 1. Pairs of different sources that match one another at
+        harmonic 1 are near duplicates within the catalog, i.e. the same pulsar listed
+        twice, and are reported too.
+        
+        The known sources are matched as one batch, just as candidates are when the
+        --sweep flag is used. A sweep join finds the sources near each one, then the
+        harmonic index is used wherever it leaves fewer comparisons.
+        
+        Parameters:
+        context    -    the MatchContext to record matches in. This method doesn't write them out,
+                        the caller passes the context to KnownSourceDB.write() if they are wanted.
+        report     -    if True the recall, near duplicates and timings are printed.
+        
+        Returns:
+        A (missed, duplicates) tuple. missed lists the known sources with a period
+        that were not matched to themselves, and duplicates lists (source, source, theta)
+        tuples, one per pair of near duplicates.
         """
         
-        knownSources = []
+        catalog = self.db.catalog
         
-        self.catalogueFile = open(self.db.getPath(),'r') # Read only access
+        start = time.time()
+        candidates = self.getRealCands()
         
-        # A temporary object that is used create new KnownSource instances.
-        tempSource = KnownSource.KnownSource()
-            
-        # Stores the headers in the file, so we can match parameters
-        # with their intended meaning.
-        columnDictionary = {}
+        joined = time.time()
+        neighbourhoods = SweepJoin(self.debug,catalog,self.db.radius).join(candidates)
+        
+        matched = time.time()
+        missed = []
+        duplicates = {}
+        comparisons = context.comparisons
+        
+        for i in range(len(candidates)):
+            matches = self.db.match(candidates[i],self.outputFile,neighbourhoods.get(i),context)
+            found = False
             
-        for line in self.catalogueFile.readlines():
-            if ( line[0] == '-'):
-                # Ignore these lines starting with empty space.
-                pass
-            elif(line[0] == ' ' or line[0] == '\n' or line[0] == '\r'):
-                pass
-            elif ( line[0] == '#'):
-                # This line contains the column headers, we need these
-                # to understand the structure of the file.
-                headers = line.split()
-                    
-                # Add headers to a dictionary.          
-                for i in range(len(headers)):
-                    if(i > 2):
-                            
-                        # Here we have to apply an offset, as the "Long with errors"
-                        # format has a structure that is not consistent. If you look
-                        # below you will see why using an annotated version of the
-                        # start of one such file. If we parse the header of the file,
-                        # we can get indexes for the parameters. But these do not match up.
-                        # 
-                        # -------------------------- Expected Index of Parameters ----------------------
-                        # |      |       |                |                 |             |            |
-                        # |      |       |                |                 |             |            |
-                        # v      v       v                v                 v             v            v
-                        # 0      1       2                3                 4             5            6
-                        #
-                        # -----------------------------------------------------------------------------------------
-                        # #     NAME    RAJ               DECJ              P0            F0           DM
-                        #              (hms)              (dms)             (s)           (Hz)         (cm^-3 pc)
-                        # -----------------------------------------------------------------------------------------
-                        # 1     PSR A   00:06:04 2.0e-01  +18:34:59 4.0e+00  1.0 1.4e-10  1.4 3.0e-10  9.0 6.0e-01
-                        # -----------------------------------------------------------------------------------------
-                        #
-                        # 0       1         2       3         4        5      6     7      8     9      10    11
-                        # ^       ^         ^       ^         ^        ^      ^     ^      ^     ^      ^     ^
-                        # |       |         |       |         |        |      |     |      |     |      |     |
-                        # |       |         |       |         |        |      |     |      |     |      |     |
-                        # ------------------------ Actual Index of Each Parameter -----------------------------
-                        #
-                        #
-                        # As can be seen, when the parameter index is greater than two,
-                        # an offset must be used to get the desired parameter. i.e. if you want
-                        # to get the DM, you might use the index=6. But an index of 6 actually
-                        # points to P0. To get the DM we must use (index - 1) x 2 as:
-                        #
-                        # DM index = (expected index - 1) x 2 
-                        #          = (6 - 1) x 2
-                        #          = 10 
-                        #
-                        # As you can see 10 points to the parameter we actually wanted in this example.                         
-                              
-                        columnDictionary[copy.copy(headers[i])] = (i-1)*2
-                    else:
-                        columnDictionary[copy.copy(headers[i])] = i
-                    
-            else:
-                # Build a known source object from the data, assuming we know
-                # the file structure from the headers. Basically this looks
-                # more complicated than it is. All we are doing is 1) taking the
-                # single pieces of information out of an individual line describing
-                # a source, then 2) format it so that it can be added to a known
-                # source object. I've had to do this, as the ATNF catalogue file
-                # doesn't contain all the information we need (RAJ,DECJ,P0,F0 are often missing).
-                # So the only way to get this is to use the ANTF web form, which outputs
-                # data in a different file format to that used in the catalogue file.
-                    
-                # Split the individual source entry, this produce a list.                  
-                sourceDetails = line.split()
-                    
-                # Use the column keys to map the entries in the sourceDetails list.
-                for key in columnDictionary.keys():
-                    if(key != "#"):
-                            
-                        # The key is the header name remember
-                        index = columnDictionary[key]
-                            
-                        if(key == "NAME"):
-                            name = sourceDetails[index] # get name of the source using the correct index
-                            if("J" in name):
-                                tempSource.addParameter("PSRJ    " + name + "    0    0")
-                            else:
-                                tempSource.addParameter("PSRB    " + name + "    0    0")
-                        elif(key == "RAJ"):
-                            raj = sourceDetails[index] 
-                            tempSource.addParameter("RAJ    " + raj + "    " + sourceDetails[index+1] + "    0")
-                        elif(key == "DECJ"):
-                            decj = sourceDetails[index]
-                            tempSource.addParameter("DECJ    " + decj + "    " + sourceDetails[index+1] + "    0")
-                        elif(key == "P0"):
-                            p0 = sourceDetails[index]
-                            tempSource.addParameter("P0    "  + p0 + "    " + sourceDetails[index+1] + "    0")
-                        elif(key == "F0"):
-                            f0 = sourceDetails[index]
-                            tempSource.addParameter("F0    " + f0 + "    " + sourceDetails[index+1] + "    0")
-                        elif(key == "DM"):
-                            dm = sourceDetails[index]
-                            tempSource.addParameter("DM    " + dm + "    " + sourceDetails[index+1] + "    0")
-                                       
-                knownSources.append(copy.deepcopy(tempSource))
+            for knownSource, catalog_period, harmonic, catalog_RA, catalog_DEC, catalog_DM, theta in matches:
+                if(float(harmonic) != 1.0):
+                    continue
                 
-                # Simply resets the temporary object. Does
-                # not initialise a new object, thus saving
-                # CPU overhead (although small, it all adds up). 
-                # Particularly when this application may need to do
-                # 200,000,000,000 comparisons if checking all the candidates
-                # at /local/scratch/cands .
-                tempSource.sourceParameters.clear()
-                tempSource.sortAttribute = 0
-                tempSource.sourceName = "Unknown"
+                if(knownSource is catalog.sources[i]):
+                    found = True
+                else:
+                    # Each pair is only listed once, whichever way round it was found.
+                    pair = tuple(sorted([knownSource.sourceName, catalog.sources[i].sourceName]))
+                    duplicates.setdefault(pair, theta)
+            
+            if(not found and candidates[i].period is not None):
+                missed.append(catalog.sources[i])
+        
+        end = time.time()
+        duplicates = [pair + (theta,) for pair, theta in sorted(duplicates.items())]
         
-            self.catalogueFile.close()
+        if(report):
+            count = len(candidates)
+            periodic = len([c for c in candidates if c.period is not None])
+            
+            print "\nKnown sources matched to themselves: ", periodic - len(missed), " of ", periodic,\
+                  " (", count - periodic, " without a period cannot match)"
+            
+            for knownSource in missed:
+                print "\tNot matched to itself: ", knownSource.sourceName
+            
+            print "Near duplicate pairs within the catalog: ", len(duplicates)
+            
+            for first, second, theta in duplicates:
+                print "\t", first, " ", second, " separation (deg): ", theta
+            
+            print "\nStage            Seconds"
+            print "%-12s %11.3f" % ("candidates", joined - start)
+            print "%-12s %11.3f" % ("join", matched - joined)
+            print "%-12s %11.3f" % ("match", end - matched)
+            print "%-12s %11.3f" % ("total", end - start)
+            print "\nSelf join of ", count, " x ", count, " sources: ", count / max(end - start, 1.0e-9),\
+                  " sources/s, ", context.comparisons - comparisons, " comparisons (", count * count, " for the naive search)"
+        
+        return (missed, duplicates)
+        
+    # ****************************************************************************************************
+    
+    def getRealCands(self):
+        """
+        Turns each known source in the catalog into a candidate, in catalog order, so that
+        the catalog can be matched against itself. The values are taken from the columns
+        already parsed by KnownSourceDB, so the period is derived from F0 where P0 is missing,
+        and either catalog format can be used.
+        """
+        
+        catalog = self.db.catalog
+        knownSources = []
+        
+        for i in range(len(catalog)):
+            source = catalog.sources[i]
+            period = None if np.isnan(catalog.p0[i]) else float(catalog.p0[i])
+            DM = None if np.isnan(catalog.dm[i]) else float(catalog.dm[i])
+            
+            knownSources.append(Candidate.Candidate(source.sourceName, source.ra, source.dec, period, DM))
             
         return knownSources
         
@@ -233,48 +209,14 @@ class Validator(Utilities):
         
         knownSources = []
         
-        # A temporary object that is used create new KnownSource instances.
-        tempSource = KnownSource.KnownSource()
-        
         # Actual known source:
         # Name          RA             DEC            P     F0    DM
         # J1830-1033    18:30:11.88    -10:33:40.7    245    0    203
-            
-        tempSource.addParameter("PSRJ    J1830-1033    0    0")
-        tempSource.addParameter("RAJ    18:30:44    1.0e-01    0")
-        tempSource.addParameter("DECJ   -10:33:55   1.0e-01    0")
-        tempSource.addParameter("P0     244         1.0e-01    0")
-        tempSource.addParameter("F0     0           1.0e-01    0")
-        tempSource.addParameter("DM     203         1.0e-01    0")
-                                     
-        knownSources.append(copy.deepcopy(tempSource))
-        tempSource.sourceParameters.clear()
-        tempSource.sortAttribute = 0
-        tempSource.sourceName = "Unknown"
-        
-        tempSource.addParameter("PSRJ    J1830-1033    0    0")
-        tempSource.addParameter("RAJ    18:30:52    1.0e-01    0")
-        tempSource.addParameter("DECJ   -10:33:10   1.0e-01    0")
-        tempSource.addParameter("P0     243         1.0e-01    0")
-        tempSource.addParameter("F0     0           1.0e-01    0")
-        tempSource.addParameter("DM     205         1.0e-01    0")
-                                       
-        knownSources.append(copy.deepcopy(tempSource))
-        tempSource.sourceParameters.clear()
-        tempSource.sortAttribute = 0
-        tempSource.sourceName = "Unknown"
         
-        tempSource.addParameter("PSRJ    J1830-1033    0    0")
-        tempSource.addParameter("RAJ    18:29:52    1.0e-01    0")
-        tempSource.addParameter("DECJ   -10:32:10   1.0e-01    0")
-        tempSource.addParameter("P0     243         1.0e-01    0")
-        tempSource.addParameter("F0     0           1.0e-01    0")
-        tempSource.addParameter("DM     205         1.0e-01    0")
-                                       
-        knownSources.append(copy.deepcopy(tempSource))
-        tempSource.sourceParameters.clear()
-        tempSource.sortAttribute = 0
-        tempSource.sourceName = "Unknown"
+        #                                     Name          RAJ         DECJ         P0     DM
+        knownSources.append(Candidate.Candidate("J1830-1033", Coordinates.parseRA("18:30:44"), Coordinates.parseDEC("-10:33:55"), 244.0, 203.0))
+        knownSources.append(Candidate.Candidate("J1830-1033", Coordinates.parseRA("18:30:52"), Coordinates.parseDEC("-10:33:10"), 243.0, 205.0))
+        knownSources.append(Candidate.Candidate("J1830-1033", Coordinates.parseRA("18:29:52"), Coordinates.parseDEC("-10:32:10"), 243.0, 205.0))
             
         return knownSources
         
@@ -0,0 +1,221 @@
+"""
+This file is part of the KnownSourceMatcher.
+
+KnownSourceMatcher is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+KnownSourceMatcher is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with KnownSourceMatcher.  If not, see <http://www.gnu.org/licenses/>.
+
+File name:    Watcher.py
+Created:      October 19th, 2026
+
+This code runs on python 2.4 or later.
+
+"""
+
+import os, signal, threading, time
+import Instrumentation
+from Utilities import Utilities
+
+# ******************************
+#
+# CLASS DEFINITION
+#
+# ******************************
+
+class Watcher(Utilities):
+    """
+    Watches a directory tree for new or changed candidate files, by polling. The
+    modification time and size of every ".phcx.gz" and ".pfd" file matched so far
+    is held in an index. On each poll the tree is scanned again, and only files that
+    are missing from the index, or whose time or size has changed, are passed on.
+
+    Files are often still being written when they first appear. So a file is only
+    passed on once it is settled, i.e. its time and size are unchanged since the
+    previous poll, or it was last modified more than one interval ago.
+
+    The index is saved after every batch, so a watcher that is stopped and started
+    again carries on from where it left off rather than matching the whole tree again.
+
+    """
+
+    # Seconds between checks for a stop signal, while waiting for the next poll.
+    POLL = 0.5
+
+    # ******************************
+    #
+    # INIT FUNCTION
+    #
+    # ******************************
+    def __init__(self,debugFlag,path,interval,indexPath):
+        """
+        Initialises the class, and loads any index saved previously.
+
+        Parameters:
+        debugFlag    -    the debugging flag.
+        path         -    the directory to watch.
+        interval     -    the time between polls in seconds.
+        indexPath    -    the path to the file the index is saved to.
+
+        """
+        Utilities.__init__(self,debugFlag)
+        self.path = path
+        self.interval = float(interval)
+        self.indexPath = indexPath
+        self.stopping = threading.Event()
+
+        # Maps each file path matched to its (modification time, size).
+        self.index = self.load(indexPath)
+
+        # Files seen on the previous poll that were not yet settled.
+        self.pending = {}
+
+    # ******************************
+    #
+    # FUNCTIONS.
+    #
+    # ******************************
+
+    def run(self,function):
+        """
+        Polls the directory until stopped by SIGINT or SIGTERM.
+
+        Parameters:
+        function    -    called with the list of new or changed files found by each poll.
+        """
+
+        signal.signal(signal.SIGTERM, lambda signum, frame: self.stopping.set())
+        signal.signal(signal.SIGINT, lambda signum, frame: self.stopping.set())
+
+        print "Watching: ", self.path, " every ", self.interval, " seconds"
+
+        while(not self.stopping.isSet()):
+
+            changed = self.poll()
+
+            if(len(changed) > 0):
+                print "\nFound ", len(changed), " new or changed candidates"
+                function(changed)
+                self.save()
+
+            next = time.time() + self.interval
+            while(not self.stopping.isSet() and time.time() < next):
+                self.stopping.wait(min(self.POLL, next - time.time()))
+
+        print "Stopped watching: ", self.path
+
+    # ****************************************************************************************************
+
+    def scan(self):
+        """
+        Finds every candidate file in the directory tree.
+
+        Returns:
+        A dictionary mapping each file path to its (modification time, size).
+        """
+
+        token = Instrumentation.stats.start("discovery")
+
+        files = {}
+
+        for root, directories, names in os.walk(self.path):
+            for name in names:
+                if name.endswith('.phcx.gz') or name.endswith('.pfd'):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        # Removed since the directory was listed.
+                        continue
+                    files[path] = (stat.st_mtime, stat.st_size)
+
+        Instrumentation.stats.stop("discovery",token,len(files))
+
+        return files
+
+    # ****************************************************************************************************
+
+    def poll(self):
+        """
+        Scans the directory tree, and updates the index.
+
+        Returns:
+        The sorted list of new or changed files that have settled.
+        """
+
+        files = self.scan()
+        now = time.time()
+        changed = []
+        pending = {}
+
+        for path, stat in files.iteritems():
+
+            if(self.index.get(path) == stat):
+                continue
+
+            if(self.pending.get(path) == stat or now - stat[0] > self.interval):
+                changed.append(path)
+                self.index[path] = stat
+            else:
+                pending[path] = stat
+
+        # Forget files that have been removed, so they are matched again if replaced.
+        for path in [path for path in self.index if path not in files]:
+            del self.index[path]
+
+        self.pending = pending
+        changed.sort()
+
+        return changed
+
+    # ****************************************************************************************************
+
+    def load(self,indexPath):
+        """
+        Loads a saved index, with one "path,modification time,size" line per file.
+        """
+
+        index = {}
+
+        if(not self.fileExists(indexPath)):
+            return index
+
+        indexFile = open(indexPath,'r')
+
+        for line in indexFile:
+            components = line.rstrip("\r\n").rsplit(",",2)
+
+            if(len(components) == 3):
+                index[components[0]] = (float(components[1]), int(components[2]))
+
+        indexFile.close()
+
+        return index
+
+    # ****************************************************************************************************
+
+    def save(self):
+        """
+        Saves the index. It is written to a temporary file first, which then replaces
+        the index, so a watcher stopped part way through never leaves a partial index.
+        """
+
+        temporary = self.indexPath + ".tmp"
+
+        indexFile = open(temporary,'w')
+        for path in sorted(self.index):
+            mtime, size = self.index[path]
+            indexFile.write(path + "," + repr(mtime) + "," + str(size) + "\n")
+        indexFile.close()
+
+        os.rename(temporary, self.indexPath)
+
+    # ****************************************************************************************************